@@ -1,3 +1,13 @@
 from django.contrib import admin
 
-# Register your models here.
+from apps.cart.models import Cart
+from apps.shop.admin import LargeTableAdmin
+
+
+@admin.register(Cart)
+class CartAdmin(LargeTableAdmin):
+    '''Администрирование корзин'''
+    list_display = ('id', 'user', 'product', 'updated_at')
+    list_select_related = ('product', 'user')
+    raw_id_fields = ('product', 'user')
+    search_fields = ('^user__username', '^product__name')
@@ -0,0 +1,16 @@
+from django.utils.functional import SimpleLazyObject
+
+from apps.cart.counters import get_cart_count
+
+
+def cart(request):
+    '''Количество товаров в корзине для значка в меню.
+
+    Вычисляется лениво, только если шаблон его выводит.
+    '''
+    def count():
+        if not request.user.is_authenticated:
+            return 0
+        return get_cart_count(request.user.pk)
+
+    return {'cart_count': SimpleLazyObject(count)}
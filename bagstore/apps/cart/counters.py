@@ -0,0 +1,33 @@
+from django.core.cache import cache
+
+from apps.cart.models import Cart
+
+
+# Сколько хранить счетчик товаров в корзине
+CART_COUNT_TIMEOUT = 24 * 60 * 60
+
+
+def cart_count_key(user_id):
+    '''Ключ кеша со счетчиком товаров в корзине пользователя'''
+    return 'cart:count:%s' % user_id
+
+
+def get_cart_count(user_id):
+    '''Количество товаров в корзине: из кеша, при промахе — из БД'''
+    key = cart_count_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = Cart.objects.filter(user_id=user_id).count()
+        cache.set(key, count, CART_COUNT_TIMEOUT)
+    return count
+
+
+def change_cart_count(user_id, delta):
+    '''Изменить счетчик, если он уже есть в кеше.
+
+    Отсутствующий счетчик не создается: он будет пересчитан при чтении.
+    '''
+    try:
+        cache.incr(cart_count_key(user_id), delta)
+    except ValueError:
+        pass
@@ -0,0 +1,97 @@
+import gzip
+import json
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.cart.models import Cart
+
+
+class Command(BaseCommand):
+    '''Удаление брошенных корзин и сжатие таблицы'''
+    help = ('Удаляет корзины пользователей, не менявших их дольше указанного срока, '
+            'при необходимости архивируя их в JSONL, и обновляет статистику таблицы')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--before', help='Граница периода (ISO 8601)')
+        parser.add_argument('--days', type=int, default=90,
+                            help='Удалять корзины, не менявшиеся N дней (по умолчанию 90)')
+        parser.add_argument('--archive', help='Файл архива JSONL (.gz — со сжатием)')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Сколько строк удалять за один запрос')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Только посчитать, что будет удалено')
+        parser.add_argument('--no-compact', action='store_true',
+                            help='Не выполнять VACUUM (SQLite) / ANALYZE (PostgreSQL)')
+
+    def get_before(self, options):
+        '''Граница периода удаления'''
+        if options['before']:
+            before = parse_datetime(options['before'])
+            if before is None:
+                raise CommandError('Неверный формат даты: %s' % options['before'])
+            if timezone.is_naive(before):
+                before = timezone.make_aware(before)
+            return before
+        return timezone.now() - timedelta(days=options['days'])
+
+    def handle(self, *args, **options):
+        before = self.get_before(options)
+        expired = Cart.objects.expired(before).order_by('pk')
+
+        if options['dry_run']:
+            self.stdout.write('Будет удалено строк корзин: %d (пользователей: %d)' % (
+                expired.count(), expired.values('user_id').distinct().count()))
+            return
+
+        archive = None
+        if options['archive']:
+            opener = gzip.open if options['archive'].endswith('.gz') else open
+            archive = opener(options['archive'], 'at', encoding='utf-8')
+
+        started = time.monotonic()
+        deleted = 0
+        try:
+            while True:
+                rows = list(expired.values('pk', 'user_id', 'product_id',
+                                           'created_at', 'updated_at')[:options['batch_size']])
+                if not rows:
+                    break
+                if archive is not None:
+                    for row in rows:
+                        row['created_at'] = row['created_at'].isoformat()
+                        row['updated_at'] = row['updated_at'].isoformat()
+                        archive.write(json.dumps(row) + '\n')
+                    archive.flush()
+                # Каждая порция — отдельный короткий запрос, таблица не блокируется надолго.
+                # Срок проверяется еще раз: корзину могли изменить после выборки
+                deleted += (Cart.objects.expired(before)
+                            .filter(pk__in=[row['pk'] for row in rows]).purge())
+        finally:
+            if archive is not None:
+                archive.close()
+        elapsed = time.monotonic() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            'Удалено строк корзин: %d за %.2f с (%d строк/с)' % (
+                deleted, elapsed, deleted / elapsed if elapsed else 0)
+        ))
+        if deleted and not options['no_compact']:
+            self.compact()
+
+    def compact(self):
+        '''Вернуть место после удаления (SQLite) или обновить статистику (PostgreSQL)'''
+        connection = connections[router.db_for_write(Cart)]
+        started = time.monotonic()
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute('VACUUM')
+            elif connection.vendor == 'postgresql':
+                cursor.execute('ANALYZE %s' % connection.ops.quote_name(Cart._meta.db_table))
+            else:
+                return
+        self.stdout.write('Обслуживание таблицы выполнено за %.2f с' % (time.monotonic() - started))
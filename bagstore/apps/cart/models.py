@@ -1,13 +1,100 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.core.cache import cache
+from django.db import connections, models, transaction
 
+from apps.outbox.events import OUTBOX_FIELDS, record_queryset, record_rows
+from apps.outbox.models import OutboxEvent
 from apps.shop.models import Product
 
 
 User = get_user_model()
 
+# Сколько строк удаляется одним запросом DELETE в CartQuerySet.purge
+PURGE_BATCH_SIZE = 500
+
+
+def invalidate_user_carts(user_ids, using=None):
+    '''Сбросить счетчики и снимки корзин пользователей в общем кеше.
+
+    Сброс выполняется сразу и еще раз после фиксации транзакции: иначе
+    процесс, прочитавший БД до фиксации, вернул бы в кеш старые данные.
+    '''
+    from apps.cart.counters import cart_count_key
+    from apps.cart.snapshots import invalidate_carts
+
+    user_ids = set(user_ids)
+
+    def invalidate():
+        cache.delete_many([cart_count_key(user_id) for user_id in user_ids])
+        invalidate_carts(user_ids)
+
+    invalidate()
+    transaction.on_commit(invalidate, using=using)
+
+
+class CartQuerySet(models.QuerySet):
+    '''Выборка корзин, сбрасывающая кешированные данные при массовых изменениях'''
+
+    def bulk_create(self, objs, *args, **kwargs):
+        '''Массовое добавление товаров в корзины.
+
+        bulk_create не отправляет сигналов, поэтому события outbox
+        записываются, а счетчики и снимки корзин затронутых
+        пользователей сбрасываются здесь.
+        '''
+        self._for_write = True
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            record_queryset(Cart.objects.using(self.db).filter(
+                pk__in=[obj.pk for obj in objs if obj.pk is not None]), OutboxEvent.CREATED)
+        invalidate_user_carts({obj.user_id for obj in objs}, using=self.db)
+        return objs
+
+    def expired(self, before):
+        '''Корзины пользователей, не менявших их с момента before'''
+        active_users = Cart.objects.filter(updated_at__gte=before).values('user_id')
+        return self.filter(updated_at__lt=before).exclude(user_id__in=active_users)
+
+    def purge(self):
+        '''Удалить строки запросами DELETE ... WHERE id IN (...) без загрузки объектов.
+
+        Обычный delete() загружает каждую строку и отправляет по ней
+        сигналы, поэтому события outbox записываются, а счетчики и снимки
+        корзин затронутых пользователей сбрасываются здесь. Удаляются
+        ровно прочитанные строки, поэтому события совпадают с удаленным.
+        Возвращает число удаленных строк.
+        '''
+        self._for_write = True
+        connection = connections[self.db]
+        table = connection.ops.quote_name(Cart._meta.db_table)
+        column = connection.ops.quote_name(Cart._meta.pk.column)
+        deleted = 0
+        with transaction.atomic(using=self.db):
+            # Строки блокируются до удаления, чтобы их не изменили между чтением и DELETE
+            rows = list(self.select_for_update().values(*OUTBOX_FIELDS['cart.cart']))
+            pks = [row['id'] for row in rows]
+            with connection.cursor() as cursor:
+                for start in range(0, len(pks), PURGE_BATCH_SIZE):
+                    batch = pks[start:start + PURGE_BATCH_SIZE]
+                    cursor.execute('DELETE FROM %s WHERE %s IN (%s)' % (
+                        table, column, ', '.join(['%s'] * len(batch))), batch)
+                    deleted += cursor.rowcount
+            record_rows(Cart, OutboxEvent.DELETED, rows, using=self.db)
+        invalidate_user_carts({row['user_id'] for row in rows}, using=self.db)
+        return deleted
+
 
 class Cart(models.Model):
     '''Корзина покупок'''
     product = models.ForeignKey(Product, on_delete=models.CASCADE, verbose_name='Товар в корзине')
     user = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name='Пользователь корзины')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Добавлен')
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name='Изменен')
+
+    objects = CartQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Поиск брошенных корзин: последнее изменение корзины пользователя
+            models.Index(fields=['user', 'updated_at'], name='cart_user_activity_idx'),
+        ]
@@ -0,0 +1,30 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.cart.counters import change_cart_count
+from apps.cart.models import Cart
+from apps.cart.snapshots import bump_cart_version, cart_changed
+
+
+@receiver(post_save, sender=Cart)
+def count_added_product(sender, instance, created, using, **kwargs):
+    '''Увеличить счетчик корзины и обновить ее снимок при добавлении товара.
+
+    Счетчик меняется после фиксации транзакции: откат не должен оставить
+    в нем несуществующий товар.
+    '''
+    if created:
+        user_id = instance.user_id
+        transaction.on_commit(lambda: change_cart_count(user_id, 1), using=using)
+        cart_changed(instance, 1)
+    else:
+        bump_cart_version(instance.user_id)
+
+
+@receiver(post_delete, sender=Cart)
+def count_removed_product(sender, instance, using, **kwargs):
+    '''Уменьшить счетчик корзины и обновить ее снимок при удалении товара'''
+    user_id = instance.user_id
+    transaction.on_commit(lambda: change_cart_count(user_id, -1), using=using)
+    cart_changed(instance, -1)
@@ -0,0 +1,170 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+from apps.cart.models import Cart
+from apps.shop.rows import image_url_builder
+from apps.shop.versions import catalog_version, new_version
+
+
+# Сколько хранить снимок корзины
+SNAPSHOT_TIMEOUT = 24 * 60 * 60
+
+
+class CartLine:
+    '''Строка корзины: товар и его количество'''
+    __slots__ = ('product_id', 'name', 'price', 'image_url', 'quantity', 'sale_price',
+                 'sale_cost', 'display_cost')
+
+    def __init__(self, product_id, name, price, image_url, quantity):
+        self.product_id = product_id
+        self.name = name
+        self.price = price
+        self.image_url = image_url
+        self.quantity = quantity
+        self.sale_price = price
+        self.sale_cost = self.cost
+        self.display_cost = None
+
+    @property
+    def cost(self):
+        '''Стоимость строки'''
+        return self.price * self.quantity
+
+    def __repr__(self):
+        '''Отладочное представление'''
+        return '<CartLine: %s x %d>' % (self.name, self.quantity)
+
+
+def cart_version_key(user_id):
+    '''Ключ кеша с версией корзины пользователя'''
+    return 'cart:version:%s' % user_id
+
+
+def snapshot_key(user_id):
+    '''Ключ кеша со снимком корзины пользователя'''
+    return 'cart:snapshot:%s' % user_id
+
+
+def cart_version(user_id):
+    '''Версия корзины пользователя: меняется при каждом ее изменении'''
+    version = cache.get(cart_version_key(user_id))
+    if version is None:
+        version = bump_cart_version(user_id)
+    return version
+
+
+def bump_cart_version(user_id):
+    '''Отметить изменение корзины пользователя'''
+    version = new_version()
+    cache.set(cart_version_key(user_id), version, None)
+    return version
+
+
+def empty_snapshot(version=None, catalog=None):
+    '''Снимок пустой корзины'''
+    return {'version': version, 'catalog': catalog, 'lines': {}, 'count': 0, 'total': 0}
+
+
+def build_snapshot(user_id, version, catalog):
+    '''Снимок корзины по данным БД (одним запросом)'''
+    snapshot = empty_snapshot(version, catalog)
+    rows = (Cart.objects.filter(user_id=user_id)
+            .values('product_id', 'product__name', 'product__price', 'product__image')
+            .annotate(quantity=Count('pk'))
+            .order_by('product_id'))
+    for row in rows:
+        add_line(snapshot, row['product_id'], row['product__name'],
+                 row['product__price'], row['product__image'], row['quantity'])
+    return snapshot
+
+
+def add_line(snapshot, product_id, name, price, image, quantity):
+    '''Добавить товар в снимок (или изменить его количество)'''
+    lines = snapshot['lines']
+    if product_id in lines:
+        name, price, image, current = lines[product_id]
+        quantity += current
+    if quantity > 0:
+        lines[product_id] = (name, price, image, quantity)
+    else:
+        lines.pop(product_id, None)
+
+
+def recount(snapshot):
+    '''Пересчитать итоги снимка по его строкам'''
+    snapshot['count'] = sum(line[3] for line in snapshot['lines'].values())
+    snapshot['total'] = sum(line[1] * line[3] for line in snapshot['lines'].values())
+    return snapshot
+
+
+def get_snapshot(user_id):
+    '''Снимок корзины пользователя.
+
+    Снимок берется из кеша, если он построен для текущих версий корзины
+    и каталога; иначе (промах, устаревшая версия) он строится по БД и
+    сохраняется.
+    '''
+    version = cart_version(user_id)
+    catalog = catalog_version()
+    snapshot = cache.get(snapshot_key(user_id))
+    if snapshot is None or snapshot['version'] != version or snapshot['catalog'] != catalog:
+        snapshot = recount(build_snapshot(user_id, version, catalog))
+        cache.set(snapshot_key(user_id), snapshot, SNAPSHOT_TIMEOUT)
+    return snapshot
+
+
+def cart_lines(snapshot):
+    '''Строки снимка для отображения'''
+    image_url = image_url_builder()
+    return [
+        CartLine(product_id, name, price, image_url(image), quantity)
+        for product_id, (name, price, image, quantity) in sorted(snapshot['lines'].items())
+    ]
+
+
+def apply_change(user_id, previous, version, cart, delta):
+    '''Изменить снимок на delta единиц товара вместо его перестроения.
+
+    previous — версия корзины до изменения, version — версия, выданная
+    при изменении. Снимок меняется, только если он построен для previous
+    и с тех пор корзина не менялась; иначе он лишь объявляется
+    устаревшим и при чтении строится заново по БД. Версия меняется еще
+    раз, чтобы устарел и снимок, построенный до фиксации транзакции.
+    '''
+    key = snapshot_key(user_id)
+    snapshot = cache.get(key)
+    current = cache.get(cart_version_key(user_id))
+    new = bump_cart_version(user_id)
+    if snapshot is None or snapshot['version'] != previous or current != version:
+        return
+    if cart.product_id in snapshot['lines']:
+        add_line(snapshot, cart.product_id, None, None, None, delta)
+    elif delta > 0:
+        product = cart.product
+        add_line(snapshot, product.pk, product.name, product.price, product.image.name, delta)
+    else:
+        # Удален товар, которого нет в снимке: снимок не соответствует БД
+        return
+    snapshot['version'] = new
+    cache.set(key, recount(snapshot), SNAPSHOT_TIMEOUT)
+
+
+def cart_changed(cart, delta):
+    '''Учесть изменение корзины: сменить версию и обновить снимок.
+
+    Версия меняется сразу, поэтому до фиксации транзакции снимок
+    считается устаревшим. Сам снимок обновляется после фиксации, чтобы
+    откат транзакции не оставил в кеше несуществующий товар.
+    '''
+    user_id = cart.user_id
+    previous = cart_version(user_id)
+    version = bump_cart_version(user_id)
+    transaction.on_commit(
+        lambda: apply_change(user_id, previous, version, cart, delta))
+
+
+def invalidate_carts(user_ids):
+    '''Считать снимки корзин пользователей устаревшими (массовые изменения)'''
+    for user_id in set(user_ids):
+        bump_cart_version(user_id)
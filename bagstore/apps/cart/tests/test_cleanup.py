@@ -0,0 +1,120 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from apps.cart.counters import get_cart_count
+from apps.cart.models import Cart, CartQuerySet
+from apps.shop.models import Product
+from apps.shop.tests.fixtures import uploaded_image
+
+
+User = get_user_model()
+
+
+class CleanupCartsTest(TestCase):
+    '''Тест удаления брошенных корзин'''
+
+    @classmethod
+    def setUpTestData(cls):
+        '''Общие данные для всех тестов класса'''
+        cls.bill = User.objects.create(username='Bill', email='bill@example.com')
+        cls.edith = User.objects.create(username='Edith', email='edith@example.com')
+        cls.product = Product.objects.create(name='Сумка', price=1590, image=uploaded_image())
+
+    def setUp(self):
+        '''Установка перед тестированием'''
+        cache.clear()
+        long_ago = timezone.now() - timedelta(days=120)
+        # У Билла корзина брошена, Эдит недавно добавила товар
+        Cart.objects.create(product=self.product, user=self.bill)
+        Cart.objects.create(product=self.product, user=self.edith)
+        Cart.objects.create(product=self.product, user=self.edith)
+        Cart.objects.update(updated_at=long_ago)
+        Cart.objects.filter(pk=Cart.objects.filter(user=self.edith).first().pk).update(
+            updated_at=timezone.now())
+
+    def cleanup(self, *args):
+        '''Запустить команду и вернуть ее вывод'''
+        out = StringIO()
+        call_command('cleanup_carts', '--no-compact', '--batch-size=1', *args, stdout=out)
+        return out.getvalue()
+
+    def test_only_abandoned_carts_are_deleted(self):
+        '''Тест: удаляются только корзины неактивных пользователей'''
+        self.cleanup()
+
+        self.assertFalse(Cart.objects.filter(user=self.bill).exists())
+        self.assertEqual(Cart.objects.filter(user=self.edith).count(), 2)
+
+    def test_dry_run_deletes_nothing(self):
+        '''Тест: пробный запуск ничего не удаляет'''
+        output = self.cleanup('--dry-run')
+
+        self.assertIn('1 (пользователей: 1)', output)
+        self.assertEqual(Cart.objects.count(), 3)
+
+    def test_deleted_carts_are_archived(self):
+        '''Тест: удаленные корзины записываются в архив'''
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'carts.jsonl')
+            self.cleanup('--archive', path)
+            with open(path, encoding='utf-8') as archive:
+                rows = [json.loads(line) for line in archive]
+
+        self.assertEqual([row['user_id'] for row in rows], [self.bill.pk])
+
+    def test_cart_counter_is_reset(self):
+        '''Тест: счетчик корзины пересчитывается после удаления'''
+        self.assertEqual(get_cart_count(self.bill.pk), 1)
+
+        self.cleanup()
+
+        self.assertEqual(get_cart_count(self.bill.pk), 0)
+
+    def test_cart_changed_after_selection_is_kept(self):
+        '''Тест: корзина, измененная между выборкой и удалением, не удаляется'''
+        purge = CartQuerySet.purge
+
+        def touch_then_purge(queryset):
+            Cart.objects.filter(user=self.bill).update(updated_at=timezone.now())
+            return purge(queryset)
+
+        with mock.patch.object(CartQuerySet, 'purge', autospec=True,
+                               side_effect=touch_then_purge):
+            output = self.cleanup()
+
+        self.assertTrue(Cart.objects.filter(user=self.bill).exists())
+        self.assertIn('Удалено строк корзин: 0', output)
+
+    def test_purge_deletes_in_batches(self):
+        '''Тест: purge удаляет строки порциями запросов и возвращает их число'''
+        with mock.patch('apps.cart.models.PURGE_BATCH_SIZE', 1):
+            deleted = Cart.objects.filter(user=self.edith).purge()
+
+        self.assertEqual(deleted, 2)
+        self.assertEqual(list(Cart.objects.values_list('user_id', flat=True)), [self.bill.pk])
+
+
+class CompactCartsTest(TransactionTestCase):
+    '''Тест сжатия таблицы корзин после удаления'''
+
+    def test_table_is_compacted_after_deletion(self):
+        '''Тест: после удаления выполняется VACUUM'''
+        user = User.objects.create(username='Bill', email='bill@example.com')
+        product = Product.objects.create(name='Сумка', price=1590, image=uploaded_image())
+        Cart.objects.create(product=product, user=user)
+        out = StringIO()
+
+        call_command('cleanup_carts', '--days=0', stdout=out)
+
+        self.assertEqual(Cart.objects.count(), 0)
+        self.assertIn('Обслуживание таблицы', out.getvalue())
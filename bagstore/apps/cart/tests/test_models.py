@@ -1,37 +1,29 @@
-import os
 import time
 
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
 
 from apps.cart.models import Cart
 from apps.shop.models import Product
+from apps.shop.tests.fixtures import uploaded_image
 
 User = get_user_model()
 
 class CartModelTest(TestCase):
     '''Тест модели корзины'''
 
-    def setUp(self):
-        '''Установка перед тестированием'''
-        self.image = SimpleUploadedFile(
-            name='test_image.jpg',
-            content=open(
-                'bagstore/media_for_tests/woman.png', 'rb').read(),
-            content_type='image/jpeg'
-        )
-        self.user = User.objects.create(
+    @classmethod
+    def setUpTestData(cls):
+        '''Общие данные для всех тестов класса'''
+        cls.user = User.objects.create(
             username='Bill',
             email='bill@example.com'
         )
 
-    def tearDown(self):
-        '''Удаление параметров тестирования'''
-        for product in Product.objects.all():
-            if product is not None:
-                os.remove(product.image.path)
+    def setUp(self):
+        '''Установка перед тестированием'''
+        self.image = uploaded_image('test_image.jpg')
     
     def test_cart_is_related_to_cart(self):
         '''Тест: связь продукта с корзиной'''
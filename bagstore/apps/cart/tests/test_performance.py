@@ -0,0 +1,44 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.cart.models import Cart
+from apps.shop.models import Product
+from apps.shop.tests.performance import ViewCostMixin
+
+
+User = get_user_model()
+IMAGE = 'shop/product_photo/performance.png'
+
+
+class CartPerformanceTest(ViewCostMixin, TestCase):
+    '''Тест стоимости страницы корзины при разном объеме данных'''
+
+    @classmethod
+    def setUpTestData(cls):
+        '''Общие данные для всех тестов класса'''
+        cls.user = User.objects.create(username='Bill', email='bill@example.com')
+
+    def setUp(self):
+        '''Установка перед тестированием'''
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def populate(self, size):
+        '''Довести количество товаров в корзине до size'''
+        existing = Cart.objects.filter(user=self.user).count()
+        products = Product.objects.bulk_create(
+            (Product(name='Сумка %d' % number, price=1000 + number, image=IMAGE)
+             for number in range(existing, size)),
+            batch_size=1000,
+        )
+        Cart.objects.bulk_create(
+            (Cart(product=product, user=self.user) for product in products),
+            batch_size=1000,
+        )
+
+    def test_cart_page_cost_does_not_grow_with_cart_size(self):
+        '''Тест: число запросов страницы корзины не зависит от числа товаров в ней'''
+        self.assertQueriesDoNotGrow(reverse('cart'), self.populate,
+                                    max_queries=6, max_response_time=5)
@@ -0,0 +1,135 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from apps.cart.models import Cart
+from apps.shop.models import Evaluation, Product
+from apps.shop.tests.fixtures import uploaded_image
+from bagstore import ratelimit
+
+
+User = get_user_model()
+
+
+class RateCounterTest(SimpleTestCase):
+    '''Тест счетчика запросов'''
+
+    def setUp(self):
+        '''Установка перед тестированием'''
+        cache.clear()
+
+    def test_burst_up_to_the_rate_is_allowed(self):
+        '''Тест: разрешено не больше заданного числа запросов за период'''
+        results = [ratelimit.hit(['test:burst'], '3/m') for _ in range(4)]
+
+        self.assertEqual(results[:3], [0, 0, 0])
+        self.assertGreater(results[3], 0)
+        self.assertLessEqual(results[3], 90)
+
+    def test_no_double_burst_at_window_boundary(self):
+        '''Тест: на границе окон нельзя сделать больше запросов, чем разрешено за период'''
+        with mock.patch('bagstore.ratelimit.time.time', return_value=119.0):
+            self.assertEqual([ratelimit.hit(['test:edge'], '3/m') for _ in range(3)], [0, 0, 0])
+        with mock.patch('bagstore.ratelimit.time.time', return_value=121.0):
+            self.assertAlmostEqual(ratelimit.hit(['test:edge'], '3/m'), 39, delta=0.1)
+        with mock.patch('bagstore.ratelimit.time.time', return_value=161.0):
+            self.assertEqual(ratelimit.hit(['test:edge'], '3/m'), 0)
+
+    def test_request_is_charged_to_every_key(self):
+        '''Тест: запрос отклоняется, если превышен лимит любого из ключей'''
+        self.assertEqual(ratelimit.hit(['test:ip', 'test:first'], '2/m'), 0)
+        self.assertEqual(ratelimit.hit(['test:ip', 'test:second'], '2/m'), 0)
+
+        self.assertGreater(ratelimit.hit(['test:ip', 'test:third'], '2/m'), 0)
+        self.assertEqual(ratelimit.hit(['test:other-ip', 'test:third'], '2/m'), 0)
+
+    def test_falls_back_to_process_memory_when_cache_fails(self):
+        '''Тест: при сбое кеша используется память процесса'''
+        broken = mock.Mock()
+        broken.get_many.side_effect = ConnectionError
+        broken.incr.side_effect = ConnectionError
+        broken.add.side_effect = ConnectionError
+
+        with mock.patch.object(ratelimit, 'caches', {ratelimit.backend.alias: broken}):
+            results = [ratelimit.hit(['test:fallback'], '1/m') for _ in range(2)]
+
+        self.assertEqual(results[0], 0)
+        self.assertGreater(results[1], 0)
+
+
+class ClientAddressTest(SimpleTestCase):
+    '''Тест определения IP-адреса клиента'''
+
+    def get_ip(self, remote, forwarded):
+        '''Адрес клиента для запроса от remote с X-Forwarded-For: forwarded'''
+        request = RequestFactory().post('/', REMOTE_ADDR=remote,
+                                        HTTP_X_FORWARDED_FOR=forwarded)
+        return ratelimit.client_ip(request)
+
+    @override_settings(TRUSTED_PROXIES=[])
+    def test_forwarded_header_is_ignored_without_trusted_proxies(self):
+        '''Тест: без доверенных прокси заголовок X-Forwarded-For не учитывается'''
+        self.assertEqual(self.get_ip('203.0.113.5', '198.51.100.1'), '203.0.113.5')
+
+    @override_settings(TRUSTED_PROXIES=['127.0.0.1', '10.0.0.0/8'])
+    def test_client_address_behind_trusted_proxies(self):
+        '''Тест: за доверенными прокси берется первый недоверенный адрес справа'''
+        self.assertEqual(self.get_ip('127.0.0.1', '1.2.3.4, 198.51.100.1, 10.0.0.7'),
+                         '198.51.100.1')
+        self.assertEqual(self.get_ip('203.0.113.5', '198.51.100.1'), '203.0.113.5')
+
+
+class RateLimitedViewsTest(TestCase):
+    '''Тест ограничения частоты изменения корзины и оценок'''
+
+    @classmethod
+    def setUpTestData(cls):
+        '''Общие данные для всех тестов класса'''
+        cls.user = User.objects.create(username='Bill', email='bill@example.com')
+        cls.product = Product.objects.create(name='Сумка', price=1590, image=uploaded_image())
+
+    def setUp(self):
+        '''Установка перед тестированием'''
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_too_many_cart_additions_are_rejected(self):
+        '''Тест: слишком частое добавление в корзину отклоняется с 429'''
+        with mock.patch('bagstore.ratelimit.parse_rate', return_value=(2, 60)):
+            responses = [self.client.post(reverse('cart_add', args=[self.product.pk]))
+                         for _ in range(3)]
+
+        self.assertEqual(responses[2].status_code, 429)
+        self.assertIn('Retry-After', responses[2])
+        self.assertEqual(Cart.objects.count(), 2)
+
+    def test_accounts_sharing_an_ip_share_its_limit(self):
+        '''Тест: смена учетной записи не обходит лимит IP-адреса'''
+        other = User.objects.create(username='Edith', email='edith@example.com')
+        url = reverse('cart_add', args=[self.product.pk])
+
+        with mock.patch('bagstore.ratelimit.parse_rate', return_value=(2, 60)):
+            statuses = [self.client.post(url).status_code for _ in range(2)]
+            self.client.force_login(other)
+            statuses.append(self.client.post(url).status_code)
+
+        self.assertEqual(statuses, [302, 302, 429])
+        self.assertFalse(Cart.objects.filter(user=other).exists())
+
+    def test_user_can_rate_a_product(self):
+        '''Тест: пользователь может оценить товар'''
+        self.client.post(reverse('product_rate', args=[self.product.pk]), {'evaluation': 4})
+        self.client.post(reverse('product_rate', args=[self.product.pk]), {'evaluation': 5})
+
+        self.assertEqual(Evaluation.objects.get(product=self.product).evaluation, 5)
+
+    def test_invalid_evaluation_is_rejected(self):
+        '''Тест: оценку вне диапазона поставить нельзя'''
+        response = self.client.post(reverse('product_rate', args=[self.product.pk]),
+                                    {'evaluation': 7})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Evaluation.objects.count(), 0)
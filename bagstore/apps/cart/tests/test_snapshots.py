@@ -0,0 +1,97 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from apps.cart.models import Cart
+from apps.cart.snapshots import cart_version, get_snapshot, snapshot_key
+from apps.shop.models import Product
+from apps.shop.tests.fixtures import uploaded_image
+
+
+User = get_user_model()
+
+
+class CartSnapshotTest(TestCase):
+    '''Тест снимков корзин'''
+
+    @classmethod
+    def setUpTestData(cls):
+        '''Общие данные для всех тестов класса'''
+        image = uploaded_image()
+        cls.user = User.objects.create(username='Bill', email='bill@example.com')
+        cls.bag = Product.objects.create(name='Сумка', price=1590, image=image)
+        cls.wallet = Product.objects.create(name='Кошелек', price=990, image=image)
+
+    def setUp(self):
+        '''Установка перед тестированием'''
+        cache.clear()
+
+    def add(self, product):
+        '''Добавить товар в корзину с фиксацией транзакции'''
+        with self.captureOnCommitCallbacks(execute=True):
+            return Cart.objects.create(product=product, user=self.user)
+
+    def test_snapshot_is_built_from_the_database(self):
+        '''Тест: снимок содержит количества и итоги корзины'''
+        Cart.objects.create(product=self.bag, user=self.user)
+        Cart.objects.create(product=self.bag, user=self.user)
+        Cart.objects.create(product=self.wallet, user=self.user)
+
+        snapshot = get_snapshot(self.user.pk)
+
+        self.assertEqual(snapshot['lines'][self.bag.pk][3], 2)
+        self.assertEqual(snapshot['count'], 3)
+        self.assertEqual(snapshot['total'], 2 * 1590 + 990)
+
+    def test_changes_update_the_snapshot_without_queries(self):
+        '''Тест: изменения корзины обновляют снимок без обращения к БД'''
+        self.add(self.bag)
+        get_snapshot(self.user.pk)
+
+        self.add(self.wallet)
+        cart = self.add(self.bag)
+        with self.captureOnCommitCallbacks(execute=True):
+            cart.delete()
+
+        with self.assertNumQueries(0):
+            snapshot = get_snapshot(self.user.pk)
+        self.assertEqual(snapshot['count'], 2)
+        self.assertEqual(snapshot['total'], 1590 + 990)
+
+    def test_stale_snapshot_falls_back_to_the_database(self):
+        '''Тест: снимок устаревшей версии перестраивается по БД'''
+        self.add(self.bag)
+        snapshot = get_snapshot(self.user.pk)
+        cache.set(snapshot_key(self.user.pk), dict(snapshot, version='old'))
+
+        with self.assertNumQueries(1):
+            snapshot = get_snapshot(self.user.pk)
+        self.assertEqual(snapshot['version'], cart_version(self.user.pk))
+        self.assertEqual(snapshot['count'], 1)
+
+    def test_uncommitted_change_makes_the_snapshot_stale(self):
+        '''Тест: до фиксации транзакции снимок считается устаревшим'''
+        get_snapshot(self.user.pk)
+
+        Cart.objects.create(product=self.bag, user=self.user)
+
+        self.assertEqual(get_snapshot(self.user.pk)['count'], 1)
+
+    def test_price_change_rebuilds_the_snapshot(self):
+        '''Тест: изменение цены товара перестраивает снимок'''
+        self.add(self.bag)
+        get_snapshot(self.user.pk)
+
+        self.bag.price = 1990
+        self.bag.save()
+
+        self.assertEqual(get_snapshot(self.user.pk)['total'], 1990)
+
+    def test_bulk_create_makes_the_snapshot_stale(self):
+        '''Тест: массовое добавление в корзину сбрасывает снимок'''
+        get_snapshot(self.user.pk)
+
+        Cart.objects.bulk_create([Cart(product=self.bag, user=self.user),
+                                  Cart(product=self.wallet, user=self.user)])
+
+        self.assertEqual(get_snapshot(self.user.pk)['count'], 2)
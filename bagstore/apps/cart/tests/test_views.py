@@ -1,12 +1,14 @@
-import os
 
 from django.contrib.auth import get_user_model
-from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import transaction
+from django.test import RequestFactory, TestCase
 from django.urls import reverse
 
+from apps.cart.context_processors import cart as cart_context
 from apps.cart.models import Cart
 from apps.shop.models import Product
+from apps.shop.tests.fixtures import uploaded_image
 
 
 User = get_user_model()
@@ -15,25 +17,20 @@ User = get_user_model()
 class CartPageTest(TestCase):
     '''Тест страницы корзины'''
 
-    def setUp(self):
-        '''Установка перед тестированием'''  
-        self.image = SimpleUploadedFile(
-            name='test_first_image.jpg',
-            content=open(
-                'bagstore/media_for_tests/woman.png', 'rb').read(),
-            content_type='image/jpeg'
-        )
-        self.user = User.objects.create(
+    @classmethod
+    def setUpTestData(cls):
+        '''Общие данные для всех тестов класса'''
+        cls.user = User.objects.create(
             username='Bill',
             email='bill@example.com'
         )
-    
-    def tearDown(self):
-        '''Удаление параметров тестирования'''
-        for product in Product.objects.all():
-            if product is not None:
-                os.remove(product.image.path)
 
+    def setUp(self):
+        '''Установка перед тестированием'''
+        cache.clear()
+        self.image = uploaded_image('test_first_image.jpg')
+        self.client.force_login(self.user)
+    
     def test_cart_page_template(self):
         '''Тест: используется шаблон для страницы корзины'''
         response = self.client.get(reverse('cart'))
@@ -62,10 +59,10 @@ class CartPageTest(TestCase):
             user=self.user
         )
 
-        carts = Cart.objects.all()
         response = self.client.get(reverse('cart'))
 
-        self.assertEqual(list(response.context['cart_list']), list(carts))
+        self.assertEqual([line.product_id for line in response.context['line_list']],
+                         [product1.pk, product2.pk])
 
     def test_the_cart_template_displays_all_the_users_products(self):
         '''Тест: в шаблоне корзины отображаются все продукты пользователя'''
@@ -96,5 +93,95 @@ class CartPageTest(TestCase):
 
     def test_the_user_does_not_see_someone_else_cart(self):
         '''Тест: пользователь не видит чужой корзины'''
-        self.fail('Доделать тест!')
-        
\ No newline at end of file
+        product = Product.objects.create(
+            name="Чужая сумка",
+            price=1250,
+            image=self.image
+        )
+        edith = User.objects.create(
+            username='Edith',
+            email='edith@example.com'
+        )
+        Cart.objects.create(
+            product=product,
+            user=edith
+        )
+
+        response = self.client.get(reverse('cart'))
+
+        self.assertEqual(response.context['line_list'], [])
+        self.assertNotContains(response, 'Чужая сумка')
+
+
+class CartChangeTest(TestCase):
+    '''Тест добавления и удаления товаров в корзине'''
+
+    @classmethod
+    def setUpTestData(cls):
+        '''Общие данные для всех тестов класса'''
+        cls.user = User.objects.create(
+            username='Bill',
+            email='bill@example.com'
+        )
+        cls.product = Product.objects.create(
+            name="Сумка 1",
+            price=1250,
+            image=uploaded_image('test_first_image.jpg')
+        )
+
+    def setUp(self):
+        '''Установка перед тестированием'''
+        cache.clear()
+
+    def test_anonymous_user_cannot_add_products(self):
+        '''Тест: анонимный пользователь не может добавить товар в корзину'''
+        response = self.client.post(reverse('cart_add', args=[self.product.pk]))
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Cart.objects.count(), 0)
+
+    def test_user_can_add_and_remove_products(self):
+        '''Тест: пользователь может добавить и удалить товар'''
+        self.client.force_login(self.user)
+
+        self.client.post(reverse('cart_add', args=[self.product.pk]))
+        self.client.post(reverse('cart_add', args=[self.product.pk]))
+        self.client.post(reverse('cart_remove', args=[self.product.pk]))
+
+        self.assertEqual(Cart.objects.filter(user=self.user).count(), 1)
+
+    def test_badge_shows_the_number_of_products(self):
+        '''Тест: значок корзины показывает количество товаров'''
+        self.client.force_login(self.user)
+        self.client.post(reverse('cart_add', args=[self.product.pk]))
+        self.client.post(reverse('cart_add', args=[self.product.pk]))
+
+        response = self.client.get(reverse('cart'))
+
+        self.assertContains(response, '<span class="cart_badge">2</span>', html=True)
+        self.assertEqual(self.client.get(reverse('visitor_fragment')).json()['cart_count'], 2)
+
+    def test_badge_is_served_from_cache(self):
+        '''Тест: при попадании в кеш значок не обращается к БД'''
+        Cart.objects.create(product=self.product, user=self.user)
+        request = RequestFactory().get('/')
+        request.user = self.user
+
+        self.assertEqual(cart_context(request)['cart_count'], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            Cart.objects.create(product=self.product, user=self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(cart_context(request)['cart_count'], 2)
+
+    def test_badge_ignores_rolled_back_changes(self):
+        '''Тест: отмененное добавление товара не меняет счетчик'''
+        request = RequestFactory().get('/')
+        request.user = self.user
+        self.assertEqual(cart_context(request)['cart_count'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                Cart.objects.create(product=self.product, user=self.user)
+                transaction.set_rollback(True)
+        self.assertEqual(cart_context(request)['cart_count'], 0)
+
@@ -6,6 +6,9 @@ from bagstore import settings
 
 urlpatterns = [
     re_path(r'^$', views.CartPageView.as_view(), name='cart'),
+    re_path(r'^add/(?P<product_id>\d+)/$', views.CartAddView.as_view(), name='cart_add'),
+    re_path(r'^remove/(?P<product_id>\d+)/$', views.CartRemoveView.as_view(),
+            name='cart_remove'),
 ]
 
 if settings.DEBUG:
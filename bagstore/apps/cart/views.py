@@ -1,9 +1,95 @@
-from django.views.generic import ListView
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import transaction
+from django.shortcuts import get_object_or_404, redirect
+from django.utils.decorators import method_decorator
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_cookie
+from django.views.generic import TemplateView, View
 
 from apps.cart.models import Cart
+from apps.cart.snapshots import cart_lines, cart_version, empty_snapshot, get_snapshot
+from apps.currency.rates import set_display_prices, visitor_currency
+from apps.shop.models import Product
+from apps.shop.recommendations import recommendations_for_products
+from apps.promotions.engine import apply_to_rows, price_cart
+from apps.shop.versions import catalog_state, visitor_etag
+from bagstore.ratelimit import ratelimit
 
-class CartPageView(ListView):
-    '''Отображение корзины'''
-    model = Cart
+# Допустимая частота изменений корзины для одного пользователя и IP
+CART_CHANGE_RATE = '30/m'
+
+def cart_page_etag(request, *args, **kwargs):
+    '''ETag страницы корзины по версиям корзины пользователя и каталога'''
+    version = cart_version(request.user.pk) if request.user.is_authenticated else ''
+    return '%s-%s-%s' % (version, catalog_state(), visitor_etag(request))
+
+@method_decorator(condition(etag_func=cart_page_etag), name='get')
+@method_decorator(cache_control(private=True), name='dispatch')
+@method_decorator(vary_on_cookie, name='dispatch')
+class CartPageView(TemplateView):
+    '''Отображение корзины пользователя.
+
+    Строки и итоги берутся из снимка корзины в кеше, а не из БД;
+    скидки применяются ко всем строкам одним проходом.
+    '''
     template_name = 'cart.html'
-    
\ No newline at end of file
+
+    def get_snapshot(self):
+        '''Снимок корзины текущего пользователя'''
+        if not self.request.user.is_authenticated:
+            return empty_snapshot()
+        return get_snapshot(self.request.user.pk)
+
+    def get_context_data(self, **kwargs):
+        '''Строки и итоги корзины и рекомендации к ее товарам'''
+        context = super().get_context_data(**kwargs)
+        snapshot = self.get_snapshot()
+        currency = visitor_currency(self.request)
+        lines = cart_lines(snapshot)
+        subtotal, discount, total = price_cart(lines)
+        context['line_list'] = set_display_prices(lines, currency,
+                                                  source='sale_cost', target='display_cost')
+        context['cart_discount'] = currency.format(discount) if discount else ''
+        context['cart_total'] = currency.format(total)
+        context['recommendation_list'] = set_display_prices(
+            apply_to_rows(recommendations_for_products(snapshot['lines'])), currency,
+            source='sale_price')
+        return context
+
+@method_decorator(ratelimit(CART_CHANGE_RATE, scope='cart'), name='dispatch')
+class CartChangeView(LoginRequiredMixin, View):
+    '''Базовое представление изменения корзины.
+
+    Подклассы определяют change(request, product) — само изменение.
+    '''
+    http_method_names = ['post']
+
+    def post(self, request, product_id):
+        '''Изменить корзину и вернуться на предыдущую страницу'''
+        product = get_object_or_404(Product, pk=product_id)
+        # Изменение и событие outbox о нем фиксируются одной транзакцией
+        with transaction.atomic():
+            self.change(request, product)
+        next_url = request.POST.get('next')
+        if next_url and url_has_allowed_host_and_scheme(
+                next_url, allowed_hosts={request.get_host()}):
+            return redirect(next_url)
+        return redirect('cart')
+
+class CartAddView(CartChangeView):
+    '''Добавление товара в корзину'''
+
+    def change(self, request, product):
+        '''Добавить товар в корзину'''
+        Cart.objects.create(product=product, user=request.user)
+
+class CartRemoveView(CartChangeView):
+    '''Удаление товара из корзины'''
+
+    def change(self, request, product):
+        '''Удалить одну единицу товара из корзины'''
+        cart = Cart.objects.filter(product=product, user=request.user).first()
+        if cart is not None:
+            cart.delete()
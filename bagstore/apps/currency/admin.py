@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from apps.currency.models import Currency
+
+
+@admin.register(Currency)
+class CurrencyAdmin(admin.ModelAdmin):
+    '''Администрирование валют и курсов'''
+    list_display = ('code', 'name', 'symbol', 'rate', 'decimals', 'is_active', 'updated_at')
+    list_editable = ('rate', 'is_active')
+    search_fields = ('^code', 'name')
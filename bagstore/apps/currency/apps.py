@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class CurrencyConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.currency'
+
+    def ready(self):
+        from apps.currency import signals  # noqa: F401
@@ -0,0 +1,11 @@
+from django.utils.functional import SimpleLazyObject
+
+from apps.currency.rates import get_currencies, visitor_currency
+
+
+def currency(request):
+    '''Валюта посетителя и список валют для переключателя'''
+    return {
+        'currency': SimpleLazyObject(lambda: visitor_currency(request)),
+        'currency_list': SimpleLazyObject(lambda: list(get_currencies().values())),
+    }
@@ -0,0 +1,69 @@
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.currency.models import MIN_RATE, Currency
+
+
+def parse_rates(data):
+    '''Описания валют из JSON: код -> поля модели.
+
+    Значение — либо курс (строка или число), либо объект с полями
+    rate, name, symbol и decimals.
+    '''
+    if not isinstance(data, dict):
+        raise ValueError('Ожидается объект вида {"USD": {"rate": "0.0108", ...}}')
+    currencies = {}
+    for code, value in data.items():
+        fields = dict(value) if isinstance(value, dict) else {'rate': value}
+        try:
+            fields['rate'] = Decimal(str(fields['rate']))
+        except (KeyError, InvalidOperation):
+            raise ValueError('%s: не указан курс или он не является числом' % code)
+        if fields['rate'] < MIN_RATE:
+            raise ValueError('%s: курс должен быть не меньше %s' % (code, MIN_RATE))
+        currencies[code.upper()] = fields
+    return currencies
+
+
+class Command(BaseCommand):
+    '''Загрузка курсов валют из файла'''
+    help = ('Создает и обновляет валюты по JSON-файлу вида '
+            '{"USD": {"name": "Доллар США", "symbol": "$", "rate": "0.0108"}}; '
+            'для существующих валют достаточно курса: {"USD": "0.0110"}')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к JSON-файлу с курсами')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], encoding='utf-8') as file:
+                currencies = parse_rates(json.load(file))
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+
+        created = updated = 0
+        with transaction.atomic():
+            existing = Currency.objects.in_bulk(list(currencies), field_name='code')
+            for code, fields in currencies.items():
+                currency = existing.get(code)
+                if currency is None:
+                    if not {'name', 'symbol'} <= fields.keys():
+                        raise CommandError('%s: для новой валюты нужны name и symbol' % code)
+                    currency = Currency(code=code)
+                    created += 1
+                else:
+                    updated += 1
+                for field in ('name', 'symbol', 'rate', 'decimals', 'is_active'):
+                    if field in fields:
+                        setattr(currency, field, fields[field])
+                try:
+                    currency.full_clean()
+                except ValidationError as error:
+                    raise CommandError('%s: %s' % (code, '; '.join(error.messages)))
+                currency.save()
+        self.stdout.write(self.style.SUCCESS(
+            'Валют создано: %d, обновлено: %d' % (created, updated)))
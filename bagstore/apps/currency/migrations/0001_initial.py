@@ -0,0 +1,33 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:46
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Currency',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=3, unique=True, verbose_name='Код ISO 4217')),
+                ('name', models.CharField(max_length=50, verbose_name='Название')),
+                ('symbol', models.CharField(max_length=5, verbose_name='Обозначение')),
+                ('rate', models.DecimalField(decimal_places=8, max_digits=18, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Единиц валюты за 1 ₽')),
+                ('decimals', models.PositiveSmallIntegerField(default=2, verbose_name='Знаков после запятой')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Доступна посетителям')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Курс обновлен')),
+            ],
+            options={
+                'verbose_name': 'Валюта',
+                'verbose_name_plural': 'Валюты',
+                'ordering': ('code',),
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.14 on 2026-10-19 12:23
+
+import django.core.validators
+from decimal import Decimal
+from django.db import migrations, models
+
+
+def disable_zero_rates(apps, schema_editor):
+    '''Скрыть валюты с нулевым курсом: иначе ограничение не добавится'''
+    Currency = apps.get_model('currency', 'Currency')
+    Currency.objects.filter(rate__lte=0).update(rate=Decimal('1E-8'), is_active=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('currency', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='currency',
+            name='rate',
+            field=models.DecimalField(decimal_places=8, max_digits=18, validators=[django.core.validators.MinValueValidator(Decimal('1E-8'))], verbose_name='Единиц валюты за 1 ₽'),
+        ),
+        migrations.RunPython(disable_zero_rates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='currency',
+            constraint=models.CheckConstraint(check=models.Q(('rate__gt', 0)), name='currency_rate_positive'),
+        ),
+    ]
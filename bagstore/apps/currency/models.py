@@ -0,0 +1,34 @@
+from decimal import Decimal
+
+from django.core.validators import MinValueValidator
+from django.db import models
+
+
+# Наименьший курс, который хранится в rate (8 знаков после запятой): нулевой
+# курс показал бы все цены как 0
+MIN_RATE = Decimal('0.00000001')
+
+
+class Currency(models.Model):
+    '''Валюта отображения цен и ее курс к базовой валюте (рублю)'''
+    code = models.CharField(max_length=3, unique=True, verbose_name='Код ISO 4217')
+    name = models.CharField(max_length=50, verbose_name='Название')
+    symbol = models.CharField(max_length=5, verbose_name='Обозначение')
+    rate = models.DecimalField(max_digits=18, decimal_places=8,
+                               validators=[MinValueValidator(MIN_RATE)],
+                               verbose_name='Единиц валюты за 1 ₽')
+    decimals = models.PositiveSmallIntegerField(default=2, verbose_name='Знаков после запятой')
+    is_active = models.BooleanField(default=True, verbose_name='Доступна посетителям')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Курс обновлен')
+
+    class Meta:
+        ordering = ('code',)
+        constraints = [
+            models.CheckConstraint(check=models.Q(rate__gt=0), name='currency_rate_positive'),
+        ]
+        verbose_name = 'Валюта'
+        verbose_name_plural = 'Валюты'
+
+    def __str__(self):
+        '''Строковое представление'''
+        return '%s (%s)' % (self.code, self.symbol)
@@ -0,0 +1,118 @@
+import time
+from decimal import Decimal
+
+from django.conf import settings
+
+from apps.currency.models import Currency
+
+
+# Сколько секунд процесс пользуется загруженными курсами, не обращаясь к БД
+RATES_TIMEOUT = getattr(settings, 'CURRENCY_RATES_TIMEOUT', 300)
+# Cookie с кодом валюты, выбранной посетителем
+CURRENCY_COOKIE = 'currency'
+# Курс хранится с 8 знаками после запятой, поэтому в целых числах
+# он масштабируется на 10 ** 8 без потери точности
+RATE_SCALE = 10 ** 8
+
+
+class CurrencyRate:
+    '''Курс валюты, подготовленный для пересчета цен целыми числами.
+
+    factor — курс, умноженный на 10 ** decimals и RATE_SCALE: цена в
+    рублях переводится в минимальные единицы валюты (центы) одним
+    умножением и целочисленным делением, без Decimal на каждую цену.
+    '''
+    __slots__ = ('code', 'name', 'symbol', 'decimals', 'factor')
+
+    def __init__(self, code, name, symbol, decimals, factor):
+        self.code = code
+        self.name = name
+        self.symbol = symbol
+        self.decimals = decimals
+        self.factor = factor
+
+    @classmethod
+    def from_rate(cls, code, name, symbol, decimals, rate):
+        '''Курс по значению rate (Decimal, строка или число)'''
+        factor = Decimal(rate) * 10 ** decimals * RATE_SCALE
+        return cls(code, name, symbol, decimals, int(factor.to_integral_value()))
+
+    @property
+    def rate(self):
+        '''Курс как число с плавающей точкой (для пересчета в браузере)'''
+        return self.factor / (10 ** self.decimals * RATE_SCALE)
+
+    def convert_many(self, prices):
+        '''Цены в рублях -> цены в минимальных единицах валюты (одним проходом)'''
+        factor, half = self.factor, RATE_SCALE // 2
+        return [(price * factor + half) // RATE_SCALE for price in prices]
+
+    def format_many(self, prices):
+        '''Цены в рублях -> строки для отображения в валюте'''
+        amounts = self.convert_many(prices)
+        symbol, decimals = self.symbol, self.decimals
+        if not decimals:
+            return ['%d %s' % (amount, symbol) for amount in amounts]
+        unit = 10 ** decimals
+        return ['%d.%0*d %s' % (amount // unit, decimals, amount % unit, symbol)
+                for amount in amounts]
+
+    def format(self, price):
+        '''Одна цена в рублях -> строка для отображения в валюте'''
+        return self.format_many((price,))[0]
+
+    def __repr__(self):
+        '''Отладочное представление'''
+        return '<CurrencyRate: %s>' % self.code
+
+
+# Базовая валюта: цены товаров хранятся в рублях
+BASE_CURRENCY = CurrencyRate('RUB', 'Рубль', '₽', 0, RATE_SCALE)
+
+# Курсы, загруженные процессом, и момент, когда они устаревают
+_rates = {'expires': 0, 'currencies': None}
+
+
+def get_currencies():
+    '''Доступные валюты: код -> CurrencyRate.
+
+    Курсы загружаются одним запросом и хранятся в памяти процесса
+    RATES_TIMEOUT секунд. Изменение курса в этом процессе сбрасывает
+    их сразу, в остальных — по истечении срока.
+    '''
+    now = time.monotonic()
+    if _rates['currencies'] is None or now >= _rates['expires']:
+        currencies = {BASE_CURRENCY.code: BASE_CURRENCY}
+        rows = (Currency.objects.filter(is_active=True)
+                .values_list('code', 'name', 'symbol', 'decimals', 'rate'))
+        for code, name, symbol, decimals, rate in rows:
+            currencies[code] = CurrencyRate.from_rate(code, name, symbol, decimals, rate)
+        _rates['currencies'] = currencies
+        _rates['expires'] = now + RATES_TIMEOUT
+    return _rates['currencies']
+
+
+def clear_currencies():
+    '''Забыть загруженные процессом курсы'''
+    _rates['currencies'] = None
+
+
+def get_currency(code):
+    '''Курс валюты по коду; базовая валюта, если код неизвестен'''
+    return get_currencies().get(code, BASE_CURRENCY)
+
+
+def visitor_currency(request):
+    '''Валюта, выбранная посетителем (запоминается на время запроса)'''
+    if not hasattr(request, '_currency'):
+        request._currency = get_currency(request.COOKIES.get(CURRENCY_COOKIE))
+    return request._currency
+
+
+def set_display_prices(rows, currency, source='price', target='display_price'):
+    '''Записать в строки цены для отображения, пересчитав их одним проходом'''
+    rows = list(rows)
+    prices = currency.format_many([getattr(row, source) for row in rows])
+    for row, price in zip(rows, prices):
+        setattr(row, target, price)
+    return rows
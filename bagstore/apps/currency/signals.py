@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.currency.models import Currency
+from apps.currency.rates import clear_currencies
+from apps.shop.versions import bump_catalog_version
+
+
+@receiver(post_save, sender=Currency)
+@receiver(post_delete, sender=Currency)
+def currency_changed(sender, **kwargs):
+    '''Изменение курса сбрасывает курсы процесса и меняет версию каталога'''
+    clear_currencies()
+    bump_catalog_version()
@@ -0,0 +1,14 @@
+from django import template
+
+from apps.currency.rates import BASE_CURRENCY
+
+
+register = template.Library()
+
+
+@register.filter
+def money(price, currency=None):
+    '''Цена в рублях в валюте посетителя: {{ product.price|money:currency }}'''
+    if price in (None, ''):
+        return ''
+    return (currency or BASE_CURRENCY).format(int(price))
@@ -0,0 +1,127 @@
+import json
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError
+from django.test import TestCase
+
+from apps.currency import rates
+from apps.currency.models import Currency
+from apps.currency.rates import BASE_CURRENCY, CurrencyRate, get_currencies, get_currency
+
+
+class CurrencyRateTest(TestCase):
+    '''Тест пересчета цен по курсу'''
+
+    def test_prices_are_converted_to_minor_units(self):
+        '''Тест: цены пересчитываются в центы с округлением'''
+        usd = CurrencyRate.from_rate('USD', 'Доллар США', '$', 2, '0.01085')
+
+        self.assertEqual(usd.convert_many([1000, 1, 0]), [1085, 1, 0])
+
+    def test_prices_are_formatted(self):
+        '''Тест: цены форматируются с нужным числом знаков и обозначением'''
+        usd = CurrencyRate.from_rate('USD', 'Доллар США', '$', 2, Decimal('0.0108'))
+
+        self.assertEqual(usd.format_many([1590, 5]), ['17.17 $', '0.05 $'])
+        self.assertEqual(BASE_CURRENCY.format(1590), '1590 ₽')
+
+
+class CurrencyCacheTest(TestCase):
+    '''Тест курсов, хранимых в памяти процесса'''
+
+    def setUp(self):
+        '''Установка перед тестированием'''
+        rates.clear_currencies()
+        self.addCleanup(rates.clear_currencies)
+        Currency.objects.create(code='USD', name='Доллар США', symbol='$', rate='0.0108')
+
+    def test_rates_are_loaded_once(self):
+        '''Тест: повторное обращение к курсам не выполняет запросов'''
+        get_currencies()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_currency('USD').symbol, '$')
+
+    def test_rates_expire(self):
+        '''Тест: по истечении срока курсы загружаются заново'''
+        get_currencies()
+        Currency.objects.filter(code='USD').update(symbol='US$')
+
+        with mock.patch('apps.currency.rates.time.monotonic',
+                        return_value=rates._rates['expires']):
+            self.assertEqual(get_currency('USD').symbol, 'US$')
+
+    def test_saving_currency_clears_rates(self):
+        '''Тест: изменение курса через модель сразу видно в процессе'''
+        get_currencies()
+        Currency.objects.create(code='EUR', name='Евро', symbol='€', rate='0.0099')
+
+        self.assertEqual(get_currency('EUR').code, 'EUR')
+
+    def test_unknown_code_falls_back_to_base_currency(self):
+        '''Тест: неизвестная и неактивная валюта заменяются рублем'''
+        Currency.objects.create(code='GBP', name='Фунт', symbol='£', rate='0.0086',
+                                is_active=False)
+
+        self.assertIs(get_currency('XXX'), BASE_CURRENCY)
+        self.assertIs(get_currency('GBP'), BASE_CURRENCY)
+
+
+class LoadCurrencyRatesCommandTest(TestCase):
+    '''Тест команды load_currency_rates'''
+
+    def setUp(self):
+        '''Установка перед тестированием'''
+        self.addCleanup(rates.clear_currencies)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'rates.json'
+
+    def load(self, data):
+        '''Записать курсы в файл и загрузить их командой'''
+        self.path.write_text(json.dumps(data), encoding='utf-8')
+        call_command('load_currency_rates', str(self.path), stdout=StringIO())
+
+    def test_currencies_are_created_and_updated(self):
+        '''Тест: новые валюты создаются, у существующих меняется курс'''
+        self.load({'USD': {'name': 'Доллар США', 'symbol': '$', 'rate': '0.0108'}})
+        self.load({'usd': 0.011})
+
+        currency = Currency.objects.get(code='USD')
+        self.assertEqual(currency.rate, Decimal('0.011'))
+        self.assertEqual(currency.symbol, '$')
+
+    def test_new_currency_requires_symbol(self):
+        '''Тест: новая валюта без названия и обозначения не создается'''
+        with self.assertRaises(CommandError):
+            self.load({'EUR': '0.0099'})
+        self.assertFalse(Currency.objects.exists())
+
+    def test_bad_rate_is_rejected(self):
+        '''Тест: курс, не являющийся числом, отклоняется'''
+        with self.assertRaises(CommandError):
+            self.load({'USD': {'name': 'Доллар США', 'symbol': '$', 'rate': 'много'}})
+
+    def test_zero_rate_is_rejected(self):
+        '''Тест: нулевой курс отклоняется, и курс валюты не меняется'''
+        self.load({'USD': {'name': 'Доллар США', 'symbol': '$', 'rate': '0.0108'}})
+
+        for rate in ('0', '0.000000001'):
+            with self.assertRaises(CommandError):
+                self.load({'USD': rate})
+        self.assertEqual(Currency.objects.get(code='USD').rate, Decimal('0.0108'))
+
+    def test_model_requires_positive_rate(self):
+        '''Тест: модель не принимает нулевой курс'''
+        currency = Currency(code='USD', name='Доллар США', symbol='$', rate=0)
+
+        with self.assertRaises(ValidationError):
+            currency.full_clean()
+        with self.assertRaises(IntegrityError):
+            currency.save()
@@ -0,0 +1,101 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.cart.models import Cart
+from apps.currency import rates
+from apps.currency.models import Currency
+from apps.shop.models import Product
+from apps.shop.tests.fixtures import uploaded_image
+
+
+User = get_user_model()
+
+
+class CurrencyDisplayTest(TestCase):
+    '''Тест отображения цен в валюте посетителя'''
+
+    @classmethod
+    def setUpTestData(cls):
+        '''Общие данные для всех тестов класса'''
+        cls.user = User.objects.create(username='Bill', email='bill@example.com')
+        cls.product = Product.objects.create(name='Сумка', price=1590, image=uploaded_image())
+        Currency.objects.create(code='USD', name='Доллар США', symbol='$', rate='0.0108')
+
+    def setUp(self):
+        '''Установка перед тестированием'''
+        cache.clear()
+        rates.clear_currencies()
+        self.addCleanup(rates.clear_currencies)
+
+    def choose(self, code):
+        '''Выбрать валюту через переключатель'''
+        return self.client.post(reverse('set_currency'),
+                                {'currency': code, 'next': reverse('shop')})
+
+    def test_prices_are_shown_in_roubles_by_default(self):
+        '''Тест: без выбора валюты цены показываются в рублях'''
+        response = self.client.get(reverse('shop'))
+
+        self.assertContains(response, '<span class="product_price" data-price="1590">1590 ₽</span>',
+                            html=True)
+
+    def test_chosen_currency_is_sent_to_shop_page_script(self):
+        '''Тест: общая страница магазина остается в рублях, курс выбранной валюты
+        получает скрипт'''
+        response = self.choose('USD')
+        self.assertRedirects(response, reverse('shop'))
+
+        response = self.client.get(reverse('shop'))
+        self.assertContains(response, 'data-price="1590"')
+        currency = self.client.get(reverse('visitor_fragment')).json()['currency']
+        self.assertEqual(currency['code'], 'USD')
+        self.assertAlmostEqual(currency['rate'], 0.0108)
+
+    def test_cart_prices_are_shown_in_chosen_currency(self):
+        '''Тест: строки и итог корзины пересчитываются в выбранную валюту'''
+        Cart.objects.create(product=self.product, user=self.user)
+        Cart.objects.create(product=self.product, user=self.user)
+        self.client.force_login(self.user)
+        self.choose('USD')
+
+        response = self.client.get(reverse('cart'))
+        self.assertContains(response, '<span class="product_cart_price">34.34 $</span>',
+                            html=True)
+        self.assertContains(response, 'Итого: 34.34 $')
+
+    def test_product_page_price_is_converted(self):
+        '''Тест: цена на странице товара пересчитывается'''
+        self.choose('USD')
+
+        response = self.client.get(reverse('product', args=[self.product.pk]))
+        self.assertContains(response, '17.17 $')
+
+    def test_unknown_currency_is_ignored(self):
+        '''Тест: неизвестная валюта не запоминается'''
+        response = self.choose('XXX')
+
+        self.assertNotIn(rates.CURRENCY_COOKIE, response.cookies)
+
+    def test_currency_is_part_of_etag(self):
+        '''Тест: смена валюты меняет ETag страницы'''
+        url = reverse('product', args=[self.product.pk])
+        etag = self.client.get(url)['ETag']
+        self.choose('USD')
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_rate_change_changes_etag(self):
+        '''Тест: изменение курса меняет ETag страниц товаров'''
+        url = reverse('product', args=[self.product.pk])
+        self.choose('USD')
+        etag = self.client.get(url)['ETag']
+        currency = Currency.objects.get(code='USD')
+        currency.rate = '0.0110'
+        currency.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, '17.49 $')
@@ -0,0 +1,7 @@
+from django.urls import re_path
+
+from apps.currency import views
+
+urlpatterns = [
+    re_path(r'^$', views.SetCurrencyView.as_view(), name='set_currency'),
+]
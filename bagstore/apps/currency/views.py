@@ -0,0 +1,25 @@
+from django.shortcuts import redirect
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views.generic import View
+
+from apps.currency.rates import CURRENCY_COOKIE, get_currencies
+
+# Сколько помнить выбор валюты
+CURRENCY_COOKIE_AGE = 365 * 24 * 60 * 60
+
+class SetCurrencyView(View):
+    '''Выбор валюты отображения цен'''
+    http_method_names = ['post']
+
+    def post(self, request):
+        '''Запомнить валюту в cookie и вернуться на предыдущую страницу'''
+        next_url = request.POST.get('next')
+        if not (next_url and url_has_allowed_host_and_scheme(
+                next_url, allowed_hosts={request.get_host()})):
+            next_url = 'shop'
+        response = redirect(next_url)
+        code = request.POST.get('currency')
+        if code in get_currencies():
+            response.set_cookie(CURRENCY_COOKIE, code, max_age=CURRENCY_COOKIE_AGE,
+                                samesite='Lax')
+        return response
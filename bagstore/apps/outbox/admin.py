@@ -0,0 +1,18 @@
+from django.contrib import admin
+
+from apps.outbox.models import OutboxEvent, RelayCheckpoint
+from apps.shop.admin import LargeTableAdmin
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(LargeTableAdmin):
+    '''Просмотр событий outbox'''
+    list_display = ('id', 'topic', 'action', 'object_id', 'created_at')
+    list_filter = ('topic', 'action')
+    readonly_fields = ('topic', 'action', 'object_id', 'payload', 'created_at')
+
+
+@admin.register(RelayCheckpoint)
+class RelayCheckpointAdmin(admin.ModelAdmin):
+    '''Контрольные точки доставки событий'''
+    list_display = ('sink', 'last_event_id', 'updated_at')
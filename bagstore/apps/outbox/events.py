@@ -0,0 +1,51 @@
+from django.db.models.fields.files import FieldFile
+
+from apps.outbox.models import OutboxEvent
+
+
+# Отслеживаемые модели и поля, попадающие в событие
+OUTBOX_FIELDS = {
+    'shop.product': ('id', 'name', 'price', 'image', 'rating', 'rating_count'),
+    'shop.evaluation': ('id', 'product_id', 'user_id', 'evaluation', 'updated_at'),
+    'cart.cart': ('id', 'product_id', 'user_id', 'created_at', 'updated_at'),
+}
+
+
+def payload(instance):
+    '''Данные объекта для события'''
+    data = {}
+    for name in OUTBOX_FIELDS[instance._meta.label_lower]:
+        value = getattr(instance, name)
+        data[name] = value.name if isinstance(value, FieldFile) else value
+    return data
+
+
+def record(instance, action, using=None):
+    '''Записать событие об изменении объекта'''
+    OutboxEvent.objects.using(using or instance._state.db).create(
+        topic=instance._meta.label_lower,
+        action=action,
+        object_id=instance.pk,
+        payload=payload(instance),
+    )
+
+
+def record_rows(model, action, rows, using=None):
+    '''Записать события о массовом изменении одним запросом.
+
+    rows — словари полей объектов (например, из values()).
+    '''
+    topic = model._meta.label_lower
+    fields = OUTBOX_FIELDS[topic]
+    OutboxEvent.objects.using(using).bulk_create(
+        [OutboxEvent(topic=topic, action=action, object_id=row['id'],
+                     payload={name: row[name] for name in fields})
+         for row in rows],
+        batch_size=500,
+    )
+
+
+def record_queryset(queryset, action):
+    '''Записать события обо всех объектах выборки (после массового изменения)'''
+    fields = OUTBOX_FIELDS[queryset.model._meta.label_lower]
+    record_rows(queryset.model, action, queryset.values(*fields), using=queryset.db)
@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.outbox.relay import GAP_TIMEOUT, build_sink, prune_delivered, relay
+
+
+class Command(BaseCommand):
+    '''Доставка событий из outbox получателям'''
+    help = ('Отправляет новые события об изменениях товаров, оценок и корзин '
+            'получателям (jsonl:<файл>, webhook:<URL>) с контрольной точкой для каждого')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sink', action='append', required=True,
+                            help='Получатель: jsonl:<путь> или webhook:<URL> (можно несколько)')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Сколько событий отправлять за раз')
+        parser.add_argument('--gap-timeout', type=float, default=GAP_TIMEOUT,
+                            help='Сколько секунд ждать событий незафиксированных транзакций '
+                                 'с меньшими id')
+        parser.add_argument('--interval', type=float,
+                            help='Работать постоянно, проверяя новые события раз в N секунд')
+        parser.add_argument('--prune', action='store_true',
+                            help='Удалить события, доставленные всем получателям')
+
+    def handle(self, *args, **options):
+        try:
+            sinks = [build_sink(spec) for spec in options['sink']]
+        except (ValueError, OSError) as error:
+            raise CommandError(error)
+
+        try:
+            while True:
+                self.relay_once(sinks, options)
+                if options['interval'] is None:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for sink in sinks:
+                sink.close()
+
+    def relay_once(self, sinks, options):
+        '''Один проход по всем получателям'''
+        for sink in sinks:
+            started = time.monotonic()
+            try:
+                delivered = relay(sink, options['batch_size'], options['gap_timeout'])
+            except Exception as error:
+                # Остальные получатели не должны ждать недоступного
+                self.stderr.write('%s: ошибка доставки: %s' % (sink.name, error))
+                continue
+            if delivered:
+                self.stdout.write('%s: доставлено событий: %d за %.2f с' % (
+                    sink.name, delivered, time.monotonic() - started))
+        if options['prune']:
+            pruned = prune_delivered()
+            if pruned:
+                self.stdout.write('Удалено доставленных событий: %d' % pruned)
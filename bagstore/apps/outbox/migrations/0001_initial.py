@@ -0,0 +1,36 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:36
+
+import django.core.serializers.json
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic', models.CharField(max_length=50, verbose_name='Модель')),
+                ('action', models.CharField(choices=[('created', 'Создание'), ('updated', 'Изменение'), ('deleted', 'Удаление')], max_length=10, verbose_name='Действие')),
+                ('object_id', models.BigIntegerField(verbose_name='Идентификатор объекта')),
+                ('payload', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Данные объекта')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата события')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RelayCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sink', models.CharField(max_length=255, unique=True, verbose_name='Получатель')),
+                ('last_event_id', models.BigIntegerField(default=0, verbose_name='Последнее доставленное событие')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата доставки')),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-19 12:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('outbox', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='relaycheckpoint',
+            name='pending',
+            field=models.JSONField(default=dict, verbose_name='Ожидаемые события'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+
+class OutboxEvent(models.Model):
+    '''Событие об изменении данных для внешних потребителей.
+
+    Записывается в той же транзакции, что и само изменение, поэтому
+    событие есть тогда и только тогда, когда изменение зафиксировано.
+    '''
+    CREATED = 'created'
+    UPDATED = 'updated'
+    DELETED = 'deleted'
+    ACTIONS = [
+        (CREATED, 'Создание'),
+        (UPDATED, 'Изменение'),
+        (DELETED, 'Удаление'),
+    ]
+
+    topic = models.CharField(max_length=50, verbose_name='Модель')
+    action = models.CharField(max_length=10, choices=ACTIONS, verbose_name='Действие')
+    object_id = models.BigIntegerField(verbose_name='Идентификатор объекта')
+    payload = models.JSONField(encoder=DjangoJSONEncoder, verbose_name='Данные объекта')
+    created_at = models.DateTimeField(default=timezone.now, verbose_name='Дата события')
+
+    def __str__(self):
+        '''Строковое представление'''
+        return '%s %s #%s' % (self.topic, self.action, self.object_id)
+
+    def as_message(self):
+        '''Сообщение для доставки потребителю'''
+        return {
+            'id': self.pk,
+            'topic': self.topic,
+            'action': self.action,
+            'object_id': self.object_id,
+            'payload': self.payload,
+            'created_at': self.created_at.isoformat(),
+        }
+
+
+class RelayCheckpoint(models.Model):
+    '''Последнее событие, доставленное получателю'''
+    sink = models.CharField(max_length=255, unique=True, verbose_name='Получатель')
+    last_event_id = models.BigIntegerField(default=0, verbose_name='Последнее доставленное событие')
+    # Пропущенные id ниже last_event_id: id -> когда пропуск замечен (timestamp)
+    pending = models.JSONField(default=dict, verbose_name='Ожидаемые события')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата доставки')
+
+    def __str__(self):
+        '''Строковое представление'''
+        return '%s: %d' % (self.sink, self.last_event_id)
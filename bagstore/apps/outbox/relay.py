@@ -0,0 +1,167 @@
+import json
+import os
+import urllib.request
+from abc import ABC, abstractmethod
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from apps.outbox.models import OutboxEvent, RelayCheckpoint
+
+
+# Сколько секунд ждать события с пропущенным идентификатором: транзакция,
+# получившая его, могла еще не зафиксироваться. Пропуск, не заполненный
+# за это время, считается идентификатором отмененной транзакции
+GAP_TIMEOUT = 60 * 60
+# Сколько пропусков помнить для одного получателя (старые забываются)
+MAX_PENDING = 10000
+
+
+class Sink(ABC):
+    '''Получатель событий (наследники реализуют send)'''
+
+    def __init__(self, name):
+        self.name = name
+
+    @abstractmethod
+    def send(self, messages):
+        '''Доставить порцию сообщений; исключение — порция не доставлена'''
+
+    def close(self):
+        '''Освободить ресурсы получателя'''
+
+
+class JsonlSink(Sink):
+    '''Запись событий в файл JSONL (по строке на событие)'''
+
+    def __init__(self, name, path):
+        super().__init__(name)
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def send(self, messages):
+        '''Дописать сообщения в файл и сбросить его на диск'''
+        for message in messages:
+            self.file.write(json.dumps(message, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n')
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        '''Закрыть файл'''
+        self.file.close()
+
+
+class WebhookSink(Sink):
+    '''Отправка событий POST-запросом с JSON-массивом сообщений'''
+
+    def __init__(self, name, url, timeout=10):
+        super().__init__(name)
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, messages):
+        '''Отправить порцию; ответ не 2xx считается ошибкой доставки'''
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(messages, cls=DjangoJSONEncoder).encode(),
+            headers={'Content-Type': 'application/json'},
+            method='POST',
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            if not 200 <= response.status < 300:
+                raise ConnectionError('Получатель ответил %d' % response.status)
+
+
+SINKS = {
+    'jsonl': JsonlSink,
+    'webhook': WebhookSink,
+}
+
+
+def build_sink(spec):
+    '''Получатель по описанию вида "jsonl:/path/events.jsonl" или "webhook:http://..."'''
+    kind, _, target = spec.partition(':')
+    if kind not in SINKS or not target:
+        raise ValueError('Неизвестный получатель: %s' % spec)
+    return SINKS[kind](spec, target)
+
+
+def relay(sink, batch_size=500, gap_timeout=GAP_TIMEOUT):
+    '''Доставить получателю новые события порциями.
+
+    Контрольная точка сдвигается только после успешной доставки порции,
+    поэтому каждое событие доставляется хотя бы один раз: при сбое
+    между доставкой и сохранением точки порция будет отправлена
+    повторно, и потребители отбрасывают дубли по id события.
+
+    Идентификаторы выдаются при вставке, а видны события становятся при
+    фиксации, поэтому транзакция с меньшим id может зафиксироваться
+    позже (например, массовое изменение цен в одной транзакции).
+    Пропущенные id ниже контрольной точки запоминаются, и при каждом
+    проходе появившиеся среди них события доставляются, даже если
+    они вне порядка id. Возвращает количество доставленных событий.
+    '''
+    checkpoint, _ = RelayCheckpoint.objects.get_or_create(sink=sink.name)
+    now = timezone.now().timestamp()
+    pending = {int(pk): seen for pk, seen in checkpoint.pending.items()
+               if now - seen < gap_timeout}
+    delivered = 0
+
+    late = list(OutboxEvent.objects.filter(pk__in=list(pending)).order_by('pk'))
+    if late:
+        sink.send([event.as_message() for event in late])
+        delivered += len(late)
+    for event in late:
+        del pending[event.pk]
+    if late or len(pending) != len(checkpoint.pending):
+        save_checkpoint(checkpoint, checkpoint.last_event_id, pending)
+
+    while True:
+        events = list(OutboxEvent.objects
+                      .filter(pk__gt=checkpoint.last_event_id)
+                      .order_by('pk')[:batch_size])
+        if not events:
+            break
+        sink.send([event.as_message() for event in events])
+        # Для новой точки пропуски ниже первого события — уже удаленные события
+        first = checkpoint.last_event_id + 1 if checkpoint.last_event_id else events[0].pk
+        present = {event.pk for event in events}
+        first = max(first, events[-1].pk - len(events) - MAX_PENDING)
+        for pk in range(first, events[-1].pk):
+            if pk not in present:
+                pending[pk] = now
+        save_checkpoint(checkpoint, events[-1].pk, pending)
+        delivered += len(events)
+    return delivered
+
+
+def save_checkpoint(checkpoint, last_event_id, pending):
+    '''Сохранить контрольную точку и пропуски (не больше MAX_PENDING последних)'''
+    checkpoint.last_event_id = last_event_id
+    checkpoint.pending = {str(pk): pending[pk] for pk in sorted(pending)[-MAX_PENDING:]}
+    checkpoint.save(update_fields=['last_event_id', 'pending', 'updated_at'])
+
+
+def delivered_below(checkpoint):
+    '''Граница, до которой (включительно) получатель получил все события'''
+    if checkpoint.pending:
+        return min(int(pk) for pk in checkpoint.pending) - 1
+    return checkpoint.last_event_id
+
+
+def prune_delivered(batch_size=1000):
+    '''Удалить события, уже доставленные всем получателям'''
+    checkpoints = list(RelayCheckpoint.objects.all())
+    if not checkpoints:
+        return 0
+    # Ожидаемые события ниже контрольной точки еще не доставлены
+    boundary = min(delivered_below(checkpoint) for checkpoint in checkpoints)
+    delivered = OutboxEvent.objects.filter(pk__lte=boundary).order_by('pk')
+    deleted = 0
+    while True:
+        ids = list(delivered.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            break
+        with transaction.atomic():
+            deleted += OutboxEvent.objects.filter(pk__in=ids).delete()[0]
+    return deleted
@@ -0,0 +1,22 @@
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+
+from apps.outbox.events import OUTBOX_FIELDS, record
+from apps.outbox.models import OutboxEvent
+
+
+def object_saved(sender, instance, created, using, raw=False, **kwargs):
+    '''Записать событие о создании или изменении объекта'''
+    if not raw:
+        record(instance, OutboxEvent.CREATED if created else OutboxEvent.UPDATED, using)
+
+
+def object_deleted(sender, instance, using, **kwargs):
+    '''Записать событие об удалении объекта'''
+    record(instance, OutboxEvent.DELETED, using)
+
+
+for label in OUTBOX_FIELDS:
+    model = apps.get_model(label)
+    post_save.connect(object_saved, sender=model, dispatch_uid='outbox:save:' + label)
+    post_delete.connect(object_deleted, sender=model, dispatch_uid='outbox:delete:' + label)
@@ -0,0 +1,85 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.cart.models import Cart
+from apps.outbox.models import OutboxEvent
+from apps.shop.models import Evaluation, Product
+from apps.shop.ratings import update_ratings
+from apps.shop.tests.fixtures import uploaded_image
+
+
+User = get_user_model()
+
+
+class OutboxEventTest(TestCase):
+    '''Тест записи событий outbox'''
+
+    @classmethod
+    def setUpTestData(cls):
+        '''Общие данные для всех тестов класса'''
+        cls.user = User.objects.create(username='Bill', email='bill@example.com')
+        cls.product = Product.objects.create(name='Сумка', price=1590, image=uploaded_image())
+
+    def events(self, topic):
+        '''Действия событий по модели в порядке записи'''
+        return list(OutboxEvent.objects.filter(topic=topic)
+                    .order_by('pk').values_list('action', flat=True))
+
+    def test_product_changes_are_recorded(self):
+        '''Тест: создание, изменение и удаление товара записываются'''
+        product = Product.objects.create(name='Кошелек', price=990, image=uploaded_image())
+        product.price = 1090
+        product.save()
+        pk = product.pk
+        product.delete()
+
+        events = OutboxEvent.objects.filter(topic='shop.product', object_id=pk)
+        self.assertEqual([event.action for event in events.order_by('pk')],
+                         ['created', 'updated', 'deleted'])
+        self.assertEqual(events.order_by('pk')[1].payload['price'], 1090)
+
+    def test_event_is_rolled_back_with_the_change(self):
+        '''Тест: при откате изменения событие тоже не сохраняется'''
+        OutboxEvent.objects.all().delete()
+        try:
+            with transaction.atomic():
+                Product.objects.create(name='Кошелек', price=990, image=uploaded_image())
+                raise RuntimeError
+        except RuntimeError:
+            pass
+
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_cart_and_evaluation_changes_are_recorded(self):
+        '''Тест: изменения корзины и оценок записываются'''
+        self.client.force_login(self.user)
+        self.client.post(reverse('cart_add', args=[self.product.pk]))
+        self.client.post(reverse('cart_remove', args=[self.product.pk]))
+        self.client.post(reverse('product_rate', args=[self.product.pk]), {'evaluation': 5})
+
+        self.assertEqual(self.events('cart.cart'), ['created', 'deleted'])
+        self.assertEqual(self.events('shop.evaluation'), ['created'])
+
+    def test_bulk_changes_are_recorded(self):
+        '''Тест: массовые изменения записываются без сигналов'''
+        products = Product.objects.bulk_create(
+            [Product(name='Ремень %d' % number, price=790, image='belt.png')
+             for number in range(3)])
+        Product.objects.filter(pk__in=[product.pk for product in products]).update_price(890)
+        carts = Cart.objects.bulk_create([Cart(product=self.product, user=self.user)])
+        Cart.objects.filter(pk=carts[0].pk).purge()
+
+        self.assertEqual(self.events('shop.product').count('created'), 4)
+        self.assertEqual(self.events('shop.product').count('updated'), 3)
+        self.assertEqual(self.events('cart.cart'), ['created', 'deleted'])
+
+    def test_rating_updates_are_recorded(self):
+        '''Тест: пересчет рейтинга записывается'''
+        Evaluation.objects.create(evaluation=5, product=self.product, user=self.user)
+
+        update_ratings()
+
+        event = OutboxEvent.objects.filter(topic='shop.product', action='updated').get()
+        self.assertEqual(event.payload['rating_count'], 1)
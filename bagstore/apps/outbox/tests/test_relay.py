@@ -0,0 +1,129 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from apps.outbox.models import OutboxEvent, RelayCheckpoint
+from apps.outbox.relay import Sink, WebhookSink, build_sink, prune_delivered, relay
+from apps.shop.models import Product
+
+
+class FailingSink(Sink):
+    '''Получатель, недоступный при отправке'''
+
+    def send(self, messages):
+        raise ConnectionError
+
+
+class RelayTest(TestCase):
+    '''Тест доставки событий outbox'''
+
+    def setUp(self):
+        '''Установка перед тестированием'''
+        Product.objects.bulk_create(
+            [Product(name='Сумка %d' % number, price=1000, image='bag.png')
+             for number in range(5)])
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'events.jsonl')
+
+    def tearDown(self):
+        '''Удаление параметров тестирования'''
+        self.directory.cleanup()
+
+    def read_events(self):
+        '''События, записанные в файл'''
+        with open(self.path, encoding='utf-8') as events:
+            return [json.loads(line) for line in events]
+
+    def test_events_are_delivered_once_per_checkpoint(self):
+        '''Тест: события доставляются порциями, повторный запуск их не повторяет'''
+        out = StringIO()
+        for _ in range(2):
+            call_command('relay_outbox', '--sink', 'jsonl:' + self.path,
+                         '--batch-size=2', stdout=out)
+
+        events = self.read_events()
+        self.assertEqual([event['id'] for event in events],
+                         list(OutboxEvent.objects.order_by('pk').values_list('pk', flat=True)))
+        self.assertEqual(RelayCheckpoint.objects.get().last_event_id, events[-1]['id'])
+
+    def test_failed_delivery_keeps_the_checkpoint(self):
+        '''Тест: при сбое доставки контрольная точка не сдвигается'''
+        with self.assertRaises(ConnectionError):
+            relay(FailingSink('failing'))
+
+        self.assertEqual(RelayCheckpoint.objects.get(sink='failing').last_event_id, 0)
+
+    def mock_sink(self):
+        '''Получатель, запоминающий доставленные id'''
+        sink = mock.Mock(spec=Sink)
+        sink.name = 'mock'
+        return sink
+
+    def sent_ids(self, sink):
+        '''id событий, доставленных получателю'''
+        return [message['id'] for call in sink.send.call_args_list for message in call.args[0]]
+
+    def test_late_committed_event_is_delivered(self):
+        '''Тест: событие транзакции, зафиксированной позже событий с большими id, доставляется'''
+        ids = list(OutboxEvent.objects.order_by('pk').values_list('pk', flat=True))
+        # Событие с id ids[1] еще не видно: его транзакция не зафиксирована
+        late = OutboxEvent.objects.get(pk=ids[1])
+        late.delete()
+        sink = self.mock_sink()
+
+        relay(sink)
+        self.assertEqual(RelayCheckpoint.objects.get().last_event_id, ids[-1])
+        self.assertEqual(prune_delivered(), 1)
+
+        late.pk = ids[1]
+        late.save()
+        self.assertEqual(relay(sink), 1)
+        self.assertEqual(sorted(self.sent_ids(sink)), ids)
+        self.assertEqual(RelayCheckpoint.objects.get().pending, {})
+        self.assertEqual(relay(sink), 0)
+
+    def test_gap_is_forgotten_after_timeout(self):
+        '''Тест: пропуск, не заполненный за отведенное время, больше не проверяется'''
+        ids = list(OutboxEvent.objects.order_by('pk').values_list('pk', flat=True))
+        OutboxEvent.objects.filter(pk=ids[1]).delete()
+        sink = self.mock_sink()
+        relay(sink)
+
+        relay(sink, gap_timeout=0)
+
+        self.assertEqual(RelayCheckpoint.objects.get().pending, {})
+
+    def test_webhook_posts_events_as_json(self):
+        '''Тест: webhook получает порцию событий в JSON'''
+        sink = build_sink('webhook:http://127.0.0.1:8001/events')
+        response = mock.MagicMock(status=204)
+        response.__enter__.return_value = response
+
+        with mock.patch('urllib.request.urlopen', return_value=response) as urlopen:
+            relay(sink)
+
+        request = urlopen.call_args.args[0]
+        self.assertIsInstance(sink, WebhookSink)
+        self.assertEqual(len(json.loads(request.data)), OutboxEvent.objects.count())
+
+    def test_sink_without_send_cannot_be_created(self):
+        '''Тест: получателя без send нельзя создать'''
+        class SilentSink(Sink):
+            pass
+
+        with self.assertRaises(TypeError):
+            SilentSink('silent')
+
+    def test_delivered_events_are_pruned(self):
+        '''Тест: удаляются только события, доставленные всем получателям'''
+        first = OutboxEvent.objects.order_by('pk').first()
+        RelayCheckpoint.objects.create(sink='a', last_event_id=first.pk)
+        RelayCheckpoint.objects.create(sink='b', last_event_id=first.pk + 2)
+
+        self.assertEqual(prune_delivered(), 1)
+        self.assertFalse(OutboxEvent.objects.filter(pk=first.pk).exists())
@@ -0,0 +1,18 @@
+from django.contrib import admin
+
+from apps.promotions.models import Promotion
+
+
+@admin.register(Promotion)
+class PromotionAdmin(admin.ModelAdmin):
+    '''Администрирование акций'''
+    list_display = ('name', 'scope', 'kind', 'value', 'starts_at', 'ends_at', 'is_active')
+    list_filter = ('scope', 'kind', 'is_active')
+    list_editable = ('is_active',)
+    search_fields = ('name',)
+    raw_id_fields = ('products',)
+    fieldsets = (
+        (None, {'fields': ('name', 'kind', 'value', 'scope', 'is_active')}),
+        ('Условия', {'fields': ('products', 'min_price', 'max_price', 'min_cart_total')}),
+        ('Срок действия', {'fields': ('starts_at', 'ends_at')}),
+    )
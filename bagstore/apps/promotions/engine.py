@@ -0,0 +1,243 @@
+import time
+import zlib
+from bisect import bisect_right
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.promotions.models import Promotion
+from apps.shop.versions import new_version, shared_version
+
+
+PROMOTIONS_VERSION_KEY = 'promotions:version'
+# Сколько секунд процесс пользуется индексом, даже если версия правил не
+# менялась: изменения, не отмеченные версией (queryset.update, вытеснение
+# из кеша), доходят до процесса не позже этого срока
+INDEX_TIMEOUT = getattr(settings, 'PROMOTIONS_INDEX_TIMEOUT', 60)
+# Лучшие скидки при отсутствии правил: (процент, сумма)
+NO_DISCOUNT = (0, 0)
+
+
+class Rule:
+    '''Правило скидки в памяти, без обращений к БД'''
+    __slots__ = ('pk', 'kind', 'value', 'scope', 'product_ids', 'min_price', 'max_price',
+                 'min_cart_total', 'starts_at', 'ends_at')
+
+    def __init__(self, pk, kind, value, scope, product_ids=(), min_price=None,
+                 max_price=None, min_cart_total=None, starts_at=None, ends_at=None):
+        self.pk = pk
+        self.kind = kind
+        self.value = value
+        self.scope = scope
+        self.product_ids = frozenset(product_ids)
+        self.min_price = min_price
+        self.max_price = max_price
+        self.min_cart_total = min_cart_total
+        self.starts_at = starts_at
+        self.ends_at = ends_at
+
+    def is_active(self, now):
+        '''Действует ли правило в момент now'''
+        return ((self.starts_at is None or self.starts_at <= now)
+                and (self.ends_at is None or now < self.ends_at))
+
+    def covers_price(self, price):
+        '''Попадает ли цена товара в диапазон правила'''
+        return ((self.min_price is None or self.min_price <= price)
+                and (self.max_price is None or price <= self.max_price))
+
+    def __repr__(self):
+        '''Отладочное представление'''
+        return '<Rule: %s %s %s>' % (self.scope, self.kind, self.value)
+
+
+def combine(best, rule):
+    '''Наибольшие процент и сумму скидки с учетом еще одного правила'''
+    percent, fixed = best
+    if rule.kind == Promotion.PERCENT:
+        return max(percent, rule.value), fixed
+    return percent, max(fixed, rule.value)
+
+
+def discount(best, amount):
+    '''Наибольшая скидка на сумму amount: не больше самой суммы'''
+    percent, fixed = best
+    return min(amount, max(amount * percent // 100, fixed))
+
+
+class PromotionIndex:
+    '''Действующие правила, разложенные для быстрого поиска скидок.
+
+    Для каждого товара из правил по товарам заранее вычисляются
+    наибольшие процент и сумма скидки. Границы диапазонов цен делят ось
+    цен на отрезки, для каждого отрезка лучшие скидки тоже вычислены
+    заранее, и цена находит свой отрезок двоичным поиском. Так же
+    устроены правила по итогу корзины. Поэтому скидка для строки не
+    зависит от числа правил.
+    '''
+
+    def __init__(self, rules, now, version=''):
+        active = [rule for rule in rules if rule.is_active(now)]
+        self.version = version
+        # Ключ состояния: одинаков во всех процессах при одинаковых правилах
+        self.key = '%s.%x' % (version, zlib.crc32(
+            ','.join(str(rule.pk) for rule in sorted(active, key=lambda rule: rule.pk))
+            .encode()))
+        # Когда набор действующих правил изменится сам по себе
+        moments = [moment for rule in rules for moment in (rule.starts_at, rule.ends_at)
+                   if moment is not None and moment > now]
+        self.valid_until = min(moments, default=None)
+
+        by_product = defaultdict(lambda: NO_DISCOUNT)
+        ranges = []
+        carts = []
+        for rule in active:
+            if rule.scope == Promotion.PRODUCTS:
+                for product_id in rule.product_ids:
+                    by_product[product_id] = combine(by_product[product_id], rule)
+            elif rule.scope == Promotion.PRICE_RANGE:
+                ranges.append(rule)
+            elif rule.scope == Promotion.CART_TOTAL:
+                carts.append(rule)
+        self.by_product = dict(by_product)
+
+        # Отрезок k — цены от range_starts[k - 1] до range_starts[k] - 1
+        self.range_starts = sorted(
+            {rule.min_price for rule in ranges if rule.min_price is not None}
+            | {rule.max_price + 1 for rule in ranges if rule.max_price is not None})
+        self.range_best = []
+        for k in range(len(self.range_starts) + 1):
+            price = self.range_starts[k - 1] if k else -1
+            best = NO_DISCOUNT
+            for rule in ranges:
+                if rule.covers_price(price):
+                    best = combine(best, rule)
+            self.range_best.append(best)
+
+        # Пороги корзины по возрастанию и лучшие скидки от каждого порога
+        carts.sort(key=lambda rule: rule.min_cart_total or 0)
+        self.cart_thresholds = [rule.min_cart_total or 0 for rule in carts]
+        self.cart_best = []
+        best = NO_DISCOUNT
+        for rule in carts:
+            best = combine(best, rule)
+            self.cart_best.append(best)
+
+    def is_fresh(self, now, version):
+        '''Можно ли еще пользоваться индексом'''
+        return version == self.version and (self.valid_until is None or now < self.valid_until)
+
+    def sale_prices(self, product_ids, prices):
+        '''Цены со скидкой для набора товаров одним проходом'''
+        by_product, starts, range_best = self.by_product, self.range_starts, self.range_best
+        if not by_product and len(range_best) == 1 and range_best[0] == NO_DISCOUNT:
+            return list(prices)
+        result = []
+        for product_id, price in zip(product_ids, prices):
+            product_percent, product_fixed = by_product.get(product_id, NO_DISCOUNT)
+            range_percent, range_fixed = range_best[bisect_right(starts, price)]
+            result.append(price - discount(
+                (max(product_percent, range_percent), max(product_fixed, range_fixed)), price))
+        return result
+
+    def cart_discount(self, total):
+        '''Скидка на итог корзины'''
+        position = bisect_right(self.cart_thresholds, total)
+        if not position:
+            return 0
+        return discount(self.cart_best[position - 1], total)
+
+
+def promotions_version():
+    '''Версия правил: меняется при любом их изменении'''
+    return shared_version(PROMOTIONS_VERSION_KEY)
+
+
+def bump_promotions_version():
+    '''Отметить изменение правил'''
+    version = new_version()
+    cache.set(PROMOTIONS_VERSION_KEY, version, None)
+    return version
+
+
+def load_rules(now):
+    '''Включенные правила, еще не закончившиеся к моменту now (два запроса)'''
+    promotions = list(Promotion.objects
+                      .filter(is_active=True)
+                      .filter(Q(ends_at__isnull=True) | Q(ends_at__gt=now))
+                      .values_list('pk', 'kind', 'value', 'scope', 'min_price', 'max_price',
+                                   'min_cart_total', 'starts_at', 'ends_at'))
+    product_ids = defaultdict(list)
+    with_products = [row[0] for row in promotions if row[3] == Promotion.PRODUCTS]
+    if with_products:
+        links = (Promotion.products.through.objects
+                 .filter(promotion_id__in=with_products)
+                 .values_list('promotion_id', 'product_id'))
+        for promotion_id, product_id in links:
+            product_ids[promotion_id].append(product_id)
+    return [
+        Rule(pk, kind, value, scope, product_ids[pk], min_price, max_price,
+             min_cart_total, starts_at, ends_at)
+        for pk, kind, value, scope, min_price, max_price, min_cart_total, starts_at, ends_at
+        in promotions
+    ]
+
+
+# Индекс, построенный процессом, и момент, когда он устаревает
+_index = {'index': None, 'expires': 0}
+
+
+def get_index():
+    '''Индекс правил процесса; перестраивается при изменении правил.
+
+    Изменение правил отмечается версией в общем кеше (settings.CACHES),
+    поэтому о нем узнают все процессы. Начало и окончание действия
+    правил индекс отслеживает сам, а не позже чем через INDEX_TIMEOUT
+    секунд перестраивается в любом случае.
+    '''
+    now = timezone.now()
+    version = promotions_version()
+    index = _index['index']
+    if (index is None or not index.is_fresh(now, version)
+            or time.monotonic() >= _index['expires']):
+        index = _index['index'] = PromotionIndex(load_rules(now), now, version)
+        _index['expires'] = time.monotonic() + INDEX_TIMEOUT
+    return index
+
+
+def promotions_etag():
+    '''Часть ETag, зависящая от действующих правил'''
+    return get_index().key
+
+
+def apply_to_rows(rows, index=None, source='price', target='sale_price'):
+    '''Записать в строки цены со скидкой, вычислив их одним проходом'''
+    rows = list(rows)
+    index = index or get_index()
+    prices = index.sale_prices([row.pk for row in rows],
+                               [getattr(row, source) for row in rows])
+    for row, price in zip(rows, prices):
+        setattr(row, target, price)
+    return rows
+
+
+def price_cart(lines, index=None):
+    '''Скидки по строкам корзины и на ее итог.
+
+    Записывает в строки sale_price и sale_cost и возвращает итог без
+    скидок, общую скидку и итог к оплате.
+    '''
+    index = index or get_index()
+    sale_prices = index.sale_prices([line.product_id for line in lines],
+                                    [line.price for line in lines])
+    subtotal = total = 0
+    for line, sale_price in zip(lines, sale_prices):
+        line.sale_price = sale_price
+        line.sale_cost = sale_price * line.quantity
+        subtotal += line.price * line.quantity
+        total += line.sale_cost
+    total -= index.cart_discount(total)
+    return subtotal, subtotal - total, total
@@ -0,0 +1,92 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.promotions.engine import PromotionIndex, Rule, discount
+from apps.promotions.models import Promotion
+
+
+def random_rules(count, product_count, rng):
+    '''Случайные правила по товарам, диапазонам цен и итогу корзины'''
+    rules = []
+    for pk in range(1, count + 1):
+        kind = rng.choice((Promotion.PERCENT, Promotion.FIXED))
+        value = rng.randint(1, 50) if kind == Promotion.PERCENT else rng.randint(50, 1000)
+        scope = rng.choice((Promotion.PRODUCTS, Promotion.PRICE_RANGE, Promotion.CART_TOTAL))
+        if scope == Promotion.PRODUCTS:
+            products = rng.sample(range(1, product_count + 1), min(product_count, 50))
+            rules.append(Rule(pk, kind, value, scope, product_ids=products))
+        elif scope == Promotion.PRICE_RANGE:
+            low = rng.randint(500, 20000)
+            rules.append(Rule(pk, kind, value, scope,
+                              min_price=low, max_price=low + rng.randint(0, 10000)))
+        else:
+            rules.append(Rule(pk, kind, value, scope, min_cart_total=rng.randint(1000, 50000)))
+    return rules
+
+
+def naive_sale_price(rules, product_id, price):
+    '''Цена со скидкой перебором всех правил (как при проверке каждой строки)'''
+    best = 0
+    for rule in rules:
+        if rule.scope == Promotion.PRODUCTS:
+            applies = product_id in rule.product_ids
+        elif rule.scope == Promotion.PRICE_RANGE:
+            applies = rule.covers_price(price)
+        else:
+            applies = False
+        if applies:
+            percent, fixed = (rule.value, 0) if rule.kind == Promotion.PERCENT else (0, rule.value)
+            best = max(best, discount((percent, fixed), price))
+    return price - best
+
+
+class Command(BaseCommand):
+    '''Сравнение скорости применения скидок'''
+    help = ('Измеряет строки/с при расчете цен со скидкой: перебор правил для каждой '
+            'строки против индекса правил (данные создаются в памяти, БД не нужна)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=10000,
+                            help='Сколько товаров в списке')
+        parser.add_argument('--rules', type=int, default=100,
+                            help='Сколько действующих правил')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Сколько раз повторить каждый замер')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Начальное значение генератора случайных чисел')
+
+    def measure(self, function, repeat):
+        '''Лучшее время выполнения и результат функции'''
+        best = result = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = function()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        count = options['products']
+        rules = random_rules(options['rules'], count, rng)
+        product_ids = list(range(1, count + 1))
+        prices = [rng.randint(500, 30000) for _ in product_ids]
+
+        build_time, index = self.measure(
+            lambda: PromotionIndex(rules, timezone.now()), options['repeat'])
+        naive_time, expected = self.measure(
+            lambda: [naive_sale_price(rules, product_id, price)
+                     for product_id, price in zip(product_ids, prices)],
+            options['repeat'])
+        index_time, actual = self.measure(
+            lambda: index.sale_prices(product_ids, prices), options['repeat'])
+
+        if actual != expected:
+            self.stderr.write('Результаты индекса и перебора расходятся')
+        self.stdout.write('Построение индекса (%d правил): %.4f с' % (len(rules), build_time))
+        for title, elapsed in (('Перебор правил', naive_time), ('Индекс правил', index_time)):
+            self.stdout.write('%s: %.0f строк/с (%.4f с)' % (title, count / elapsed, elapsed))
+        self.stdout.write(self.style.SUCCESS('Ускорение: %.1f раз' % (naive_time / index_time)))
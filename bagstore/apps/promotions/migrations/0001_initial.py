@@ -0,0 +1,37 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('shop', '0011_product_image_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Promotion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Название')),
+                ('kind', models.CharField(choices=[('percent', 'Процент'), ('fixed', 'Сумма, ₽')], max_length=10, verbose_name='Вид скидки')),
+                ('value', models.PositiveIntegerField(verbose_name='Размер скидки')),
+                ('scope', models.CharField(choices=[('products', 'Выбранные товары'), ('price_range', 'Товары в диапазоне цен'), ('cart_total', 'Итог корзины')], max_length=20, verbose_name='Применяется к')),
+                ('min_price', models.PositiveIntegerField(blank=True, null=True, verbose_name='Цена товара от')),
+                ('max_price', models.PositiveIntegerField(blank=True, null=True, verbose_name='Цена товара до')),
+                ('min_cart_total', models.PositiveIntegerField(blank=True, null=True, verbose_name='Итог корзины от')),
+                ('starts_at', models.DateTimeField(blank=True, null=True, verbose_name='Начало действия')),
+                ('ends_at', models.DateTimeField(blank=True, null=True, verbose_name='Окончание действия')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Включена')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата изменения')),
+                ('products', models.ManyToManyField(blank=True, related_name='promotions', to='shop.product', verbose_name='Товары')),
+            ],
+            options={
+                'verbose_name': 'Акция',
+                'verbose_name_plural': 'Акции',
+            },
+        ),
+    ]
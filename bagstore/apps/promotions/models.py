@@ -0,0 +1,63 @@
+from django.core.exceptions import ValidationError
+from django.db import models
+
+from apps.shop.models import Product
+
+
+class Promotion(models.Model):
+    '''Правило скидки: процент или фиксированная сумма.
+
+    Скидка действует на выбранные товары, на товары в диапазоне цен или
+    на итог корзины от заданной суммы. Правила не суммируются: товару и
+    корзине достается наибольшая из подходящих скидок.
+    '''
+    PERCENT = 'percent'
+    FIXED = 'fixed'
+    KINDS = [
+        (PERCENT, 'Процент'),
+        (FIXED, 'Сумма, ₽'),
+    ]
+
+    PRODUCTS = 'products'
+    PRICE_RANGE = 'price_range'
+    CART_TOTAL = 'cart_total'
+    SCOPES = [
+        (PRODUCTS, 'Выбранные товары'),
+        (PRICE_RANGE, 'Товары в диапазоне цен'),
+        (CART_TOTAL, 'Итог корзины'),
+    ]
+
+    name = models.CharField(max_length=100, verbose_name='Название')
+    kind = models.CharField(max_length=10, choices=KINDS, verbose_name='Вид скидки')
+    value = models.PositiveIntegerField(verbose_name='Размер скидки')
+    scope = models.CharField(max_length=20, choices=SCOPES, verbose_name='Применяется к')
+    products = models.ManyToManyField(Product, blank=True, related_name='promotions',
+                                      verbose_name='Товары')
+    min_price = models.PositiveIntegerField(null=True, blank=True,
+                                            verbose_name='Цена товара от')
+    max_price = models.PositiveIntegerField(null=True, blank=True,
+                                            verbose_name='Цена товара до')
+    min_cart_total = models.PositiveIntegerField(null=True, blank=True,
+                                                 verbose_name='Итог корзины от')
+    starts_at = models.DateTimeField(null=True, blank=True, verbose_name='Начало действия')
+    ends_at = models.DateTimeField(null=True, blank=True, verbose_name='Окончание действия')
+    is_active = models.BooleanField(default=True, verbose_name='Включена')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата изменения')
+
+    class Meta:
+        verbose_name = 'Акция'
+        verbose_name_plural = 'Акции'
+
+    def __str__(self):
+        '''Строковое представление'''
+        return '%s' % self.name
+
+    def clean(self):
+        '''Проверить согласованность полей правила'''
+        if self.kind == self.PERCENT and self.value > 100:
+            raise ValidationError({'value': 'Скидка не может превышать 100%'})
+        if (self.min_price is not None and self.max_price is not None
+                and self.min_price > self.max_price):
+            raise ValidationError({'max_price': 'Верхняя граница цены меньше нижней'})
+        if self.starts_at and self.ends_at and self.starts_at >= self.ends_at:
+            raise ValidationError({'ends_at': 'Окончание действия раньше начала'})
@@ -0,0 +1,17 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from apps.promotions.engine import bump_promotions_version
+from apps.promotions.models import Promotion
+from apps.shop.edge import CATALOG_KEY, purge
+from apps.shop.versions import bump_catalog_version
+
+
+@receiver(post_save, sender=Promotion)
+@receiver(post_delete, sender=Promotion)
+@receiver(m2m_changed, sender=Promotion.products.through)
+def promotion_changed(sender, **kwargs):
+    '''Изменение правил перестраивает индексы процессов и устаревшие страницы каталога'''
+    bump_promotions_version()
+    bump_catalog_version()
+    purge([CATALOG_KEY])
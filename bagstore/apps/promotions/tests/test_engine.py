@@ -0,0 +1,146 @@
+import random
+from unittest import mock
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from apps.promotions import engine
+from apps.promotions.engine import PromotionIndex, Rule, get_index
+from apps.promotions.management.commands.benchmark_promotions import (
+    naive_sale_price, random_rules)
+from apps.promotions.models import Promotion
+from apps.shop.models import Product
+from apps.shop.tests.fixtures import uploaded_image
+
+
+class PromotionIndexTest(SimpleTestCase):
+    '''Тест индекса правил скидок'''
+
+    def setUp(self):
+        '''Установка перед тестированием'''
+        self.now = timezone.now()
+
+    def test_best_discount_wins(self):
+        '''Тест: из подходящих правил применяется наибольшая скидка'''
+        index = PromotionIndex([
+            Rule(1, Promotion.PERCENT, 10, Promotion.PRODUCTS, product_ids=[1, 2]),
+            Rule(2, Promotion.FIXED, 300, Promotion.PRODUCTS, product_ids=[2]),
+            Rule(3, Promotion.PERCENT, 20, Promotion.PRICE_RANGE, min_price=5000),
+        ], self.now)
+
+        self.assertEqual(index.sale_prices([1, 2, 3, 4], [1000, 1000, 1000, 6000]),
+                         [900, 700, 1000, 4800])
+
+    def test_price_range_bounds_are_inclusive(self):
+        '''Тест: границы диапазона цен входят в диапазон'''
+        index = PromotionIndex([
+            Rule(1, Promotion.FIXED, 100, Promotion.PRICE_RANGE, min_price=1000, max_price=2000),
+        ], self.now)
+
+        self.assertEqual(index.sale_prices([1, 2, 3, 4], [999, 1000, 2000, 2001]),
+                         [999, 900, 1900, 2001])
+
+    def test_discount_does_not_exceed_price(self):
+        '''Тест: фиксированная скидка не делает цену отрицательной'''
+        index = PromotionIndex([
+            Rule(1, Promotion.FIXED, 5000, Promotion.PRODUCTS, product_ids=[1]),
+        ], self.now)
+
+        self.assertEqual(index.sale_prices([1], [1000]), [0])
+
+    def test_cart_discount_depends_on_total(self):
+        '''Тест: скидка на корзину действует от порога итога'''
+        index = PromotionIndex([
+            Rule(1, Promotion.PERCENT, 5, Promotion.CART_TOTAL, min_cart_total=5000),
+            Rule(2, Promotion.FIXED, 1000, Promotion.CART_TOTAL, min_cart_total=10000),
+        ], self.now)
+
+        self.assertEqual(index.cart_discount(4999), 0)
+        self.assertEqual(index.cart_discount(6000), 300)
+        self.assertEqual(index.cart_discount(30000), 1500)
+
+    def test_rules_outside_their_period_are_ignored(self):
+        '''Тест: правило действует только в свой срок, и индекс знает, когда он устареет'''
+        starts = self.now + timedelta(hours=1)
+        index = PromotionIndex([
+            Rule(1, Promotion.PERCENT, 10, Promotion.PRODUCTS, product_ids=[1],
+                 starts_at=starts),
+        ], self.now)
+
+        self.assertEqual(index.sale_prices([1], [1000]), [1000])
+        self.assertEqual(index.valid_until, starts)
+        self.assertFalse(index.is_fresh(starts, index.version))
+
+    def test_index_matches_checking_every_rule(self):
+        '''Тест: индекс дает те же цены, что и перебор всех правил'''
+        rng = random.Random(1)
+        rules = random_rules(100, 500, rng)
+        prices = [rng.randint(0, 40000) for _ in range(500)]
+        index = PromotionIndex(rules, self.now)
+
+        self.assertEqual(index.sale_prices(range(1, 501), prices),
+                         [naive_sale_price(rules, pk, price)
+                          for pk, price in zip(range(1, 501), prices)])
+
+    def test_benchmark_command(self):
+        '''Тест: команда сравнения скорости выполняется'''
+        stdout = StringIO()
+        call_command('benchmark_promotions', products=200, rules=20, repeat=1,
+                     stdout=stdout, stderr=StringIO())
+
+        self.assertIn('Индекс правил', stdout.getvalue())
+
+
+class PromotionIndexRefreshTest(TestCase):
+    '''Тест перестроения индекса процесса'''
+
+    @classmethod
+    def setUpTestData(cls):
+        '''Общие данные для всех тестов класса'''
+        cls.product = Product.objects.create(name='Сумка', price=2000, image=uploaded_image())
+
+    def setUp(self):
+        '''Установка перед тестированием'''
+        cache.clear()
+        engine._index['index'] = None
+
+    def test_index_is_reused(self):
+        '''Тест: пока правила не менялись, индекс не загружается заново'''
+        get_index()
+
+        with self.assertNumQueries(0):
+            get_index()
+
+    def test_index_expires(self):
+        '''Тест: изменение, не отмеченное версией, доходит до процесса по истечении срока'''
+        get_index()
+        Promotion.objects.bulk_create([Promotion(name='Скидка', kind=Promotion.FIXED, value=100,
+                                                 scope=Promotion.PRICE_RANGE)])
+        self.assertEqual(get_index().sale_prices([self.product.pk], [2000]), [2000])
+
+        with mock.patch('apps.promotions.engine.time.monotonic',
+                        return_value=engine._index['expires']):
+            self.assertEqual(get_index().sale_prices([self.product.pk], [2000]), [1900])
+
+    def test_index_is_rebuilt_on_change(self):
+        '''Тест: изменение правил и их товаров перестраивает индекс'''
+        promotion = Promotion.objects.create(name='Скидка', kind=Promotion.PERCENT, value=10,
+                                             scope=Promotion.PRODUCTS)
+        self.assertEqual(get_index().sale_prices([self.product.pk], [2000]), [2000])
+
+        promotion.products.add(self.product)
+        self.assertEqual(get_index().sale_prices([self.product.pk], [2000]), [1800])
+
+    def test_disabled_rules_are_not_loaded(self):
+        '''Тест: выключенные и закончившиеся правила не попадают в индекс'''
+        Promotion.objects.create(name='Выключена', kind=Promotion.FIXED, value=100,
+                                 scope=Promotion.PRICE_RANGE, is_active=False)
+        Promotion.objects.create(name='Закончилась', kind=Promotion.FIXED, value=100,
+                                 scope=Promotion.PRICE_RANGE,
+                                 ends_at=timezone.now() - timedelta(days=1))
+
+        self.assertEqual(get_index().sale_prices([self.product.pk], [2000]), [2000])
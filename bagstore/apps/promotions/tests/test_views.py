@@ -0,0 +1,74 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.cart.models import Cart
+from apps.promotions import engine
+from apps.promotions.models import Promotion
+from apps.shop.models import Product
+from apps.shop.tests.fixtures import uploaded_image
+
+
+User = get_user_model()
+
+
+class PromotionDisplayTest(TestCase):
+    '''Тест отображения скидок на страницах'''
+
+    @classmethod
+    def setUpTestData(cls):
+        '''Общие данные для всех тестов класса'''
+        cls.user = User.objects.create(username='Bill', email='bill@example.com')
+        cls.product = Product.objects.create(name='Сумка', price=2000, image=uploaded_image())
+        cls.other = Product.objects.create(name='Кошелек', price=500, image=uploaded_image())
+
+    def setUp(self):
+        '''Установка перед тестированием'''
+        cache.clear()
+        engine._index['index'] = None
+        self.promotion = Promotion.objects.create(
+            name='Сумки дешевле', kind=Promotion.PERCENT, value=25,
+            scope=Promotion.PRICE_RANGE, min_price=1000)
+
+    def test_shop_shows_sale_and_old_price(self):
+        '''Тест: в магазине показываются цена со скидкой и старая цена'''
+        response = self.client.get(reverse('shop'))
+
+        self.assertContains(response, '1500 ₽')
+        self.assertContains(response, '<s class="product_old_price" data-price="2000">2000 ₽</s>',
+                            html=True)
+        self.assertContains(response, '<span class="product_price" data-price="500">500 ₽</span>',
+                            html=True)
+
+    def test_product_page_shows_sale_price(self):
+        '''Тест: на странице товара показывается цена со скидкой'''
+        response = self.client.get(reverse('product', args=[self.product.pk]))
+
+        self.assertContains(response, '1500 ₽')
+
+    def test_cart_applies_line_and_total_discounts(self):
+        '''Тест: в корзине действуют скидки на товары и на итог'''
+        Promotion.objects.create(name='От 3000', kind=Promotion.FIXED, value=200,
+                                 scope=Promotion.CART_TOTAL, min_cart_total=3000)
+        for _ in range(2):
+            Cart.objects.create(product=self.product, user=self.user)
+        Cart.objects.create(product=self.other, user=self.user)
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse('cart'))
+        self.assertContains(response, '<span class="product_cart_price">3000 ₽</span>',
+                            html=True)
+        # 4500 - 1000 (25% на сумки) - 200 (на корзину от 3000)
+        self.assertContains(response, 'Скидка: 1200 ₽')
+        self.assertContains(response, 'Итого: 3300 ₽')
+
+    def test_promotion_change_changes_etag(self):
+        '''Тест: изменение акции меняет ETag страниц каталога'''
+        etag = self.client.get(reverse('shop'))['ETag']
+        self.promotion.is_active = False
+        self.promotion.save()
+
+        response = self.client.get(reverse('shop'), HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, '<span class="product_price" data-price="2000">2000 ₽</span>',
+                            html=True)
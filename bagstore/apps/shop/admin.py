@@ -1,5 +1,106 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.admin.models import DELETION, LogEntry
+from django.contrib.contenttypes.models import ContentType
+from django.db import router, transaction
+from django.db.models import F
+from django.template.response import TemplateResponse
+from django.utils.html import format_html
+from django.utils.text import capfirst
 
-from apps.shop.models import Product
+from apps.shop.models import Evaluation, Product
+from apps.shop.paginators import EstimatedCountPaginator
 
-admin.site.register(Product)
+
+def log_deletions(request, queryset, batch_size=500):
+    '''Записать удаление объектов в журнал админки порциями'''
+    content_type = ContentType.objects.get_for_model(queryset.model, for_concrete_model=False)
+    entries = []
+    for obj in queryset.iterator(chunk_size=batch_size):
+        entries.append(LogEntry(user_id=request.user.pk, content_type_id=content_type.pk,
+                                object_id=str(obj.pk), object_repr=str(obj)[:200],
+                                action_flag=DELETION, change_message=''))
+        if len(entries) >= batch_size:
+            LogEntry.objects.bulk_create(entries)
+            entries = []
+    LogEntry.objects.bulk_create(entries)
+
+
+@admin.action(description='Удалить выбранные (без списка связанных объектов)',
+              permissions=['delete'])
+def delete_quickly(modeladmin, request, queryset):
+    '''Удаление одним запросом с упрощенной страницей подтверждения.
+
+    В отличие от стандартного действия, страница подтверждения не
+    собирает список связанных объектов: на больших таблицах это долго.
+    '''
+    opts = modeladmin.model._meta
+    if not request.POST.get('post'):
+        select_across = request.POST.get('select_across') == '1'
+        context = {
+            **modeladmin.admin_site.each_context(request),
+            'title': 'Вы уверены?',
+            'opts': opts,
+            'objects_name': capfirst(opts.verbose_name_plural),
+            'count': queryset.count(),
+            'select_across': select_across,
+            'selected': () if select_across else request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        }
+        return TemplateResponse(request, 'admin/delete_quickly_confirmation.html', context)
+
+    with transaction.atomic(using=router.db_for_write(modeladmin.model)):
+        log_deletions(request, queryset)
+        deleted, _ = queryset.delete()
+    modeladmin.message_user(request, 'Удалено объектов: %d' % deleted, messages.SUCCESS)
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    '''Список объектов большой таблицы без полного подсчета строк'''
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+    actions = [delete_quickly]
+
+
+@admin.register(Product)
+class ProductAdmin(LargeTableAdmin):
+    '''Администрирование товаров'''
+    list_display = ('thumbnail', 'name', 'price', 'rating', 'rating_count')
+    search_fields = ('^name',)
+    actions = LargeTableAdmin.actions + ['raise_price', 'reduce_price']
+
+    @admin.display(description='Изображение')
+    def thumbnail(self, product):
+        '''Миниатюра изображения товара'''
+        if not product.image:
+            return ''
+        return format_html('<img src="{}" height="48" loading="lazy" alt="">',
+                           product.image.url)
+
+    def change_price(self, request, queryset, percent):
+        '''Изменить цену выбранных товаров на percent процентов'''
+        # Целочисленное деление в SQL отбрасывает дробную часть, поэтому
+        # + 50 округляет до ближайшего рубля (половина — вверх)
+        updated = queryset.update_price((F('price') * (100 + percent) + 50) / 100)
+        self.message_user(request, 'Цена изменена у товаров: %d' % updated, messages.SUCCESS)
+
+    @admin.action(description='Повысить цену на 10%%', permissions=['change'])
+    def raise_price(self, request, queryset):
+        '''Повысить цену на 10%'''
+        self.change_price(request, queryset, 10)
+
+    @admin.action(description='Снизить цену на 10%%', permissions=['change'])
+    def reduce_price(self, request, queryset):
+        '''Снизить цену на 10%'''
+        self.change_price(request, queryset, -10)
+
+
+@admin.register(Evaluation)
+class EvaluationAdmin(LargeTableAdmin):
+    '''Администрирование оценок'''
+    list_display = ('id', 'product', 'user', 'evaluation', 'updated_at')
+    list_filter = ('evaluation',)
+    list_select_related = ('product', 'user')
+    raw_id_fields = ('product', 'user')
+    search_fields = ('^user__username', '^product__name')
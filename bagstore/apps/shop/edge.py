@@ -0,0 +1,67 @@
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.cache import patch_cache_control
+
+
+logger = logging.getLogger(__name__)
+
+# Ключ всех общих страниц каталога
+CATALOG_KEY = 'catalog'
+# Ключ страниц со списком товаров: меняется при добавлении и удалении товаров
+LISTING_KEY = 'product-list'
+# Заголовок с ключами ответа, по которым прокси удаляет его из кеша
+SURROGATE_KEY_HEADER = 'Surrogate-Key'
+
+
+def product_key(pk):
+    '''Ключ страниц, на которых показан товар pk'''
+    return 'product-%s' % pk
+
+
+def patch_edge_cache(response, keys):
+    '''Разрешить общий кеш (прокси, CDN) для ответа и указать его ключи.
+
+    Браузер каждый раз перепроверяет ответ по ETag (max-age=0), а прокси
+    хранит его EDGE_CACHE_SECONDS секунд или до удаления по ключу.
+    '''
+    patch_cache_control(response, public=True, max_age=0, s_maxage=settings.EDGE_CACHE_SECONDS)
+    response[SURROGATE_KEY_HEADER] = ' '.join(dict.fromkeys(keys))
+    return response
+
+
+def send_purge(keys):
+    '''Удалить из кеша прокси ответы с ключами keys (запрос PURGE).
+
+    Ошибки доставки не прерывают работу: ответы все равно устареют
+    через EDGE_CACHE_SECONDS.
+    '''
+    import urllib.error
+    import urllib.request
+
+    request = urllib.request.Request(settings.EDGE_PURGE_URL, method='PURGE',
+                                     headers={SURROGATE_KEY_HEADER: ' '.join(keys)})
+    try:
+        with urllib.request.urlopen(request, timeout=settings.EDGE_PURGE_TIMEOUT):
+            pass
+    except (urllib.error.URLError, OSError) as error:
+        logger.warning('Не удалось удалить из кеша прокси ключи %s: %s', ' '.join(keys), error)
+
+
+def purge(keys, using=None):
+    '''Удалить ответы с ключами keys из кеша прокси после фиксации транзакции.
+
+    Без EDGE_PURGE_URL (прокси не используется) ничего не делает.
+    '''
+    keys = list(dict.fromkeys(keys))
+    if settings.EDGE_PURGE_URL and keys:
+        transaction.on_commit(lambda: send_purge(keys), using=using)
+
+
+def purge_products(product_ids, listing=False, using=None):
+    '''Удалить из кеша прокси страницы с товарами (и списки товаров, если listing)'''
+    keys = [product_key(pk) for pk in product_ids]
+    if listing:
+        keys.append(LISTING_KEY)
+    purge(keys, using)
@@ -0,0 +1,122 @@
+import csv
+import json
+import zlib
+from html import escape
+
+from django.db.models import Max
+from django.urls import reverse
+
+from apps.shop.models import Product
+from apps.shop.rows import ProductRow, image_url_builder
+
+
+# Сколько строк читать из БД за один запрос
+CHUNK_SIZE = 2000
+# Сколько товаров в одном файле карты сайта (ограничение протокола — 50 000)
+SITEMAP_SHARD_SIZE = 50000
+# Размер порции, которой отдается поток
+BUFFER_SIZE = 64 * 1024
+
+SITEMAP_NAMESPACE = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+class Echo:
+    '''Псевдобуфер для csv.writer: возвращает записанную строку'''
+
+    def write(self, value):
+        return value
+
+
+def iter_products(queryset=None):
+    '''Строки товаров, читаемые из БД порциями'''
+    if queryset is None:
+        queryset = Product.objects.all()
+    image_url = image_url_builder()
+    for pk, name, price, image, rating in (queryset.order_by('pk')
+                                           .values_list(*ProductRow.fields)
+                                           .iterator(chunk_size=CHUNK_SIZE)):
+        yield ProductRow(pk, name, price, image_url(image), rating)
+
+
+def product_url(base_url, pk):
+    '''Абсолютный адрес страницы товара'''
+    return base_url + reverse('product', args=[pk])
+
+
+def iter_csv(base_url):
+    '''Каталог в формате CSV'''
+    writer = csv.writer(Echo())
+    yield writer.writerow(['id', 'name', 'price', 'rating', 'url', 'image'])
+    for row in iter_products():
+        yield writer.writerow([row.pk, row.name, row.price, round(row.rating, 2),
+                               product_url(base_url, row.pk), base_url + row.image_url])
+
+
+def iter_jsonl(base_url):
+    '''Каталог в формате JSON Lines'''
+    for row in iter_products():
+        yield json.dumps({
+            'id': row.pk,
+            'name': row.name,
+            'price': row.price,
+            'rating': round(row.rating, 2),
+            'url': product_url(base_url, row.pk),
+            'image': base_url + row.image_url,
+        }, ensure_ascii=False) + '\n'
+
+
+def sitemap_shard_count():
+    '''Количество файлов карты сайта.
+
+    Файлы делятся по диапазонам первичного ключа, поэтому каждый
+    читается по индексу и не требует OFFSET.
+    '''
+    max_pk = Product.objects.aggregate(max_pk=Max('pk'))['max_pk'] or 0
+    return max(1, -(-max_pk // SITEMAP_SHARD_SIZE))
+
+
+def iter_sitemap_index(base_url):
+    '''Индекс карты сайта со ссылками на все файлы'''
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<sitemapindex xmlns="%s">\n' % SITEMAP_NAMESPACE
+    for shard in range(1, sitemap_shard_count() + 1):
+        location = base_url + reverse('sitemap_shard', args=[shard])
+        yield '<sitemap><loc>%s</loc></sitemap>\n' % escape(location, quote=False)
+    yield '</sitemapindex>\n'
+
+
+def iter_sitemap(base_url, shard):
+    '''Файл карты сайта с товарами из диапазона shard'''
+    queryset = Product.objects.filter(pk__gt=(shard - 1) * SITEMAP_SHARD_SIZE,
+                                      pk__lte=shard * SITEMAP_SHARD_SIZE)
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<urlset xmlns="%s">\n' % SITEMAP_NAMESPACE
+    for row in iter_products(queryset):
+        yield '<url><loc>%s</loc></url>\n' % escape(product_url(base_url, row.pk), quote=False)
+    yield '</urlset>\n'
+
+
+def buffered(chunks, size=BUFFER_SIZE):
+    '''Склеить мелкие строки в порции байтов размером около size'''
+    buffer = []
+    buffered_size = 0
+    for chunk in chunks:
+        chunk = chunk.encode('utf-8')
+        buffer.append(chunk)
+        buffered_size += len(chunk)
+        if buffered_size >= size:
+            yield b''.join(buffer)
+            buffer = []
+            buffered_size = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def gzipped(chunks):
+    '''Сжатие потока порций байтов в gzip на лету'''
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
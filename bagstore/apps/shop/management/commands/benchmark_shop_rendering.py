@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.template import engines
+
+from apps.shop.models import Product
+from apps.shop.rows import product_rows
+
+
+# Карточка товара: одинаковая разметка для обоих вариантов, отличается только URL
+CARD_TEMPLATE = '''{%% for product in product_list %%}
+<div class="product_card"><img src="{{ %s }}"><span>{{ product.name }}</span>
+<span>{{ product.price }}</span></div>{%% endfor %%}'''
+
+
+class Command(BaseCommand):
+    '''Сравнение скорости отображения списка товаров'''
+    help = 'Измеряет строки/с при отображении списка: экземпляры модели против облегченных строк'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000,
+                            help='Сколько товаров создать для замера')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Сколько раз повторить каждый замер')
+
+    def measure(self, template, get_rows, repeat):
+        '''Лучшее время загрузки и отображения строк'''
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            template.render({'product_list': get_rows()})
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        engine = engines['django']
+        model_template = engine.from_string(CARD_TEMPLATE % 'product.image.url')
+        row_template = engine.from_string(CARD_TEMPLATE % 'product.image_url')
+
+        with transaction.atomic():
+            Product.objects.bulk_create(
+                (Product(name='Сумка %d' % number, price=1000 + number,
+                         image='shop/product_photo/benchmark.png')
+                 for number in range(rows)),
+                batch_size=1000,
+            )
+            queryset = Product.objects.all()
+            results = [
+                ('Экземпляры модели', self.measure(
+                    model_template, lambda: list(queryset), options['repeat'])),
+                ('Облегченные строки', self.measure(
+                    row_template, lambda: product_rows(queryset), options['repeat'])),
+            ]
+            transaction.set_rollback(True)
+
+        for title, elapsed in results:
+            self.stdout.write('%s: %.0f строк/с (%.3f с)' % (title, rows / elapsed, elapsed))
@@ -0,0 +1,78 @@
+import posixpath
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import router
+from django.utils import timezone
+
+from apps.shop.models import Product
+
+
+def stored_files(storage, directory):
+    '''Все файлы каталога directory хранилища, включая вложенные каталоги'''
+    directories, files = storage.listdir(directory)
+    for name in files:
+        if not name.startswith('.'):
+            yield posixpath.join(directory, name)
+    for subdirectory in directories:
+        yield from stored_files(storage, posixpath.join(directory, subdirectory))
+
+
+class Command(BaseCommand):
+    '''Удаление изображений, на которые не ссылается ни один товар'''
+    help = ('Удаляет файлы изображений товаров, на которые не ссылается ни один товар '
+            'и которые не менялись дольше указанного срока')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-age', type=int, default=24,
+                            help='Не удалять файлы, менявшиеся за последние N часов '
+                                 '(по умолчанию 24)')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Сколько файлов проверять одним запросом')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Только посчитать, что будет удалено')
+
+    def handle(self, *args, **options):
+        field = Product._meta.get_field('image')
+        storage = field.storage
+        directory = field.upload_to.rstrip('/')
+        if not storage.exists(directory):
+            self.stdout.write('Каталог изображений пуст')
+            return
+        # Повторная загрузка обновляет время изменения файла, поэтому
+        # недавно измененный файл может быть нужен еще не сохраненному товару
+        threshold = timezone.now() - timedelta(hours=options['min_age'])
+
+        deleted = 0
+        batch = []
+        for name in stored_files(storage, directory):
+            if storage.get_modified_time(name) < threshold:
+                batch.append(name)
+            if len(batch) >= options['batch_size']:
+                deleted += self.delete_unreferenced(storage, batch, threshold, options['dry_run'])
+                batch = []
+        if batch:
+            deleted += self.delete_unreferenced(storage, batch, threshold, options['dry_run'])
+
+        action = 'Будет удалено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(self.style.SUCCESS('%s файлов изображений: %d' % (action, deleted)))
+
+    def delete_unreferenced(self, storage, names, threshold, dry_run):
+        '''Удалить файлы names, на которые не ссылается ни один товар.
+
+        Ссылки проверяются после отбора файлов по времени изменения, а
+        время еще раз — непосредственно перед удалением.
+        '''
+        # Основная БД, а не реплика: на реплике может еще не быть нового товара
+        products = Product.objects.using(router.db_for_write(Product))
+        referenced = set(products.filter(image__in=names).values_list('image', flat=True))
+        deleted = 0
+        for name in names:
+            if name in referenced:
+                continue
+            if not dry_run:
+                if storage.get_modified_time(name) >= threshold:
+                    continue
+                storage.delete(name)
+            deleted += 1
+        return deleted
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.shop.recommendations import TOP_K, rebuild_recommendations
+
+
+class Command(BaseCommand):
+    '''Офлайн-расчет рекомендаций "с этим товаром также покупают"'''
+    help = 'Пересчитывает рекомендации товаров по корзинам и оценкам'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=TOP_K,
+                            help='Сколько соседей хранить для каждого товара')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        count = rebuild_recommendations(options['top_k'])
+        self.stdout.write(self.style.SUCCESS(
+            'Сохранено рекомендаций: %d за %.2f с' % (count, time.monotonic() - started)
+        ))
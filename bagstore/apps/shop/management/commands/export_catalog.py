@@ -0,0 +1,59 @@
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.shop import exports
+
+
+class Command(BaseCommand):
+    '''Потоковая выгрузка каталога в файлы'''
+    help = 'Выгружает каталог в CSV, JSON Lines или карту сайта, не загружая его в память'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=('csv', 'jsonl', 'sitemap'), default='csv',
+                            help='Формат выгрузки')
+        parser.add_argument('--output',
+                            help='Файл выгрузки (для карты сайта — каталог); '
+                                 'по умолчанию — стандартный вывод')
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000',
+                            help='Адрес сайта для абсолютных ссылок')
+        parser.add_argument('--gzip', action='store_true', help='Сжимать файлы в gzip')
+
+    def write(self, path, chunks, use_gzip):
+        '''Записать поток в файл (или стандартный вывод)'''
+        chunks = exports.buffered(chunks)
+        if use_gzip:
+            chunks = exports.gzipped(chunks)
+        if path is None:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            return
+        with open(path, 'wb') as output:
+            for chunk in chunks:
+                output.write(chunk)
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        base_url = options['base_url'].rstrip('/')
+        use_gzip = options['gzip']
+        suffix = '.gz' if use_gzip else ''
+
+        if options['format'] == 'sitemap':
+            directory = options['output']
+            if directory is None:
+                raise CommandError('Для карты сайта укажите каталог --output')
+            os.makedirs(directory, exist_ok=True)
+            self.write(os.path.join(directory, 'sitemap.xml' + suffix),
+                       exports.iter_sitemap_index(base_url), use_gzip)
+            for shard in range(1, exports.sitemap_shard_count() + 1):
+                self.write(os.path.join(directory, 'sitemap-%d.xml%s' % (shard, suffix)),
+                           exports.iter_sitemap(base_url, shard), use_gzip)
+        else:
+            generate = exports.iter_csv if options['format'] == 'csv' else exports.iter_jsonl
+            self.write(options['output'], generate(base_url), use_gzip)
+
+        if options['output'] is not None:
+            self.stdout.write(self.style.SUCCESS(
+                'Каталог выгружен за %.2f с' % (time.monotonic() - started)))
@@ -0,0 +1,41 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bagstore.importtime import profile_boot
+
+
+class Command(BaseCommand):
+    '''Профилирование импортов при запуске рабочего процесса'''
+    help = ('Запускает Django в отдельном процессе под python -X importtime '
+            'и показывает модули, дольше всего импортируемые при старте')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=25,
+                            help='Сколько модулей показать')
+        parser.add_argument('--sort', choices=('cumulative', 'self'), default='cumulative',
+                            help='Сортировать по общему (с вложенными) или собственному времени')
+        parser.add_argument('--no-urls', action='store_true',
+                            help='Не загружать маршруты (только django.setup())')
+
+    def handle(self, *args, **options):
+        try:
+            records, elapsed = profile_boot(urls=not options['no_urls'])
+        except RuntimeError as error:
+            raise CommandError('Процесс завершился с ошибкой: %s' % error)
+
+        key = 'cumulative_us' if options['sort'] == 'cumulative' else 'self_us'
+        records.sort(key=lambda record: getattr(record, key), reverse=True)
+        self.stdout.write('%10s %12s  %s' % ('собств., мс', 'общее, мс', 'модуль'))
+        for record in records[:options['top']]:
+            self.stdout.write('%10.1f %12.1f  %s%s' % (
+                record.self_us / 1000, record.cumulative_us / 1000,
+                '  ' * record.depth, record.module))
+
+        total = sum(record.self_us for record in records)
+        if sys.dont_write_bytecode:
+            self.stderr.write('Запись байт-кода отключена (PYTHONDONTWRITEBYTECODE): '
+                              'модули компилируются при каждом запуске')
+        self.stdout.write(self.style.SUCCESS(
+            'Модулей: %d, импорт %.1f мс, запуск процесса %.1f мс'
+            % (len(records), total / 1000, elapsed * 1000)))
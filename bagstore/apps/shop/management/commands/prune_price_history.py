@@ -0,0 +1,66 @@
+import gzip
+import json
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.shop.models import PriceHistory
+
+
+class Command(BaseCommand):
+    '''Удаление и архивирование старой истории цен'''
+    help = 'Удаляет историю цен старше указанной даты, при необходимости архивируя ее в JSONL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--before', help='Граница периода (ISO 8601)')
+        parser.add_argument('--days', type=int, help='Хранить историю за последние N дней')
+        parser.add_argument('--archive', help='Файл архива JSONL (.gz — со сжатием)')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Сколько записей удалять за один запрос')
+
+    def get_before(self, options):
+        '''Граница периода удаления'''
+        if options['before']:
+            before = parse_datetime(options['before'])
+            if before is None:
+                raise CommandError('Неверный формат даты: %s' % options['before'])
+            if timezone.is_naive(before):
+                before = timezone.make_aware(before)
+            return before
+        if options['days'] is not None:
+            return timezone.now() - timedelta(days=options['days'])
+        raise CommandError('Укажите --before или --days')
+
+    def handle(self, *args, **options):
+        before = self.get_before(options)
+        archive = None
+        if options['archive']:
+            opener = gzip.open if options['archive'].endswith('.gz') else open
+            archive = opener(options['archive'], 'at', encoding='utf-8')
+
+        started = time.monotonic()
+        deleted = 0
+        prunable = PriceHistory.objects.prunable(before).order_by('pk')
+        try:
+            while True:
+                rows = list(prunable.values('pk', 'product_id', 'price', 'changed_at')
+                            [:options['batch_size']])
+                if not rows:
+                    break
+                if archive is not None:
+                    for row in rows:
+                        row['changed_at'] = row['changed_at'].isoformat()
+                        archive.write(json.dumps(row) + '\n')
+                    archive.flush()
+                PriceHistory.objects.filter(pk__in=[row['pk'] for row in rows]).delete()
+                deleted += len(rows)
+        finally:
+            if archive is not None:
+                archive.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            'Удалено записей истории цен: %d за %.2f с' % (deleted, time.monotonic() - started)
+        ))
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    '''Копирование основной БД SQLite в реплики для локальной разработки'''
+    help = ('Копирует основную БД SQLite в файлы реплик из DATABASE_REPLICAS. '
+            'Для других СУБД реплики заполняет их собственная репликация')
+
+    def add_arguments(self, parser):
+        parser.add_argument('replicas', nargs='*',
+                            help='Какие реплики обновить (по умолчанию все)')
+
+    def handle(self, *args, **options):
+        replicas = options['replicas'] or settings.DATABASE_REPLICAS
+        if not replicas:
+            self.stdout.write('Реплики не настроены')
+            return
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != 'sqlite':
+            raise CommandError('Копировать можно только SQLite; '
+                               'для %s настройте репликацию самой СУБД' % primary.vendor)
+        primary.ensure_connection()
+        for alias in replicas:
+            replica = connections[alias]
+            if replica.vendor != 'sqlite':
+                raise CommandError('Реплика %s — не SQLite' % alias)
+            replica.ensure_connection()
+            # Резервное копирование SQLite переносит схему и данные целиком
+            # и дает согласованный снимок, даже если основная БД меняется
+            primary.connection.backup(replica.connection)
+            self.stdout.write(self.style.SUCCESS('Реплика %s обновлена' % alias))
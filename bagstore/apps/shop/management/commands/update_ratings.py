@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.shop.ratings import update_ratings
+
+
+class Command(BaseCommand):
+    '''Материализация байесовского рейтинга товаров'''
+    help = 'Пересчитывает рейтинг товаров, оценки которых изменились'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Сколько товаров пересчитывать за один запрос')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        count = update_ratings(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            'Пересчитан рейтинг товаров: %d за %.2f с' % (count, time.monotonic() - started)
+        ))
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.shop.warmup import hot_product_ids, warm, warm_paths
+
+
+class Command(BaseCommand):
+    '''Прогрев кешей после развертывания'''
+    help = ('Запрашивает у работающего сайта главную страницу, первые страницы магазина '
+            'и страницы самых популярных товаров, чтобы заполнить кеши')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000',
+                            help='Адрес сайта (по умолчанию http://127.0.0.1:8000)')
+        parser.add_argument('--products', type=int, default=100,
+                            help='Сколько популярных товаров прогревать')
+        parser.add_argument('--pages', type=int, default=3,
+                            help='Сколько первых страниц магазина прогревать')
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Сколько запросов выполнять одновременно')
+        parser.add_argument('--timeout', type=float, default=30,
+                            help='Время ожидания ответа, с')
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1:
+            raise CommandError('--workers должно быть не меньше 1')
+        started = time.monotonic()
+        base_url = options['base_url'].rstrip('/')
+        paths = warm_paths(hot_product_ids(options['products']), options['pages'])
+
+        def progress(done, total, url, status, seconds):
+            self.stdout.write('[%d/%d] %s %s %.2f с' % (done, total, status, url, seconds))
+
+        failed = warm([base_url + path for path in paths], options['workers'],
+                      options['timeout'], progress)
+
+        elapsed = time.monotonic() - started
+        if failed:
+            self.stderr.write('Не удалось прогреть страниц: %d' % len(failed))
+        self.stdout.write(self.style.SUCCESS(
+            'Прогрето страниц: %d за %.2f с' % (len(paths) - len(failed), elapsed)))
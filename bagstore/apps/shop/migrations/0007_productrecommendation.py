@@ -0,0 +1,27 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0006_delete_cart'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='Схожесть товаров')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='shop.product', verbose_name='Товар')),
+                ('recommended', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommended_for', to='shop.product', verbose_name='Рекомендуемый товар')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['product', '-score'], name='shop_recommendation_top_idx')],
+                'unique_together': {('product', 'recommended')},
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0007_productrecommendation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evaluation',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Дата изменения оценки'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating',
+            field=models.FloatField(db_index=True, default=0, editable=False, verbose_name='Взвешенный рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Количество оценок'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_updated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Рейтинг пересчитан'),
+        ),
+    ]
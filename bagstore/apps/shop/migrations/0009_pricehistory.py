@@ -0,0 +1,39 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:11
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def record_current_prices(apps, schema_editor):
+    '''Начальная запись истории для уже существующих товаров'''
+    Product = apps.get_model('shop', 'Product')
+    PriceHistory = apps.get_model('shop', 'PriceHistory')
+    PriceHistory.objects.bulk_create(
+        (PriceHistory(product_id=pk, price=price)
+         for pk, price in Product.objects.values_list('pk', 'price').iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0008_product_rating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('price', models.IntegerField(verbose_name='Цена')),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата изменения цены')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_history', to='shop.product', verbose_name='Товар')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['product', 'changed_at'], name='shop_price_history_idx'), models.Index(fields=['changed_at'], name='shop_price_history_time_idx')],
+            },
+        ),
+        migrations.RunPython(record_current_prices, migrations.RunPython.noop),
+    ]
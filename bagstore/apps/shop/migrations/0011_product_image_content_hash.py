@@ -0,0 +1,19 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:15
+
+import apps.shop.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0010_product_name_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='image',
+            field=models.ImageField(db_index=True, storage=apps.shop.storage.product_image_storage, upload_to='shop/product_photo/', verbose_name='Изображение'),
+        ),
+    ]
@@ -1,22 +1,111 @@
 from django.contrib.auth import get_user_model
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
+
+from apps.outbox.events import record_queryset
+from apps.outbox.models import OutboxEvent
+from apps.shop.edge import purge_products
+from apps.shop.storage import product_image_storage
+from apps.shop.versions import bump_catalog_version
 
 
 User = get_user_model()
 
 
+class ProductQuerySet(models.QuerySet):
+    '''Выборка товаров, ведущая историю цен при массовых изменениях'''
+
+    # Сколько товаров обрабатывать за один запрос при массовых операциях
+    batch_size = 500
+
+    def bulk_create(self, objs, *args, **kwargs):
+        '''Массовое создание товаров (импорт) вместе с начальными ценами'''
+        self._for_write = True
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            PriceHistory.objects.using(self.db).bulk_create(
+                [PriceHistory(product_id=obj.pk, price=obj.price)
+                 for obj in objs if obj.pk is not None],
+                batch_size=self.batch_size,
+            )
+            created_ids = [obj.pk for obj in objs if obj.pk is not None]
+            record_queryset(Product.objects.using(self.db).filter(pk__in=created_ids),
+                            OutboxEvent.CREATED)
+            purge_products(created_ids, listing=True, using=self.db)
+        bump_catalog_version()
+        return objs
+
+    def update_price(self, price):
+        '''Массово изменить цену (число или выражение F) с записью истории.
+
+        Возвращает количество измененных товаров.
+        '''
+        updated = 0
+        self._for_write = True
+        with transaction.atomic(using=self.db):
+            product_ids = list(self.values_list('pk', flat=True))
+            for start in range(0, len(product_ids), self.batch_size):
+                batch = Product.objects.using(self.db).filter(
+                    pk__in=product_ids[start:start + self.batch_size])
+                updated += batch.update(price=price)
+                changed_at = timezone.now()
+                PriceHistory.objects.using(self.db).bulk_create(
+                    PriceHistory(product_id=pk, price=new_price, changed_at=changed_at)
+                    for pk, new_price in batch.values_list('pk', 'price')
+                )
+                record_queryset(batch, OutboxEvent.UPDATED)
+                purge_products(product_ids[start:start + self.batch_size], using=self.db)
+        bump_catalog_version()
+        return updated
+
+
 class Product(models.Model):
     '''Продукция в магазине'''
-    name = models.CharField(max_length=100, verbose_name='Название')
+    name = models.CharField(max_length=100, db_index=True, verbose_name='Название')
     price = models.IntegerField(verbose_name='Цена')
-    image = models.ImageField(upload_to='shop/product_photo/%Y/%m/%d/', 
-                              verbose_name='Изображение')
+    image = models.ImageField(upload_to='shop/product_photo/', storage=product_image_storage,
+                              db_index=True, verbose_name='Изображение')
+    rating = models.FloatField(default=0, db_index=True, editable=False,
+                               verbose_name='Взвешенный рейтинг')
+    rating_count = models.IntegerField(default=0, editable=False,
+                                       verbose_name='Количество оценок')
+    rating_updated_at = models.DateTimeField(null=True, blank=True, editable=False,
+                                             verbose_name='Рейтинг пересчитан')
+
+    objects = ProductQuerySet.as_manager()
 
     def __str__(self):
         '''Строковое представление'''
         return "%s" % str(self.name)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        '''Запомнить загруженную цену, чтобы заметить ее изменение'''
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_price = instance.__dict__.get('price')
+        return instance
+
+    def _price_changed(self, update_fields):
+        '''Изменилась ли цена с момента загрузки'''
+        if self._state.adding:
+            return True
+        if update_fields is not None and 'price' not in update_fields:
+            return False
+        if 'price' in self.get_deferred_fields():
+            return False
+        return self.price != getattr(self, '_loaded_price', None)
+
+    def save(self, *args, **kwargs):
+        '''Сохранить товар и записать новую цену в историю той же транзакцией'''
+        price_changed = self._price_changed(kwargs.get('update_fields'))
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+            if price_changed:
+                PriceHistory.objects.using(self._state.db).create(
+                    product=self, price=self.price)
+        self._loaded_price = self.price
+
 
 class Evaluation(models.Model):
     '''Оценка товара'''
@@ -26,7 +115,66 @@ class Evaluation(models.Model):
                              verbose_name='Пользователь, поставивший оценку')
     product = models.ForeignKey(Product, on_delete=models.CASCADE, 
                                 verbose_name='Оцениваемый товар')
-    
+    updated_at = models.DateTimeField(auto_now=True, db_index=True,
+                                      verbose_name='Дата изменения оценки')
+
     class Meta:
         unique_together = ('user', 'product')
-        
\ No newline at end of file
+
+
+class ProductRecommendation(models.Model):
+    '''Рекомендация "с этим товаром также покупают"'''
+    product = models.ForeignKey(Product, on_delete=models.CASCADE,
+                                related_name='recommendations',
+                                verbose_name='Товар')
+    recommended = models.ForeignKey(Product, on_delete=models.CASCADE,
+                                    related_name='recommended_for',
+                                    verbose_name='Рекомендуемый товар')
+    score = models.FloatField(verbose_name='Схожесть товаров')
+
+    class Meta:
+        unique_together = ('product', 'recommended')
+        indexes = [
+            models.Index(fields=['product', '-score'], name='shop_recommendation_top_idx'),
+        ]
+
+
+class PriceHistoryQuerySet(models.QuerySet):
+    '''Выборка истории цен'''
+
+    def price_at(self, product, moment):
+        '''Цена товара, действовавшая в момент moment'''
+        return (self.filter(product=product, changed_at__lte=moment)
+                    .order_by('-changed_at', '-pk')
+                    .values_list('price', flat=True)
+                    .first())
+
+    def prunable(self, before):
+        '''Записи старше before, без которых история по-прежнему полна.
+
+        Последняя запись до before сохраняется: она задает цену
+        на начало оставшегося периода.
+        '''
+        latest = (PriceHistory.objects
+                  .filter(product=models.OuterRef('product'), changed_at__lt=before)
+                  .order_by('-changed_at', '-pk')
+                  .values('pk')[:1])
+        return (self.filter(changed_at__lt=before)
+                    .exclude(pk=models.Subquery(latest)))
+
+
+class PriceHistory(models.Model):
+    '''История цен товара (только добавление записей)'''
+    product = models.ForeignKey(Product, on_delete=models.CASCADE,
+                                related_name='price_history',
+                                verbose_name='Товар')
+    price = models.IntegerField(verbose_name='Цена')
+    changed_at = models.DateTimeField(default=timezone.now, verbose_name='Дата изменения цены')
+
+    objects = PriceHistoryQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['product', 'changed_at'], name='shop_price_history_idx'),
+            models.Index(fields=['changed_at'], name='shop_price_history_time_idx'),
+        ]
@@ -0,0 +1,47 @@
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
+
+
+# Начиная с какого размера таблицы вместо COUNT(*) используется оценка
+ESTIMATE_THRESHOLD = 100_000
+
+
+def estimated_count(queryset):
+    '''Оценка числа строк таблицы по статистике БД.
+
+    Возвращает None, если выборка отфильтрована или статистики нет.
+    '''
+    if queryset.query.where:
+        return None
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    if connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE relname = %s'
+    elif connection.vendor == 'sqlite':
+        # Таблица sqlite_stat1 заполняется командой ANALYZE
+        sql = 'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1'
+    else:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None:
+        return None
+    estimate = int(str(row[0]).split()[0])
+    return estimate if estimate >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    '''Пагинатор, не считающий строки больших таблиц через COUNT(*)'''
+
+    @cached_property
+    def count(self):
+        '''Количество строк: оценка для больших таблиц, точное для остальных'''
+        estimate = estimated_count(self.object_list)
+        if estimate is not None and estimate >= ESTIMATE_THRESHOLD:
+            return estimate
+        return super().count
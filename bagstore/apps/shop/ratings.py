@@ -0,0 +1,63 @@
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from apps.outbox.events import record_queryset
+from apps.outbox.models import OutboxEvent
+from apps.shop.edge import purge_products
+from apps.shop.models import Evaluation, Product
+from apps.shop.versions import bump_catalog_version
+
+
+# Априорное среднее и его вес (в "виртуальных" оценках) для байесовского рейтинга
+PRIOR_MEAN = 3.0
+PRIOR_WEIGHT = 10
+
+
+def bayesian_rating(total, count):
+    '''Байесовский рейтинг: среднее оценок, стянутое к априорному среднему'''
+    return (PRIOR_MEAN * PRIOR_WEIGHT + total) / (PRIOR_WEIGHT + count)
+
+
+def stale_products():
+    '''Товары, оценки которых изменились после последнего пересчета рейтинга'''
+    return (Product.objects
+            .filter(Q(rating_updated_at__isnull=True)
+                    | Q(evaluation__updated_at__gte=F('rating_updated_at')))
+            .distinct())
+
+
+def update_ratings(batch_size=500):
+    '''Пересчитать рейтинг только у изменившихся товаров.
+
+    Возвращает количество пересчитанных товаров.
+    '''
+    started = timezone.now()
+    product_ids = list(stale_products().values_list('pk', flat=True))
+
+    for start in range(0, len(product_ids), batch_size):
+        batch = product_ids[start:start + batch_size]
+        stats = {
+            row['product_id']: (row['total'], row['count'])
+            for row in (Evaluation.objects
+                        .filter(product_id__in=batch)
+                        .values('product_id')
+                        .annotate(total=Sum('evaluation'), count=Count('pk')))
+        }
+        products = []
+        for product_id in batch:
+            total, count = stats.get(product_id, (0, 0))
+            products.append(Product(pk=product_id,
+                                    rating=bayesian_rating(total, count),
+                                    rating_count=count,
+                                    rating_updated_at=started))
+        with transaction.atomic():
+            Product.objects.bulk_update(
+                products, ['rating', 'rating_count', 'rating_updated_at'])
+            record_queryset(Product.objects.filter(pk__in=batch), OutboxEvent.UPDATED)
+            # Рейтинг меняет и карточки товаров, и порядок сортировки по рейтингу
+            purge_products(batch, listing=True)
+
+    if product_ids:
+        bump_catalog_version()
+    return len(product_ids)
@@ -0,0 +1,93 @@
+import heapq
+import math
+from collections import Counter, defaultdict
+from itertools import combinations
+
+from django.db import transaction
+from django.db.models import Sum
+
+from apps.shop.models import Evaluation, Product, ProductRecommendation
+from apps.shop.versions import bump_catalog_version
+
+
+# Сколько соседей хранится для каждого товара
+TOP_K = 10
+# Оценка, начиная с которой товар считается понравившимся пользователю
+POSITIVE_EVALUATION = 4
+
+
+def load_baskets():
+    '''Множества товаров каждого пользователя: корзины и высокие оценки'''
+    from apps.cart.models import Cart
+
+    baskets = defaultdict(set)
+    interactions = (
+        Cart.objects.values_list('user_id', 'product_id'),
+        Evaluation.objects.filter(evaluation__gte=POSITIVE_EVALUATION)
+                          .values_list('user_id', 'product_id'),
+    )
+    for queryset in interactions:
+        for user_id, product_id in queryset.iterator(chunk_size=2000):
+            baskets[user_id].add(product_id)
+    return baskets
+
+
+def compute_similarities(baskets, top_k=TOP_K):
+    '''Косинусная схожесть товаров по совместной встречаемости.
+
+    Возвращает словарь: товар -> список (схожесть, соседний товар)
+    по убыванию схожести, не длиннее top_k.
+    '''
+    item_counts = Counter()
+    pair_counts = Counter()
+    for products in baskets.values():
+        products = sorted(products)
+        item_counts.update(products)
+        pair_counts.update(combinations(products, 2))
+
+    neighbours = defaultdict(list)
+    for (first, second), together in pair_counts.items():
+        score = together / math.sqrt(item_counts[first] * item_counts[second])
+        neighbours[first].append((score, second))
+        neighbours[second].append((score, first))
+
+    return {
+        product_id: heapq.nlargest(top_k, candidates)
+        for product_id, candidates in neighbours.items()
+    }
+
+
+def rebuild_recommendations(top_k=TOP_K):
+    '''Пересчитать и сохранить рекомендации для всех товаров'''
+    similarities = compute_similarities(load_baskets(), top_k)
+    recommendations = [
+        ProductRecommendation(product_id=product_id,
+                              recommended_id=recommended_id,
+                              score=score)
+        for product_id, neighbours in similarities.items()
+        for score, recommended_id in neighbours
+    ]
+    with transaction.atomic():
+        ProductRecommendation.objects.all().delete()
+        ProductRecommendation.objects.bulk_create(recommendations, batch_size=1000)
+    bump_catalog_version()
+    return len(recommendations)
+
+
+def recommendations_for(product, limit=TOP_K):
+    '''Рекомендации для одного товара одним запросом'''
+    return (Product.objects
+            .filter(recommended_for__product=product)
+            .order_by('-recommended_for__score')[:limit])
+
+
+def recommendations_for_products(product_ids, limit=TOP_K):
+    '''Рекомендации для набора товаров (например, корзины) одним запросом'''
+    product_ids = list(product_ids)
+    if not product_ids:
+        return Product.objects.none()
+    return (Product.objects
+            .filter(recommended_for__product_id__in=product_ids)
+            .exclude(pk__in=product_ids)
+            .annotate(recommendation_score=Sum('recommended_for__score'))
+            .order_by('-recommendation_score')[:limit])
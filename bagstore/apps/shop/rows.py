@@ -0,0 +1,47 @@
+from django.utils.encoding import filepath_to_uri
+
+from apps.shop.models import Product
+
+
+class ProductRow:
+    '''Облегченная строка товара для отображения в списках'''
+    __slots__ = ('pk', 'name', 'price', 'image_url', 'rating', 'sale_price',
+                 'display_price', 'display_sale_price')
+
+    # Поля, которые загружаются из БД для строки
+    fields = ('pk', 'name', 'price', 'image', 'rating')
+
+    def __init__(self, pk, name, price, image_url, rating):
+        self.pk = pk
+        self.name = name
+        self.price = price
+        self.image_url = image_url
+        self.rating = rating
+        self.sale_price = price
+        self.display_price = None
+        self.display_sale_price = None
+
+    def __repr__(self):
+        '''Отладочное представление'''
+        return '<ProductRow: %s>' % self.name
+
+
+def image_url_builder():
+    '''Функция, строящая URL изображения по имени файла.
+
+    Базовый URL хранилища вычисляется один раз, а не для каждой строки.
+    '''
+    storage = Product._meta.get_field('image').storage
+    base_url = getattr(storage, 'base_url', None)
+    if base_url is None:
+        return lambda name: storage.url(name) if name else ''
+    return lambda name: base_url + filepath_to_uri(name).lstrip('/') if name else ''
+
+
+def product_rows(queryset):
+    '''Строки товаров из выборки без создания экземпляров модели'''
+    image_url = image_url_builder()
+    return [
+        ProductRow(pk, name, price, image_url(image), rating)
+        for pk, name, price, image, rating in queryset.values_list(*ProductRow.fields)
+    ]
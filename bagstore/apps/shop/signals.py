@@ -0,0 +1,31 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.shop.edge import purge_products
+from apps.shop.models import Evaluation, Product
+from apps.shop.versions import bump_catalog_version
+
+
+@receiver(post_delete, sender=Evaluation)
+def mark_rating_stale(sender, instance, **kwargs):
+    '''Удаленная оценка не оставляет следа, поэтому рейтинг помечается устаревшим'''
+    Product.objects.filter(pk=instance.product_id).update(rating_updated_at=None)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def product_changed(sender, **kwargs):
+    '''Изменение товара меняет версию каталога'''
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=Product)
+def purge_saved_product(sender, instance, created, using, **kwargs):
+    '''Удалить из кеша прокси страницы с товаром (и списки, если товар новый)'''
+    purge_products([instance.pk], listing=created, using=using)
+
+
+@receiver(post_delete, sender=Product)
+def purge_deleted_product(sender, instance, using, **kwargs):
+    '''Удалить из кеша прокси страницы с удаленным товаром и списки товаров'''
+    purge_products([instance.pk], listing=True, using=using)
@@ -0,0 +1,56 @@
+// Подстановка данных посетителя в общую страницу из кеша прокси:
+// значок корзины, CSRF-токен в формах, избранное, выбранная валюта и цены в ней
+(function () {
+    'use strict';
+
+    var script = document.currentScript;
+
+    function formatPrice(price, currency) {
+        // Так же, как CurrencyRate.format_many на сервере
+        var unit = Math.pow(10, currency.decimals);
+        var amount = Math.round(price * currency.rate * unit);
+        return (amount / unit).toFixed(currency.decimals) + ' ' + currency.symbol;
+    }
+
+    function apply(visitor) {
+        document.querySelectorAll('[data-visitor="csrf_token"]').forEach(function (input) {
+            input.value = visitor.csrf_token;
+        });
+        document.querySelectorAll('[data-visitor="cart_count"]').forEach(function (badge) {
+            badge.textContent = visitor.cart_count;
+            badge.hidden = !visitor.cart_count;
+        });
+        document.querySelectorAll('[data-visitor="currency"]').forEach(function (select) {
+            select.value = visitor.currency.code;
+        });
+        document.querySelectorAll('[data-wishlist-product]').forEach(function (button) {
+            var wishlisted = visitor.wishlist.indexOf(Number(button.dataset.wishlistProduct)) !== -1;
+            button.classList.toggle('wishlisted', wishlisted);
+            button.textContent = wishlisted ? '♥' : '♡';
+            button.title = wishlisted ? 'Убрать из избранного' : 'В избранное';
+        });
+        if (visitor.currency.code !== 'RUB') {
+            document.querySelectorAll('[data-price]').forEach(function (price) {
+                price.textContent = formatPrice(Number(price.dataset.price), visitor.currency);
+            });
+        }
+    }
+
+    function load() {
+        // Товары страницы: ответ скажет, какие из них в избранном
+        var products = [];
+        document.querySelectorAll('[data-wishlist-product]').forEach(function (button) {
+            products.push(button.dataset.wishlistProduct);
+        });
+        var url = script.dataset.url + (products.length ? '?products=' + products.join(',') : '');
+        fetch(url, {credentials: 'same-origin'})
+            .then(function (response) { return response.json(); })
+            .then(apply);
+    }
+
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', load);
+    } else {
+        load();
+    }
+})();
@@ -0,0 +1,109 @@
+import hashlib
+import os
+import posixpath
+import tempfile
+
+from django.core.files.storage import FileSystemStorage, InMemoryStorage, storages
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.functional import LazyObject, empty
+
+
+class ContentHashMixin:
+    '''Именование файлов по хешу содержимого'''
+    chunk_size = 64 * 1024
+
+    def get_available_name(self, name, max_length=None):
+        '''Имя определяется содержимым, поэтому подбирать свободное не нужно'''
+        return name
+
+    def hashed_name(self, name, digest):
+        '''Имя файла по хешу: каталог/первые два символа/хеш.расширение'''
+        directory = posixpath.dirname(name.replace('\\', '/'))
+        extension = os.path.splitext(name)[1].lower()
+        return posixpath.join(directory, digest[:2], digest + extension)
+
+
+class ContentHashStorage(ContentHashMixin, FileSystemStorage):
+    '''Хранилище, именующее файлы по хешу содержимого.
+
+    Одинаковые файлы хранятся один раз: повторная загрузка не пишет
+    ничего на диск и возвращает имя уже существующего файла, лишь
+    обновляя время его изменения. Файлы без ссылок удаляет команда
+    cleanup_images, и только достаточно давно не менявшиеся. Это сужает,
+    но не исключает гонку: команда может удалить файл между проверкой
+    и обновлением времени. Тогда файл записывается заново, но если
+    удаление пришлось на момент после записи, а товар еще не сохранен,
+    товар останется со ссылкой на удаленный файл.
+    '''
+
+    def _save(self, name, content):
+        '''Сохранить файл, вычисляя хеш во время записи во временный файл'''
+        os.makedirs(self.location, exist_ok=True)
+        hasher = hashlib.sha256()
+        descriptor, temporary_path = tempfile.mkstemp(dir=self.location, prefix='.upload-')
+        try:
+            with os.fdopen(descriptor, 'wb') as temporary:
+                if hasattr(content, 'seek') and content.seekable():
+                    content.seek(0)
+                for chunk in content.chunks(self.chunk_size):
+                    hasher.update(chunk)
+                    temporary.write(chunk)
+
+            name = self.hashed_name(name, hasher.hexdigest())
+            full_path = self.path(name)
+            try:
+                # Такой файл уже есть: достаточно обновить время изменения
+                os.utime(full_path)
+            except FileNotFoundError:
+                # Файла нет или cleanup_images только что его удалила
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                os.replace(temporary_path, full_path)
+                if self.file_permissions_mode is not None:
+                    os.chmod(full_path, self.file_permissions_mode)
+            else:
+                os.remove(temporary_path)
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+        return name
+
+
+class InMemoryContentHashStorage(ContentHashMixin, InMemoryStorage):
+    '''Хранилище в памяти с именованием по хешу (для тестов)'''
+
+    def _save(self, name, content):
+        '''Сохранить файл под именем по хешу.
+
+        Файл с тем же содержимым перезаписывается тем же содержимым, что
+        обновляет время его изменения, как в ContentHashStorage.
+        '''
+        hasher = hashlib.sha256()
+        for chunk in content.chunks(self.chunk_size):
+            hasher.update(chunk)
+        name = self.hashed_name(name, hasher.hexdigest())
+        content.seek(0)
+        return super()._save(name, content)
+
+
+class ProductImageStorage(LazyObject):
+    '''Хранилище изображений товаров, выбираемое по STORAGES при первом обращении'''
+
+    def _setup(self):
+        self._wrapped = storages['product_images']
+
+
+product_images = ProductImageStorage()
+
+
+@receiver(setting_changed)
+def reset_product_images(*, setting, **kwargs):
+    '''Сбросить хранилище при изменении STORAGES (например, в тестах)'''
+    if setting == 'STORAGES':
+        product_images._wrapped = empty
+
+
+def product_image_storage():
+    '''Хранилище изображений товаров (настраивается в STORAGES)'''
+    return product_images
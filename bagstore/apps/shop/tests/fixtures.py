@@ -0,0 +1,19 @@
+import functools
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+
+IMAGE_PATH = settings.BASE_DIR / 'bagstore' / 'media_for_tests' / 'woman.png'
+
+
+@functools.cache
+def image_content():
+    '''Содержимое тестового изображения (читается с диска один раз)'''
+    return IMAGE_PATH.read_bytes()
+
+
+def uploaded_image(name='test_image.jpg'):
+    '''Загружаемое тестовое изображение'''
+    return SimpleUploadedFile(name=name, content=image_content(),
+                              content_type='image/jpeg')
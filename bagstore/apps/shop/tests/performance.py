@@ -0,0 +1,97 @@
+import functools
+import time
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+# Размеры данных, на которых проверяется стоимость представлений
+DATA_SIZES = (10, 1000, 10000)
+
+
+class ViewCost:
+    '''Стоимость одного запроса к представлению'''
+
+    def __init__(self, status_code, queries, sql_time, response_time):
+        self.status_code = status_code
+        self.queries = queries
+        self.sql_time = sql_time
+        self.response_time = response_time
+
+    def __repr__(self):
+        '''Отладочное представление'''
+        return ('<ViewCost: %d запросов, SQL %.3f с, ответ %.3f с>'
+                % (len(self.queries), self.sql_time, self.response_time))
+
+
+def measure(client, url, **extra):
+    '''Выполнить GET-запрос и измерить его стоимость'''
+    with CaptureQueriesContext(connection) as context:
+        started = time.perf_counter()
+        response = client.get(url, **extra)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        response_time = time.perf_counter() - started
+    sql_time = sum(float(query['time']) for query in context.captured_queries)
+    return ViewCost(response.status_code, context.captured_queries, sql_time, response_time)
+
+
+def query_budget(max_queries=None, max_sql_time=None):
+    '''Декоратор теста: ограничение числа и суммарного времени SQL-запросов'''
+    def decorator(test):
+        @functools.wraps(test)
+        def wrapper(self, *args, **kwargs):
+            with CaptureQueriesContext(connection) as context:
+                result = test(self, *args, **kwargs)
+            queries = context.captured_queries
+            if max_queries is not None:
+                self.assertLessEqual(
+                    len(queries), max_queries,
+                    'Запросов: %d, допустимо: %d\n%s' % (
+                        len(queries), max_queries,
+                        '\n'.join(query['sql'] for query in queries)))
+            if max_sql_time is not None:
+                sql_time = sum(float(query['time']) for query in queries)
+                self.assertLessEqual(sql_time, max_sql_time)
+            return result
+        return wrapper
+    return decorator
+
+
+class ViewCostMixin:
+    '''Проверки стоимости представлений для TestCase'''
+
+    def assertViewCost(self, url, max_queries=None, max_sql_time=None,
+                       max_response_time=None, **extra):
+        '''Проверить, что запрос укладывается в заданные ограничения'''
+        cost = measure(self.client, url, **extra)
+        self.assertEqual(cost.status_code, 200)
+        if max_queries is not None:
+            self.assertLessEqual(
+                len(cost.queries), max_queries,
+                '%s: %r\n%s' % (url, cost, '\n'.join(q['sql'] for q in cost.queries)))
+        if max_sql_time is not None:
+            self.assertLessEqual(cost.sql_time, max_sql_time, '%s: %r' % (url, cost))
+        if max_response_time is not None:
+            self.assertLessEqual(cost.response_time, max_response_time, '%s: %r' % (url, cost))
+        return cost
+
+    def assertQueriesDoNotGrow(self, url, populate, sizes=DATA_SIZES, max_queries=None,
+                               max_sql_time=None, max_response_time=None, **extra):
+        '''Проверить, что число запросов не зависит от объема данных.
+
+        populate(size) должна довести объем данных до size строк.
+        Так ловятся N+1: число запросов растет вместе с числом строк.
+        Перед каждым замером делается прогревочный запрос, чтобы промахи
+        кешей не искажали сравнение.
+        '''
+        costs = {}
+        for size in sizes:
+            populate(size)
+            self.client.get(url, **extra)
+            costs[size] = self.assertViewCost(url, max_queries, max_sql_time,
+                                              max_response_time, **extra)
+        counts = {size: len(cost.queries) for size, cost in costs.items()}
+        self.assertEqual(len(set(counts.values())), 1,
+                         '%s: число запросов растет с объемом данных: %s' % (url, counts))
+        return costs
@@ -0,0 +1,125 @@
+
+from django.contrib.admin.models import DELETION, LogEntry
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.cart.models import Cart
+from apps.shop.models import Evaluation, PriceHistory, Product
+from apps.shop.tests.fixtures import uploaded_image
+
+
+User = get_user_model()
+
+
+class AdminTest(TestCase):
+    '''Тест административной панели'''
+
+    @classmethod
+    def setUpTestData(cls):
+        '''Общие данные для всех тестов класса'''
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='admin')
+        cls.product = Product.objects.create(name='Сумка', price=1000, image=uploaded_image())
+
+    def setUp(self):
+        '''Установка перед тестированием'''
+        self.client.force_login(self.admin)
+
+    def create_rows(self, count):
+        '''Создать корзины и оценки разных пользователей'''
+        for _ in range(count):
+            user = User.objects.create(username='user%d' % User.objects.count())
+            Cart.objects.create(product=self.product, user=user)
+            Evaluation.objects.create(evaluation=5, product=self.product, user=user)
+
+    def count_queries(self, url):
+        '''Количество запросов при открытии страницы'''
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelists_do_not_query_per_row(self):
+        '''Тест: списки корзин и оценок не делают запросов на каждую строку'''
+        urls = [reverse('admin:cart_cart_changelist'),
+                reverse('admin:shop_evaluation_changelist')]
+        self.create_rows(1)
+        few_rows = [self.count_queries(url) for url in urls]
+
+        self.create_rows(10)
+
+        self.assertEqual([self.count_queries(url) for url in urls], few_rows)
+
+    def test_product_changelist_shows_thumbnails(self):
+        '''Тест: в списке товаров отображаются миниатюры'''
+        response = self.client.get(reverse('admin:shop_product_changelist'))
+
+        self.assertContains(response, self.product.image.url)
+
+    def test_raise_price_action_updates_price_and_history(self):
+        '''Тест: массовое повышение цены меняет цену и пишет историю'''
+        self.client.post(reverse('admin:shop_product_changelist'), {
+            'action': 'raise_price',
+            '_selected_action': [self.product.pk],
+        })
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.price, 1100)
+        self.assertEqual(PriceHistory.objects.filter(product=self.product).count(), 2)
+
+    def test_reduce_price_rounds_to_nearest(self):
+        '''Тест: новая цена округляется до ближайшего рубля, а не отбрасывается'''
+        self.product.price = 1595
+        self.product.save()
+
+        self.client.post(reverse('admin:shop_product_changelist'), {
+            'action': 'reduce_price',
+            '_selected_action': [self.product.pk],
+        })
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.price, 1436)
+
+    def test_delete_quickly_asks_for_confirmation(self):
+        '''Тест: быстрое удаление сначала показывает страницу подтверждения'''
+        response = self.client.post(reverse('admin:shop_product_changelist'), {
+            'action': 'delete_quickly',
+            '_selected_action': [self.product.pk],
+        })
+
+        self.assertContains(response, 'name="post"')
+        self.assertTrue(Product.objects.filter(pk=self.product.pk).exists())
+
+    def test_delete_quickly_logs_deletions(self):
+        '''Тест: подтвержденное быстрое удаление записывается в журнал админки'''
+        self.client.post(reverse('admin:shop_product_changelist'), {
+            'action': 'delete_quickly',
+            '_selected_action': [self.product.pk],
+            'post': 'yes',
+        })
+
+        self.assertFalse(Product.objects.filter(pk=self.product.pk).exists())
+        entry = LogEntry.objects.get()
+        self.assertEqual((entry.action_flag, entry.object_id, entry.object_repr),
+                         (DELETION, str(self.product.pk), 'Сумка'))
+
+    def test_view_only_staff_cannot_run_actions(self):
+        '''Тест: сотруднику с правом только на просмотр массовые действия недоступны'''
+        viewer = User.objects.create_user(username='viewer', password='viewer', is_staff=True)
+        viewer.user_permissions.add(Permission.objects.get(codename='view_product'))
+        self.client.force_login(viewer)
+
+        response = self.client.get(reverse('admin:shop_product_changelist'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'delete_quickly')
+        self.assertNotContains(response, 'raise_price')
+
+        self.client.post(reverse('admin:shop_product_changelist'), {
+            'action': 'delete_quickly',
+            '_selected_action': [self.product.pk],
+        })
+        self.assertTrue(Product.objects.filter(pk=self.product.pk).exists())
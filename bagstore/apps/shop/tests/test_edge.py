@@ -0,0 +1,109 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from apps.shop.edge import SURROGATE_KEY_HEADER
+from apps.shop.models import Product
+from apps.shop.tests.fixtures import uploaded_image
+
+
+User = get_user_model()
+
+
+class EdgeCachedPageTest(TestCase):
+    '''Тест общих страниц для кеша прокси'''
+
+    @classmethod
+    def setUpTestData(cls):
+        '''Общие данные для всех тестов класса'''
+        cls.user = User.objects.create(username='Bill', email='bill@example.com')
+        cls.product = Product.objects.create(name='Сумка', price=1590, image=uploaded_image())
+
+    def setUp(self):
+        '''Установка перед тестированием'''
+        cache.clear()
+
+    def test_shop_page_is_public(self):
+        '''Тест: страница магазина разрешена для общего кеша и помечена ключами товаров'''
+        response = self.client.get(reverse('shop'))
+
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('s-maxage=', response['Cache-Control'])
+        self.assertEqual(response[SURROGATE_KEY_HEADER].split(),
+                         ['catalog', 'product-list', 'product-%d' % self.product.pk])
+
+    def test_shell_does_not_depend_on_visitor(self):
+        '''Тест: оболочка одинакова для гостя и вошедшего пользователя и не ставит cookies'''
+        anonymous = self.client.get(reverse('shop'))
+        self.client.force_login(self.user)
+        self.client.post(reverse('cart_add', args=[self.product.pk]))
+
+        response = self.client.get(reverse('shop'))
+        self.assertEqual(response.content, anonymous.content)
+        self.assertEqual(response['ETag'], anonymous['ETag'])
+        self.assertNotIn('Cookie', response.get('Vary', ''))
+        self.assertFalse(response.cookies)
+
+    def test_main_page_is_public(self):
+        '''Тест: главная страница разрешена для общего кеша'''
+        response = self.client.get(reverse('index'))
+
+        self.assertIn('public', response['Cache-Control'])
+        self.assertEqual(response[SURROGATE_KEY_HEADER], 'catalog')
+
+    def test_visitor_fragment(self):
+        '''Тест: данные посетителя отдаются отдельно и не кешируются'''
+        self.client.force_login(self.user)
+        self.client.post(reverse('cart_add', args=[self.product.pk]))
+
+        response = self.client.get(reverse('visitor_fragment'))
+        data = response.json()
+        self.assertTrue(data['authenticated'])
+        self.assertEqual(data['cart_count'], 1)
+        self.assertTrue(data['csrf_token'])
+        self.assertEqual(data['currency']['code'], 'RUB')
+        self.assertIn('no-store', response['Cache-Control'])
+
+
+@override_settings(EDGE_PURGE_URL='http://127.0.0.1:6081/')
+class EdgePurgeTest(TestCase):
+    '''Тест удаления страниц из кеша прокси по ключам'''
+
+    def purged_keys(self, change):
+        '''Ключи запросов PURGE, отправленных после изменения'''
+        with mock.patch('apps.shop.edge.send_purge') as send_purge:
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+        return [call.args[0] for call in send_purge.call_args_list]
+
+    def test_new_product_purges_listing(self):
+        '''Тест: новый товар удаляет из кеша списки товаров'''
+        keys = self.purged_keys(lambda: Product.objects.create(
+            name='Сумка', price=1590, image=uploaded_image()))
+
+        self.assertEqual(len(keys), 1)
+        self.assertIn('product-list', keys[0])
+
+    def test_changed_product_purges_only_its_pages(self):
+        '''Тест: изменение товара удаляет из кеша только страницы с ним'''
+        product = Product.objects.create(name='Сумка', price=1590, image=uploaded_image())
+        product.price = 1690
+
+        self.assertEqual(self.purged_keys(product.save), [['product-%d' % product.pk]])
+
+    def test_purge_is_skipped_on_rollback(self):
+        '''Тест: при откате транзакции запрос PURGE не отправляется'''
+        with mock.patch('apps.shop.edge.send_purge') as send_purge:
+            with self.captureOnCommitCallbacks(execute=False):
+                Product.objects.create(name='Сумка', price=1590, image=uploaded_image())
+
+        send_purge.assert_not_called()
+
+    @override_settings(EDGE_PURGE_URL='')
+    def test_purge_is_disabled_without_proxy(self):
+        '''Тест: без адреса прокси запросы PURGE не отправляются'''
+        self.assertEqual(self.purged_keys(lambda: Product.objects.create(
+            name='Сумка', price=1590, image=uploaded_image())), [])
@@ -0,0 +1,48 @@
+import gzip
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.shop.models import Product
+from apps.shop.tests.fixtures import uploaded_image
+
+
+class CatalogExportTest(TestCase):
+    '''Тест потоковой выгрузки каталога'''
+
+    @classmethod
+    def setUpTestData(cls):
+        '''Общие данные для всех тестов класса'''
+        image = uploaded_image()
+        cls.first = Product.objects.create(name='Сумка 1', price=1250, image=image)
+        cls.second = Product.objects.create(name='Сумка 2', price=2500, image=image)
+
+    def test_csv_export_contains_all_products(self):
+        '''Тест: в CSV выгружаются все товары'''
+        response = self.client.get(reverse('catalog_export', args=['csv']))
+        content = b''.join(response.streaming_content).decode()
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(len(content.splitlines()), 3)
+        self.assertIn('Сумка 2,2500', content)
+
+    def test_jsonl_export_is_gzipped_on_the_fly(self):
+        '''Тест: JSON Lines сжимается, если клиент принимает gzip'''
+        response = self.client.get(reverse('catalog_export', args=['jsonl']),
+                                   HTTP_ACCEPT_ENCODING='gzip, deflate')
+        content = gzip.decompress(b''.join(response.streaming_content)).decode()
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([row['name'] for row in rows], ['Сумка 1', 'Сумка 2'])
+
+    def test_sitemap_index_links_to_shards(self):
+        '''Тест: индекс карты сайта ссылается на файлы с товарами'''
+        index = b''.join(self.client.get(reverse('sitemap')).streaming_content).decode()
+        shard = b''.join(
+            self.client.get(reverse('sitemap_shard', args=[1])).streaming_content).decode()
+
+        self.assertIn(reverse('sitemap_shard', args=[1]), index)
+        self.assertIn(reverse('product', args=[self.first.pk]), shard)
+        self.assertIn(reverse('product', args=[self.second.pk]), shard)
@@ -0,0 +1,67 @@
+import os
+import sys
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+import config.config
+from bagstore.importtime import parse_importtime
+
+
+IMPORTTIME_OUTPUT = '''\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        900 | django
+import time:      1500 |       1500 |     apps.shop.exports
+'''
+
+
+class ParseImporttimeTest(SimpleTestCase):
+    '''Тест разбора вывода python -X importtime'''
+
+    def test_lines_are_parsed(self):
+        '''Тест: строки разбираются в модуль, время и глубину вложенности'''
+        records = parse_importtime(IMPORTTIME_OUTPUT)
+
+        self.assertEqual([record.module for record in records],
+                         ['_io', 'django', 'apps.shop.exports'])
+        self.assertEqual(records[1].self_us, 300)
+        self.assertEqual(records[1].cumulative_us, 900)
+        self.assertEqual([record.depth for record in records], [1, 0, 2])
+
+    def test_other_lines_are_skipped(self):
+        '''Тест: строки, не относящиеся к импортам, пропускаются'''
+        self.assertEqual(parse_importtime('Traceback\nimport time: self [us] | x'), [])
+
+
+class ProfileImportsCommandTest(SimpleTestCase):
+    '''Тест команды profile_imports'''
+
+    def test_boot_does_not_import_exports(self):
+        '''Тест: при запуске не импортируются модули выгрузки'''
+        stdout = StringIO()
+        call_command('profile_imports', top=sys.maxsize, stdout=stdout, stderr=StringIO())
+
+        output = stdout.getvalue()
+        self.assertIn('django.urls', output)
+        self.assertNotIn('apps.shop.exports', output)
+        self.assertIn('Модулей:', output)
+
+
+class ConfigPathTest(SimpleTestCase):
+    '''Тест выбора файла .env'''
+
+    def test_explicit_path_wins(self):
+        '''Тест: путь из BAGSTORE_ENV_FILE важнее остальных'''
+        with mock.patch.dict(os.environ, {'BAGSTORE_ENV_FILE': '/srv/bagstore.env'}):
+            self.assertEqual(config.config.env_path(), Path('/srv/bagstore.env'))
+
+    def test_file_next_to_module_is_preferred(self):
+        '''Тест: файл рядом с модулем не зависит от текущего каталога'''
+        with mock.patch.dict(os.environ), \
+                mock.patch.object(Path, 'exists', return_value=True):
+            os.environ.pop('BAGSTORE_ENV_FILE', None)
+            self.assertEqual(config.config.env_path(), config.config.ENV_PATH)
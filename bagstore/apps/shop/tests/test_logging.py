@@ -0,0 +1,148 @@
+import json
+import logging
+import queue
+import sys
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from bagstore.log import BoundedQueueHandler, JsonFormatter, RequestContextFilter
+
+
+User = get_user_model()
+
+
+class RecordingHandler(logging.Handler):
+    '''Обработчик, запоминающий записи (с данными запроса)'''
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.addFilter(RequestContextFilter())
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class JsonFormatterTest(SimpleTestCase):
+    '''Тест форматирования записей журнала в JSON'''
+
+    def test_record_is_one_json_line(self):
+        '''Тест: запись выводится одной строкой JSON с полями запроса'''
+        record = logging.LogRecord('bagstore.request', logging.INFO, __file__, 1,
+                                   'GET %s', ('/shop/',), None)
+        record.request_id = 'abc'
+        record.duration_ms = 1.5
+
+        line = JsonFormatter().format(record)
+        self.assertNotIn('\n', line)
+        data = json.loads(line)
+        self.assertEqual(data['message'], 'GET /shop/')
+        self.assertEqual(data['request_id'], 'abc')
+        self.assertEqual(data['duration_ms'], 1.5)
+        self.assertNotIn('user_id', data)
+
+    def test_exception_is_kept_separately(self):
+        '''Тест: текст исключения не смешивается с сообщением при передаче через очередь'''
+        handler = BoundedQueueHandler(queue.Queue())
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            record = logging.LogRecord('bagstore', logging.ERROR, __file__, 1, 'Ошибка', (),
+                                       sys.exc_info())
+        handler.handle(record)
+
+        data = json.loads(JsonFormatter().format(handler.queue.get_nowait()))
+        self.assertEqual(data['message'], 'Ошибка')
+        self.assertIn('ZeroDivisionError', data['exception'])
+
+
+class BoundedQueueHandlerTest(SimpleTestCase):
+    '''Тест ограниченной очереди журнала'''
+
+    def record(self, message='Запись'):
+        '''Новая запись журнала'''
+        return logging.LogRecord('bagstore', logging.INFO, __file__, 1, message, (), None)
+
+    def test_overflow_drops_records_without_blocking(self):
+        '''Тест: при переполнении записи отбрасываются и подсчитываются'''
+        handler = BoundedQueueHandler(queue.Queue(2))
+        for _ in range(5):
+            handler.handle(self.record())
+
+        self.assertEqual(handler.stats(), {'enqueued': 2, 'dropped': 3, 'queued': 2})
+
+    def test_dropped_records_are_reported(self):
+        '''Тест: когда место появляется, в журнал пишется число потерянных записей'''
+        handler = BoundedQueueHandler(queue.Queue(1))
+        handler.handle(self.record('Первая'))
+        handler.handle(self.record('Потеряна'))
+        handler.queue.get_nowait()
+        handler.queue.maxsize = 2
+
+        handler.handle(self.record('Вторая'))
+        messages = [handler.queue.get_nowait().getMessage() for _ in range(2)]
+        self.assertEqual(messages[0], 'Вторая')
+        self.assertIn('потеряно записей: 1', messages[1])
+
+    def test_listener_writes_json(self):
+        '''Тест: поток записи выводит записи из очереди в JSON'''
+        stream = StringIO()
+        target = logging.StreamHandler(stream)
+        target.setFormatter(JsonFormatter())
+        handler = BoundedQueueHandler(queue.Queue(10), target)
+        handler.start()
+        handler.handle(self.record('Через очередь'))
+        handler.stop()
+
+        self.assertEqual(json.loads(stream.getvalue())['message'], 'Через очередь')
+
+
+class RequestLogMiddlewareTest(TestCase):
+    '''Тест журнала запросов'''
+
+    def setUp(self):
+        '''Установка перед тестированием'''
+        self.handler = RecordingHandler()
+        logger = logging.getLogger('bagstore.request')
+        logger.addHandler(self.handler)
+        self.addCleanup(logger.removeHandler, self.handler)
+        level = logger.level
+        logger.setLevel(logging.INFO)
+        self.addCleanup(logger.setLevel, level)
+
+    def test_request_is_logged_with_context(self):
+        '''Тест: запрос записывается с идентификатором, представлением и временем'''
+        response = self.client.get(reverse('shop'))
+
+        record, = self.handler.records
+        self.assertEqual(record.request_id, response['X-Request-ID'])
+        self.assertEqual(record.view, 'shop')
+        self.assertEqual(record.status, 200)
+        self.assertGreaterEqual(record.duration_ms, 0)
+        self.assertIsNone(record.user_id)
+
+    def test_incoming_request_id_is_kept(self):
+        '''Тест: идентификатор запроса от прокси сохраняется, недопустимый заменяется'''
+        response = self.client.get(reverse('shop'), HTTP_X_REQUEST_ID='edge-42')
+        self.assertEqual(response['X-Request-ID'], 'edge-42')
+
+        response = self.client.get(reverse('shop'), HTTP_X_REQUEST_ID='bad id\n')
+        self.assertNotEqual(response['X-Request-ID'], 'bad id\n')
+
+    def test_user_id_is_logged_when_user_is_loaded(self):
+        '''Тест: пользователь попадает в запись, если представление к нему обращалось'''
+        user = User.objects.create(username='Bill', email='bill@example.com')
+        self.client.force_login(user)
+        self.client.get(reverse('cart'))
+
+        self.assertEqual(self.handler.records[-1].user_id, user.pk)
+
+    @override_settings(LOG_SLOW_REQUEST_MS=0)
+    def test_slow_request_is_a_warning(self):
+        '''Тест: медленный запрос записывается как предупреждение'''
+        self.client.get(reverse('index'))
+
+        self.assertEqual(self.handler.records[-1].levelno, logging.WARNING)
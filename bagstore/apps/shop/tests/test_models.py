@@ -1,12 +1,21 @@
+import hashlib
 import os
+import tempfile
 import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.base import ContentFile
+from django.core.management import call_command
 from django.test import TestCase
+from django.utils import timezone
 
-from apps.shop.models import Product, Evaluation
+from apps.shop.models import Product, Evaluation, PriceHistory
+from apps.shop.storage import ContentHashStorage
+from apps.shop.tests.fixtures import image_content, uploaded_image
 
 
 User = get_user_model()
@@ -18,24 +27,8 @@ class ProductModelTest(TestCase):
     def setUp(self):
         '''Установка перед тестированием'''
         
-        self.first_image = SimpleUploadedFile(
-            name='test_first_image.jpg',
-            content=open(
-                'bagstore/media_for_tests/woman.png', 'rb').read(),
-            content_type='image/jpeg'
-        )
-        self.second_image = SimpleUploadedFile(
-            name='test_second_image.jpg',
-            content=open(
-                'bagstore/media_for_tests/woman.png', 'rb').read(),
-            content_type='image/jpeg'
-        )
-
-    def tearDown(self):
-        '''Удаление параметров тестирования'''
-        for product in Product.objects.all():
-            if product is not None:
-                os.remove(product.image.path)
+        self.first_image = uploaded_image('test_first_image.jpg')
+        self.second_image = uploaded_image('test_second_image.jpg')
 
     def test_saving_and_retrieving_products(self):
         '''Тест: можно сохранять и получать продукцию'''
@@ -100,24 +93,17 @@ class ProductModelTest(TestCase):
 class EvaluationModelTest(TestCase):
     '''Тест модели оценки продукта'''
 
-    def setUp(self):
-        '''Установка перед тестированием'''
-        self.image = SimpleUploadedFile(
-            name='test_image.jpg',
-            content=open(
-                'bagstore/media_for_tests/woman.png', 'rb').read(),
-            content_type='image/jpeg'
-        )
-        self.user = User.objects.create(
+    @classmethod
+    def setUpTestData(cls):
+        '''Общие данные для всех тестов класса'''
+        cls.user = User.objects.create(
             username='Bill',
             email='bill@example.com'
         )
 
-    def tearDown(self):
-        '''Удаление параметров тестирования'''
-        for product in Product.objects.all():
-            if product is not None:
-                os.remove(product.image.path)
+    def setUp(self):
+        '''Установка перед тестированием'''
+        self.image = uploaded_image('test_image.jpg')
 
     def test_cant_rate_anonymously(self):
         '''Тест: нельзя поставить оценку анонимно'''
@@ -198,3 +184,148 @@ class EvaluationModelTest(TestCase):
         with self.assertRaises(ValidationError):
             evaluation.full_clean()
             evaluation.save()
+
+
+class PriceHistoryModelTest(TestCase):
+    '''Тест истории цен товара'''
+
+    def setUp(self):
+        '''Установка перед тестированием'''
+        self.image = uploaded_image('test_image.jpg')
+        self.product = Product.objects.create(
+            name='Сумка первая',
+            price=1590,
+            image=self.image
+        )
+
+    def test_price_changes_are_recorded(self):
+        '''Тест: каждое изменение цены попадает в историю'''
+        product = Product.objects.get(pk=self.product.pk)
+        product.price = 1990
+        product.save()
+        product.name = 'Сумка переименованная'
+        product.save()
+
+        prices = list(PriceHistory.objects.filter(product=product)
+                      .order_by('pk').values_list('price', flat=True))
+        self.assertEqual(prices, [1590, 1990])
+
+    def test_bulk_price_update_is_recorded(self):
+        '''Тест: массовое изменение цены попадает в историю'''
+        Product.objects.filter(pk=self.product.pk).update_price(2500)
+
+        self.assertEqual(
+            PriceHistory.objects.filter(product=self.product).count(), 2)
+        self.assertEqual(
+            PriceHistory.objects.price_at(self.product, timezone.now()), 2500)
+
+    def test_price_at_returns_the_price_in_effect(self):
+        '''Тест: можно узнать цену, действовавшую в заданный момент'''
+        week_ago = timezone.now() - timedelta(days=7)
+        PriceHistory.objects.filter(product=self.product).update(changed_at=week_ago)
+        self.product.price = 1990
+        self.product.save()
+
+        self.assertEqual(
+            PriceHistory.objects.price_at(self.product, week_ago + timedelta(days=1)), 1590)
+        self.assertIsNone(
+            PriceHistory.objects.price_at(self.product, week_ago - timedelta(days=1)))
+
+    def test_pruning_keeps_the_price_at_the_boundary(self):
+        '''Тест: очистка истории сохраняет цену на начало периода'''
+        month_ago = timezone.now() - timedelta(days=30)
+        PriceHistory.objects.filter(product=self.product).update(changed_at=month_ago)
+        PriceHistory.objects.create(product=self.product, price=1790,
+                                    changed_at=month_ago + timedelta(days=1))
+
+        before = timezone.now() - timedelta(days=7)
+        PriceHistory.objects.prunable(before).delete()
+
+        self.assertEqual(PriceHistory.objects.price_at(self.product, before), 1790)
+
+
+class ProductImageStorageTest(TestCase):
+    '''Тест хранения изображений товаров по хешу содержимого'''
+
+    def test_same_image_is_stored_once(self):
+        '''Тест: одинаковые изображения хранятся в одном файле'''
+        first = Product.objects.create(name='Сумка первая', price=1590,
+                                       image=uploaded_image('first.png'))
+        second = Product.objects.create(name='Сумка вторая', price=2999,
+                                        image=uploaded_image('second.png'))
+
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertIn(hashlib.sha256(image_content()).hexdigest(), first.image.name)
+
+    def cleanup_images(self, *args):
+        '''Запустить удаление изображений без ссылок'''
+        call_command('cleanup_images', *args, stdout=StringIO())
+
+    def test_orphaned_image_is_deleted_by_cleanup(self):
+        '''Тест: команда удаляет файл, на который больше не ссылается ни один товар'''
+        first = Product.objects.create(name='Сумка первая', price=1590,
+                                       image=uploaded_image('first.png'))
+        second = Product.objects.create(name='Сумка вторая', price=2999,
+                                        image=uploaded_image('second.png'))
+        storage, name = first.image.storage, first.image.name
+
+        first.delete()
+        self.cleanup_images('--min-age=0')
+        self.assertTrue(storage.exists(name))
+
+        second.delete()
+        self.assertTrue(storage.exists(name))
+        self.cleanup_images('--min-age=0')
+        self.assertFalse(storage.exists(name))
+
+    def test_recently_uploaded_image_is_kept(self):
+        '''Тест: недавно загруженный файл не удаляется, даже если товара с ним еще нет'''
+        product = Product.objects.create(name='Сумка', price=1590, image=uploaded_image())
+        storage, name = product.image.storage, product.image.name
+        product.delete()
+
+        self.cleanup_images()
+
+        self.assertTrue(storage.exists(name))
+
+    def test_reupload_refreshes_modified_time(self):
+        '''Тест: повторная загрузка того же файла обновляет время его изменения'''
+        product = Product.objects.create(name='Сумка', price=1590, image=uploaded_image())
+        storage, name = product.image.storage, product.image.name
+        uploaded_at = storage.get_modified_time(name)
+
+        with mock.patch('django.core.files.storage.memory.now',
+                        return_value=uploaded_at + timedelta(days=2)):
+            Product.objects.create(name='Сумка вторая', price=2999, image=uploaded_image())
+
+        self.assertEqual(storage.get_modified_time(name), uploaded_at + timedelta(days=2))
+
+    def test_reupload_to_disk_refreshes_modified_time(self):
+        '''Тест: повторная запись того же файла на диск обновляет время его изменения'''
+        with tempfile.TemporaryDirectory() as directory:
+            storage = ContentHashStorage(location=directory)
+            name = storage.save('shop/first.png', ContentFile(image_content()))
+            os.utime(storage.path(name), (0, 0))
+
+            self.assertEqual(storage.save('shop/second.png', ContentFile(image_content())), name)
+            self.assertGreater(os.path.getmtime(storage.path(name)), 0)
+
+    def test_reupload_rewrites_file_deleted_concurrently(self):
+        '''Тест: файл, удаленный во время повторной загрузки, записывается заново'''
+        with tempfile.TemporaryDirectory() as directory:
+            storage = ContentHashStorage(location=directory)
+            name = storage.save('shop/first.png', ContentFile(image_content()))
+            utime = os.utime
+
+            def delete_then_utime(path, *args, **kwargs):
+                # Очистка удаляет файл сразу перед обновлением времени
+                os.remove(path)
+                return utime(path, *args, **kwargs)
+
+            with mock.patch('apps.shop.storage.os.utime', side_effect=delete_then_utime):
+                self.assertEqual(storage.save('shop/second.png', ContentFile(image_content())),
+                                 name)
+
+            with storage.open(name) as stored:
+                self.assertEqual(stored.read(), image_content())
+            self.assertEqual(os.listdir(directory), ['shop'])
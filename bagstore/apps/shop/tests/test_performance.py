@@ -0,0 +1,94 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.shop.models import Evaluation, Product, ProductRecommendation
+from apps.shop.tests.performance import ViewCostMixin, query_budget
+
+
+User = get_user_model()
+IMAGE = 'shop/product_photo/performance.png'
+
+
+def create_products(size):
+    '''Довести количество товаров до size'''
+    existing = Product.objects.count()
+    Product.objects.bulk_create(
+        (Product(name='Сумка %d' % number, price=1000 + number, image=IMAGE)
+         for number in range(existing, size)),
+        batch_size=1000,
+    )
+
+
+def create_users(size):
+    '''Довести количество пользователей до size'''
+    existing = User.objects.count()
+    User.objects.bulk_create(
+        (User(username='user%d' % number) for number in range(existing, size)),
+        batch_size=1000,
+    )
+
+
+class ShopPerformanceTest(ViewCostMixin, TestCase):
+    '''Тест стоимости страниц магазина при разном объеме данных'''
+
+    def setUp(self):
+        '''Установка перед тестированием'''
+        cache.clear()
+
+    def test_shop_page_cost_does_not_grow_with_products(self):
+        '''Тест: число запросов страницы магазина не зависит от числа товаров'''
+        # Оценка размера таблицы, COUNT(*) для пагинации и сама страница
+        self.assertQueriesDoNotGrow(reverse('shop'), create_products,
+                                    max_queries=3, max_response_time=5)
+
+    def test_product_page_cost_does_not_grow_with_recommendations(self):
+        '''Тест: число запросов страницы товара не зависит от числа рекомендаций'''
+        product = Product.objects.create(name='Сумка', price=1000, image=IMAGE)
+
+        def populate(size):
+            create_products(size + 1)
+            ProductRecommendation.objects.bulk_create(
+                (ProductRecommendation(product=product, recommended=recommended, score=1)
+                 for recommended in Product.objects.exclude(pk=product.pk)
+                 .exclude(recommended_for__product=product)),
+                batch_size=1000,
+            )
+
+        self.assertQueriesDoNotGrow(reverse('product', args=[product.pk]), populate,
+                                    max_queries=3, max_response_time=2)
+
+    def test_evaluation_admin_cost_does_not_grow_with_evaluations(self):
+        '''Тест: список оценок в админке не делает запросов на каждую строку'''
+        product = Product.objects.create(name='Сумка', price=1000, image=IMAGE)
+        admin = User.objects.create_superuser(username='admin', password='admin')
+        self.client.force_login(admin)
+
+        def populate(size):
+            create_users(size + 1)
+            Evaluation.objects.bulk_create(
+                (Evaluation(product=product, user=user, evaluation=5)
+                 for user in User.objects.exclude(evaluation__product=product)
+                 .exclude(pk=admin.pk)),
+                batch_size=1000,
+            )
+
+        self.assertQueriesDoNotGrow(reverse('admin:shop_evaluation_changelist'), populate,
+                                    max_queries=10, max_response_time=2)
+
+
+class CatalogExportPerformanceTest(TestCase):
+    '''Тест стоимости выгрузки каталога'''
+
+    @classmethod
+    def setUpTestData(cls):
+        '''Каталог для выгрузки'''
+        create_products(5000)
+
+    @query_budget(max_queries=3)
+    def test_catalog_export_reads_products_in_chunks(self):
+        '''Тест: выгрузка читает товары порциями, а не по одному'''
+        response = self.client.get(reverse('catalog_export', args=['jsonl']))
+
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 5000)
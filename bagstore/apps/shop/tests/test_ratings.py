@@ -0,0 +1,55 @@
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from apps.shop.models import Evaluation, Product
+from apps.shop.ratings import bayesian_rating, update_ratings
+from apps.shop.tests.fixtures import uploaded_image
+
+
+User = get_user_model()
+
+
+class BayesianRatingTest(TestCase):
+    '''Тест байесовского рейтинга'''
+
+    def test_many_good_ratings_beat_a_single_perfect_one(self):
+        '''Тест: тысяча оценок 4.8 выше одной пятерки'''
+        self.assertGreater(bayesian_rating(4800, 1000), bayesian_rating(5, 1))
+
+    def test_product_without_ratings_gets_prior(self):
+        '''Тест: товар без оценок получает априорный рейтинг'''
+        self.assertEqual(bayesian_rating(0, 0), 3.0)
+
+
+class UpdateRatingsTest(TestCase):
+    '''Тест пересчета рейтинга'''
+
+    @classmethod
+    def setUpTestData(cls):
+        '''Общие данные для всех тестов класса'''
+        cls.user = User.objects.create(username='Bill', email='bill@example.com')
+        cls.product = Product.objects.create(name='Сумка', price=1590, image=uploaded_image())
+
+    def test_only_changed_products_are_recomputed(self):
+        '''Тест: повторный запуск пересчитывает только изменившиеся товары'''
+        Evaluation.objects.create(evaluation=5, product=self.product, user=self.user)
+
+        self.assertEqual(update_ratings(), 1)
+        self.assertEqual(update_ratings(), 0)
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.rating_count, 1)
+        self.assertAlmostEqual(self.product.rating, bayesian_rating(5, 1))
+
+    def test_deleted_evaluation_marks_rating_stale(self):
+        '''Тест: удаление оценки приводит к пересчету рейтинга'''
+        evaluation = Evaluation.objects.create(
+            evaluation=5, product=self.product, user=self.user)
+        update_ratings()
+
+        evaluation.delete()
+
+        self.assertEqual(update_ratings(), 1)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.rating_count, 0)
@@ -0,0 +1,74 @@
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.cart.models import Cart
+from apps.shop.models import Evaluation, Product
+from apps.shop.recommendations import (compute_similarities, rebuild_recommendations,
+                                       recommendations_for)
+from apps.shop.tests.fixtures import uploaded_image
+
+
+User = get_user_model()
+
+
+class ComputeSimilaritiesTest(TestCase):
+    '''Тест расчета схожести товаров'''
+
+    def test_products_bought_together_are_similar(self):
+        '''Тест: товары из одних корзин похожи друг на друга'''
+        baskets = {1: {10, 20}, 2: {10, 20}, 3: {10, 30}}
+
+        similarities = compute_similarities(baskets)
+
+        self.assertEqual(similarities[20][0][1], 10)
+        self.assertEqual([product for _, product in similarities[10]], [20, 30])
+
+    def test_neighbours_are_limited_by_top_k(self):
+        '''Тест: у товара хранится не больше top_k соседей'''
+        baskets = {1: {1, 2, 3, 4, 5}}
+
+        similarities = compute_similarities(baskets, top_k=2)
+
+        self.assertEqual(len(similarities[1]), 2)
+
+
+class RecommendationsTest(TestCase):
+    '''Тест сохранения и выдачи рекомендаций'''
+
+    @classmethod
+    def setUpTestData(cls):
+        '''Общие данные для всех тестов класса'''
+        image = uploaded_image()
+        cls.bill = User.objects.create(username='Bill', email='bill@example.com')
+        cls.edith = User.objects.create(username='Edith', email='edith@example.com')
+        cls.bag = Product.objects.create(name='Сумка', price=1590, image=image)
+        cls.wallet = Product.objects.create(name='Кошелек', price=990, image=image)
+        cls.belt = Product.objects.create(name='Ремень', price=790, image=image)
+
+    def test_recommendations_from_carts_and_evaluations(self):
+        '''Тест: рекомендации строятся по корзинам и высоким оценкам'''
+        Cart.objects.create(product=self.bag, user=self.bill)
+        Cart.objects.create(product=self.wallet, user=self.bill)
+        Cart.objects.create(product=self.bag, user=self.edith)
+        Evaluation.objects.create(evaluation=5, product=self.wallet, user=self.edith)
+        Evaluation.objects.create(evaluation=1, product=self.belt, user=self.edith)
+
+        rebuild_recommendations()
+
+        self.assertEqual(list(recommendations_for(self.bag)), [self.wallet])
+        self.assertEqual(list(recommendations_for(self.belt)), [])
+
+    def test_recommendations_are_shown_in_the_cart(self):
+        '''Тест: рекомендации отображаются в корзине'''
+        Cart.objects.create(product=self.bag, user=self.bill)
+        Cart.objects.create(product=self.wallet, user=self.bill)
+        Cart.objects.create(product=self.bag, user=self.edith)
+        rebuild_recommendations()
+        Cart.objects.filter(product=self.wallet).delete()
+        self.client.force_login(self.bill)
+
+        response = self.client.get(reverse('cart'))
+
+        self.assertEqual(list(response.context['recommendation_list']), [self.wallet])
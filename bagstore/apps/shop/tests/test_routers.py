@@ -0,0 +1,126 @@
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connections
+from django.db.utils import ConnectionHandler
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from apps.cart.models import Cart
+from apps.shop.models import Evaluation, Product
+from bagstore import routers
+from bagstore.routers import PIN_COOKIE, PrimaryPinningMiddleware, ReplicaRouter
+
+
+@override_settings(DATABASE_REPLICAS=['replica1', 'replica2'])
+class ReplicaRouterTest(SimpleTestCase):
+    '''Тест маршрутизации запросов между основной БД и репликами'''
+
+    def setUp(self):
+        '''Установка перед тестированием'''
+        self.router = ReplicaRouter()
+        self.healthy = mock.patch.object(ReplicaRouter, 'is_healthy', return_value=True)
+        self.healthy.start()
+        self.addCleanup(self.healthy.stop)
+        token = routers._pinned.set(False)
+        self.addCleanup(routers._pinned.reset, token)
+
+    def test_catalog_reads_go_to_replicas_round_robin(self):
+        '''Тест: чтение каталога распределяется по репликам по кругу'''
+        aliases = [self.router.db_for_read(Product) for _ in range(4)]
+
+        self.assertEqual(aliases, ['replica1', 'replica2', 'replica1', 'replica2'])
+
+    def test_cart_and_evaluation_stay_on_primary(self):
+        '''Тест: корзины и оценки читаются с основной БД'''
+        self.assertEqual(self.router.db_for_read(Cart), 'default')
+        self.assertEqual(self.router.db_for_read(Evaluation), 'default')
+
+    def test_reads_after_write_go_to_primary(self):
+        '''Тест: после записи чтение идет с основной БД'''
+        self.assertEqual(self.router.db_for_write(Cart), 'default')
+
+        self.assertEqual(self.router.db_for_read(Product), 'default')
+
+    def test_unhealthy_replica_is_skipped(self):
+        '''Тест: недоступная реплика пропускается'''
+        self.healthy.stop()
+        self.router.mark_unhealthy('replica1')
+
+        with mock.patch.object(routers, 'connections', {'replica2': mock.MagicMock()}):
+            aliases = {self.router.db_for_read(Product) for _ in range(3)}
+        self.healthy.start()
+
+        self.assertEqual(aliases, {'replica2'})
+
+    def test_falls_back_to_primary_without_healthy_replicas(self):
+        '''Тест: без доступных реплик чтение идет с основной БД'''
+        self.router.mark_unhealthy('replica1')
+        self.router.mark_unhealthy('replica2')
+        self.healthy.stop()
+
+        self.assertEqual(self.router.db_for_read(Product), 'default')
+        self.healthy.start()
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class ReplicaCheckTest(TestCase):
+    '''Тест проверки реплики перед чтением каталога'''
+
+    def setUp(self):
+        '''Установка перед тестированием'''
+        # Пустая БД в памяти — как только что созданный файл реплики
+        empty = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}
+        replicas = ConnectionHandler({'default': empty, 'replica1': empty})
+        self.addCleanup(replicas.close_all)
+        self.connections = {'default': connections['default'], 'replica1': replicas['replica1']}
+        patcher = mock.patch.object(routers, 'connections', self.connections)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        token = routers._pinned.set(False)
+        self.addCleanup(routers._pinned.reset, token)
+
+    def test_replica_without_schema_falls_back_to_primary(self):
+        '''Тест: с реплики без таблиц каталог читается с основной БД'''
+        router = ReplicaRouter()
+
+        self.assertFalse(router.is_healthy('replica1'))
+        self.assertEqual(router.db_for_read(Product), 'default')
+
+    def test_synced_replica_is_used(self):
+        '''Тест: после копирования основной БД чтение идет с реплики'''
+        command = 'apps.shop.management.commands.sync_replicas.connections'
+        with mock.patch(command, self.connections):
+            call_command('sync_replicas', stdout=mock.Mock())
+
+        self.assertEqual(ReplicaRouter().db_for_read(Product), 'replica1')
+
+
+class PrimaryPinningMiddlewareTest(SimpleTestCase):
+    '''Тест закрепления запросов за основной БД'''
+
+    def setUp(self):
+        '''Установка перед тестированием'''
+        self.factory = RequestFactory()
+
+    def test_write_sets_pin_cookie(self):
+        '''Тест: после записи следующие запросы читают с основной БД'''
+        def view(request):
+            ReplicaRouter().db_for_write(Cart)
+            return HttpResponse()
+
+        response = PrimaryPinningMiddleware(view)(self.factory.post('/cart/'))
+
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+    def test_pin_cookie_pins_reads(self):
+        '''Тест: запрос с cookie закрепления читает с основной БД'''
+        def view(request):
+            self.assertTrue(routers.is_pinned_to_primary())
+            return HttpResponse()
+
+        request = self.factory.get('/shop/')
+        request.COOKIES[PIN_COOKIE] = '1'
+        response = PrimaryPinningMiddleware(view)(request)
+
+        self.assertNotIn(PIN_COOKIE, response.cookies)
@@ -0,0 +1,60 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from bagstore import sessions
+from bagstore.sessions import CappedCache, SessionStore
+
+
+@override_settings(SESSION_ENGINE='bagstore.sessions')
+class SessionStoreTest(TestCase):
+    '''Тест хранилища сессий с локальным кешем'''
+
+    def setUp(self):
+        '''Установка перед тестированием'''
+        caches['sessions'].clear()
+
+    def test_saved_session_is_read_without_queries(self):
+        '''Тест: сохраненная сессия читается из кеша без обращения к БД'''
+        session = SessionStore()
+        session['cart'] = 1
+        session.save()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(SessionStore(session.session_key)['cart'], 1)
+
+    def test_session_is_read_from_the_database_after_cache_miss(self):
+        '''Тест: при промахе кеша сессия читается из БД'''
+        session = SessionStore()
+        session['cart'] = 1
+        session.save()
+        caches['sessions'].clear()
+
+        self.assertEqual(SessionStore(session.session_key)['cart'], 1)
+
+    def test_local_copy_lifetime_is_capped(self):
+        '''Тест: локальная копия хранится не дольше заданного времени'''
+        cache = mock.Mock()
+
+        CappedCache(cache, 60).set('key', 'value', 1209600)
+
+        cache.set.assert_called_once_with('key', 'value', 60)
+
+    def test_expired_sessions_are_cleared_in_batches(self):
+        '''Тест: просроченные сессии удаляются порциями'''
+        expired = timezone.now() - timedelta(days=1)
+        for number in range(5):
+            Session.objects.create(session_key='expired%d' % number,
+                                   session_data='', expire_date=expired)
+        Session.objects.create(session_key='alive', session_data='',
+                               expire_date=timezone.now() + timedelta(days=1))
+
+        with mock.patch.object(sessions.SessionStore, 'clear_batch_size', 2):
+            call_command('clearsessions')
+
+        self.assertEqual(list(Session.objects.values_list('pk', flat=True)), ['alive'])
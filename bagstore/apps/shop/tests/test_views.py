@@ -1,12 +1,15 @@
-import os
+import gzip
+from unittest import mock
 
 from django.contrib.auth import get_user_model
-from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 
 from apps.cart.models import Cart
 from apps.shop.models import Product
+from apps.shop.tests.fixtures import uploaded_image
+from apps.shop.versions import CATALOG_VERSION_KEY, catalog_version
 
 
 User = get_user_model()
@@ -22,24 +25,56 @@ class MainPageTest(TestCase):
         self.assertTemplateUsed(response, 'index.html')
     
 
+class ConditionalResponseTest(TestCase):
+    '''Тест условных ответов и сжатия'''
+
+    def setUp(self):
+        '''Установка перед тестированием'''
+        self.image = uploaded_image('test_first_image.jpg')
+
+    def test_unchanged_page_is_not_sent_again(self):
+        '''Тест: неизмененная страница отдается ответом 304'''
+        response = self.client.get(reverse('shop'))
+
+        repeated = self.client.get(reverse('shop'), HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.assertEqual(repeated.status_code, 304)
+
+    def test_etag_changes_with_the_catalog(self):
+        '''Тест: ETag меняется при изменении каталога'''
+        etag = self.client.get(reverse('shop'))['ETag']
+
+        Product.objects.create(name="Сумка 1", price=1250, image=self.image)
+        response = self.client.get(reverse('shop'), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_missing_version_is_created_once(self):
+        '''Тест: процесс не заменяет версию, которую уже записал другой процесс'''
+        cache.set(CATALOG_VERSION_KEY, 'other', None)
+
+        # Версию записали между чтением и записью этого процесса
+        with mock.patch.object(cache, 'get', side_effect=[None, 'other']):
+            self.assertEqual(catalog_version(), 'other')
+        self.assertEqual(cache.get(CATALOG_VERSION_KEY), 'other')
+
+    def test_pages_are_compressed(self):
+        '''Тест: страницы сжимаются, если клиент принимает gzip'''
+        response = self.client.get('/', HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Сумки', gzip.decompress(response.content).decode())
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+
 class ShopPageTest(TestCase):
     '''Тест страницы магазина'''
 
     def setUp(self):
         '''Установка перед тестированием'''  
-        self.image = SimpleUploadedFile(
-            name='test_first_image.jpg',
-            content=open(
-                'bagstore/media_for_tests/woman.png', 'rb').read(),
-            content_type='image/jpeg'
-        )
+        self.image = uploaded_image('test_first_image.jpg')
     
-    def tearDown(self):
-        '''Удаление параметров тестирования'''
-        for product in Product.objects.all():
-            if product is not None:
-                os.remove(product.image.path)
-
     def test_shop_page_template(self):
         '''Тест: используется шаблон для страницы магазина'''
         response = self.client.get(reverse('shop'))
@@ -60,7 +95,8 @@ class ShopPageTest(TestCase):
         )
         products = Product.objects.all()
         response = self.client.get(reverse('shop'))
-        self.assertEqual(list(response.context['product_list']), list(products))
+        self.assertEqual([product.pk for product in response.context['product_list']],
+                         [product.pk for product in products])
 
     def test_all_products_are_displayed_in_the_shop_template(self):
         '''Тест: в шаблоне магазина отображаются все продукты'''
@@ -96,3 +132,34 @@ class ShopPageTest(TestCase):
         )
         response = self.client.get(reverse('shop'))
         self.assertContains(response, 'Сумка 1')
+
+    def test_best_rated_products_come_first(self):
+        '''Тест: при сортировке по рейтингу лучшие товары идут первыми'''
+        first = Product.objects.create(
+            name="Сумка 1",
+            price=1250,
+            image=self.image
+        )
+        second = Product.objects.create(
+            name="Сумка 2",
+            price=1250,
+            image=self.image
+        )
+        Product.objects.filter(pk=second.pk).update(rating=4.5)
+        Product.objects.filter(pk=first.pk).update(rating=3.5)
+
+        response = self.client.get(reverse('shop'), {'sort': 'best_rated'})
+
+        self.assertEqual([product.pk for product in response.context['product_list']],
+                         [second.pk, first.pk])
+
+    def test_product_images_are_displayed_in_the_shop_template(self):
+        '''Тест: в шаблоне магазина отображаются изображения товаров'''
+        product = Product.objects.create(
+            name="Сумка 1",
+            price=1250,
+            image=self.image
+        )
+        response = self.client.get(reverse('shop'))
+
+        self.assertContains(response, product.image.url)
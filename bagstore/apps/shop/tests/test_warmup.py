@@ -0,0 +1,58 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import LiveServerTestCase, TestCase
+
+from apps.cart.models import Cart
+from apps.shop.models import Evaluation, Product
+from apps.shop.warmup import hot_product_ids, warm_paths
+
+
+User = get_user_model()
+
+
+class HotProductsTest(TestCase):
+    '''Тест выбора популярных товаров для прогрева'''
+
+    def test_products_are_ranked_by_evaluations_and_carts(self):
+        '''Тест: товары упорядочены по числу оценок и добавлений в корзину'''
+        bill = User.objects.create(username='Bill', email='bill@example.com')
+        edith = User.objects.create(username='Edith', email='edith@example.com')
+        bag, wallet, belt = Product.objects.bulk_create(
+            [Product(name=name, price=1000, image='bag.png')
+             for name in ('Сумка', 'Кошелек', 'Ремень')])
+        Cart.objects.create(product=wallet, user=bill)
+        Evaluation.objects.create(evaluation=5, product=wallet, user=bill)
+        Evaluation.objects.create(evaluation=4, product=bag, user=edith)
+
+        self.assertEqual(hot_product_ids(10), [wallet.pk, bag.pk])
+        self.assertEqual(hot_product_ids(1), [wallet.pk])
+
+    def test_paths_include_main_and_shop_pages(self):
+        '''Тест: прогреваются главная, страницы магазина и товары'''
+        paths = warm_paths([7], pages=2)
+
+        self.assertEqual(paths[:3], ['/', '/shop/', '/shop/?page=2'])
+        self.assertIn('/shop/?sort=best_rated', paths)
+        self.assertIn('/shop/?sort=best_rated&page=2', paths)
+        self.assertNotIn('/shop/?page=1', paths)
+        self.assertEqual(paths[-1], '/shop/7/')
+
+
+class WarmCacheCommandTest(LiveServerTestCase):
+    '''Тест команды прогрева кешей'''
+
+    def test_pages_are_requested_from_the_site(self):
+        '''Тест: команда запрашивает страницы у работающего сайта'''
+        user = User.objects.create(username='Bill', email='bill@example.com')
+        product = Product.objects.create(name='Сумка', price=1590, image='bag.png')
+        Evaluation.objects.create(evaluation=5, product=product, user=user)
+        out, err = StringIO(), StringIO()
+
+        call_command('warm_cache', '--base-url', self.live_server_url, '--pages=1',
+                     '--workers=2', stdout=out, stderr=err)
+
+        self.assertIn('Прогрето страниц: 4', out.getvalue())
+        self.assertIn('/shop/%d/' % product.pk, out.getvalue())
+        self.assertEqual(err.getvalue(), '')
@@ -6,6 +6,10 @@ from bagstore import settings
 
 urlpatterns = [
     re_path(r'^$', views.ShopPageView.as_view(), name='shop'),
+    re_path(r'^(?P<pk>\d+)/$', views.ProductPageView.as_view(), name='product'),
+    re_path(r'^(?P<pk>\d+)/rate/$', views.EvaluationView.as_view(), name='product_rate'),
+    re_path(r'^export/catalog\.(?P<format>csv|jsonl)$', views.CatalogExportView.as_view(),
+            name='catalog_export'),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,78 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+CATALOG_VERSION_KEY = 'catalog:version'
+
+
+def new_version():
+    '''Новое значение версии, уникальное и после перезапуска'''
+    return '%x' % time.time_ns()
+
+
+def shared_version(key):
+    '''Версия из общего кеша по ключу key.
+
+    При ее отсутствии записывается новая версия, но только если ее еще
+    не записал другой процесс (cache.add): иначе процессы выдали бы
+    разные версии одного состояния, и ETag одного не совпадал бы с
+    ETag другого.
+    '''
+    version = cache.get(key)
+    if version is None:
+        version = new_version()
+        if not cache.add(key, version, None):
+            version = cache.get(key) or version
+    return version
+
+
+def catalog_version():
+    '''Текущая версия каталога: меняется при любом изменении товаров'''
+    return shared_version(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    '''Отметить изменение каталога'''
+    version = new_version()
+    cache.set(CATALOG_VERSION_KEY, version, None)
+    return version
+
+
+def visitor_etag(request):
+    '''Часть ETag, зависящая от посетителя: значок корзины, валюта и CSRF-токен'''
+    from apps.cart.counters import get_cart_count
+    from apps.currency.rates import CURRENCY_COOKIE, visitor_currency
+
+    parts = []
+    if request.user.is_authenticated:
+        parts.append('u%s.%s' % (request.user.pk, get_cart_count(request.user.pk)))
+    if CURRENCY_COOKIE in request.COOKIES:
+        parts.append(visitor_currency(request).code)
+    csrf_cookie = request.COOKIES.get(settings.CSRF_COOKIE_NAME)
+    if csrf_cookie:
+        parts.append(hashlib.md5(csrf_cookie.encode(), usedforsecurity=False).hexdigest()[:8])
+    return '.'.join(parts)
+
+
+def catalog_state():
+    '''Состояние каталога для ETag: версия каталога и действующие акции.
+
+    Акции начинаются и заканчиваются по расписанию, не меняя версию
+    каталога, поэтому учитываются отдельно.
+    '''
+    from apps.promotions.engine import promotions_etag
+
+    return '%s.%s' % (catalog_version(), promotions_etag())
+
+
+def shell_etag(request, *args, **kwargs):
+    '''ETag общих страниц: не зависит от посетителя'''
+    return catalog_state()
+
+
+def catalog_etag(request, *args, **kwargs):
+    '''ETag страниц каталога без отрисовки и хеширования тела ответа'''
+    return '%s-%s' % (catalog_state(), visitor_etag(request))
@@ -1,13 +1,214 @@
-from django.views.generic import TemplateView, ListView
-from apps.shop.models import Product
+import re
 
-class MainPageView(TemplateView):
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.utils.cache import patch_vary_headers
+from django.middleware.csrf import get_token
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_cookie
+from django.views.generic import DetailView, TemplateView, ListView, View
+from apps.cart.counters import get_cart_count
+from apps.currency.rates import BASE_CURRENCY, set_display_prices, visitor_currency
+from apps.promotions.engine import apply_to_rows
+from apps.shop.edge import CATALOG_KEY, LISTING_KEY, patch_edge_cache, product_key
+from apps.shop.models import Evaluation, Product
+from apps.shop.paginators import EstimatedCountPaginator
+from apps.shop.recommendations import recommendations_for
+from apps.shop.rows import product_rows
+from apps.shop.versions import catalog_etag, shell_etag
+from apps.wishlist.membership import wishlisted_among
+from bagstore.ratelimit import ratelimit
+
+# Допустимая частота оценок для одного пользователя и IP
+EVALUATION_RATE = '10/m'
+# Сколько товаров страницы можно проверить на избранное одним запросом
+MAX_WISHLIST_PRODUCTS = 100
+
+class EdgeCachedMixin:
+    '''Общая "оболочка" страницы, которую можно хранить в кеше прокси.
+
+    В оболочке нет данных посетителя (значка корзины, CSRF-токена,
+    выбранной валюты): их подставляет скрипт из VisitorFragmentView.
+    Поэтому ответ одинаков для всех, не зависит от cookies и удаляется
+    из кеша прокси по ключам при изменении показанных на нем товаров.
+    '''
+
+    def surrogate_keys(self, context):
+        '''Ключи, по которым ответ удаляется из кеша прокси'''
+        return [CATALOG_KEY]
+
+    def get_context_data(self, **kwargs):
+        '''Отметить, что отображается общая оболочка'''
+        context = super().get_context_data(**kwargs)
+        context['edge_shell'] = True
+        return context
+
+    def render_to_response(self, context, **response_kwargs):
+        '''Разрешить общий кеш и указать ключи ответа'''
+        response = super().render_to_response(context, **response_kwargs)
+        return patch_edge_cache(response, self.surrogate_keys(context))
+
+@method_decorator(condition(etag_func=shell_etag), name='get')
+class MainPageView(EdgeCachedMixin, TemplateView):
     '''Отображение главной страницы'''
     template_name = 'index.html'
 
-class ShopPageView(ListView):
-    '''Отображение магазина'''
+@method_decorator(condition(etag_func=shell_etag), name='get')
+class ShopPageView(EdgeCachedMixin, ListView):
+    '''Отображение магазина.
+
+    Цены выводятся в рублях, в валюту посетителя их пересчитывает скрипт.
+    '''
     model = Product
     template_name = 'shop.html'
+    paginate_by = 48
+    paginator_class = EstimatedCountPaginator
+    # Доступные сортировки: значение параметра ?sort= -> порядок
+    orderings = {
+        'best_rated': ('-rating', 'pk'),
+    }
+    default_ordering = ('pk',)
+
+    def get_ordering(self):
+        '''Сортировка, выбранная пользователем'''
+        return self.orderings.get(self.request.GET.get('sort'), self.default_ordering)
+
+    def get_context_data(self, **kwargs):
+        '''Передать в шаблон облегченные строки со скидками'''
+        context = super().get_context_data(**kwargs)
+        rows = apply_to_rows(product_rows(context['object_list']))
+        set_display_prices(rows, BASE_CURRENCY)
+        set_display_prices(rows, BASE_CURRENCY, source='sale_price', target='display_sale_price')
+        context['object_list'] = context['product_list'] = rows
+        return context
+
+    def surrogate_keys(self, context):
+        '''Ключи страницы: каталог, список товаров и каждый показанный товар'''
+        return ([CATALOG_KEY, LISTING_KEY]
+                + [product_key(product.pk) for product in context['product_list']])
+
+@method_decorator(never_cache, name='dispatch')
+class VisitorFragmentView(View):
+    '''Данные посетителя для общих страниц: вход, значок корзины, CSRF-токен, валюта.
+
+    В ?products= передаются товары страницы (через запятую), и в ответе
+    есть те из них, что в избранном у пользователя.
+    '''
+
+    def get(self, request):
+        '''Выдать данные посетителя в JSON'''
+        user = request.user
+        currency = visitor_currency(request)
+        product_ids = [int(pk) for pk in request.GET.get('products', '').split(',')
+                       if pk.isdigit()][:MAX_WISHLIST_PRODUCTS]
+        wishlist = (wishlisted_among(user.pk, product_ids)
+                    if user.is_authenticated and product_ids else ())
+        return JsonResponse({
+            'authenticated': user.is_authenticated,
+            'username': user.get_username() if user.is_authenticated else '',
+            'cart_count': get_cart_count(user.pk) if user.is_authenticated else 0,
+            'csrf_token': get_token(request),
+            'wishlist': sorted(wishlist),
+            'currency': {
+                'code': currency.code,
+                'symbol': currency.symbol,
+                'decimals': currency.decimals,
+                'rate': currency.rate,
+            },
+        })
+
+@method_decorator(condition(etag_func=catalog_etag), name='get')
+@method_decorator(vary_on_cookie, name='dispatch')
+class ProductPageView(DetailView):
+    '''Отображение страницы товара'''
+    model = Product
+    template_name = 'product.html'
+
+    def get_context_data(self, **kwargs):
+        '''Добавить в контекст цену со скидкой и рекомендации к товару'''
+        context = super().get_context_data(**kwargs)
+        apply_to_rows([self.object])
+        context['recommendation_list'] = recommendations_for(self.object)
+        return context
+
+@method_decorator(ratelimit(EVALUATION_RATE, scope='evaluation'), name='dispatch')
+class EvaluationView(LoginRequiredMixin, View):
+    '''Оценка товара пользователем'''
+    http_method_names = ['post']
+
+    def post(self, request, pk):
+        '''Поставить или изменить оценку'''
+        product = get_object_or_404(Product, pk=pk)
+        try:
+            value = int(request.POST.get('evaluation', ''))
+        except ValueError:
+            return HttpResponseBadRequest('Оценка должна быть числом')
+        if not 1 <= value <= 5:
+            return HttpResponseBadRequest('Оценка должна быть от 1 до 5')
+        Evaluation.objects.update_or_create(user=request.user, product=product,
+                                            defaults={'evaluation': value})
+        return redirect('product', pk=product.pk)
+
+
+re_accepts_gzip = re.compile(r'\bgzip\b')
+
+def streaming_response(request, chunks, content_type, filename=None):
+    '''Потоковый ответ, сжимаемый на лету, если клиент принимает gzip'''
+    from apps.shop import exports
+
+    chunks = exports.buffered(chunks)
+    response = StreamingHttpResponse(content_type=content_type)
+    if re_accepts_gzip.search(request.headers.get('Accept-Encoding', '')):
+        chunks = exports.gzipped(chunks)
+        response['Content-Encoding'] = 'gzip'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    if filename:
+        response['Content-Disposition'] = 'attachment; filename="%s"' % filename
+    response.streaming_content = chunks
+    return response
+
+def site_url(request):
+    '''Адрес сайта без завершающей косой черты'''
+    return request.build_absolute_uri('/').rstrip('/')
+
+class CatalogExportView(View):
+    '''Потоковая выгрузка каталога в CSV или JSON Lines'''
+    formats = {
+        'csv': ('iter_csv', 'text/csv; charset=utf-8'),
+        'jsonl': ('iter_jsonl', 'application/x-ndjson; charset=utf-8'),
+    }
+
+    def get(self, request, format):
+        '''Выгрузить каталог'''
+        from apps.shop import exports
+
+        generator, content_type = self.formats[format]
+        generate = getattr(exports, generator)
+        return streaming_response(request, generate(site_url(request)), content_type,
+                                  filename='catalog.%s' % format)
+
+class SitemapIndexView(View):
+    '''Индекс карты сайта'''
+
+    def get(self, request):
+        '''Выгрузить индекс карты сайта'''
+        from apps.shop import exports
+
+        return streaming_response(request, exports.iter_sitemap_index(site_url(request)),
+                                  'application/xml; charset=utf-8')
+
+class SitemapView(View):
+    '''Один файл карты сайта'''
+
+    def get(self, request, shard):
+        '''Выгрузить файл карты сайта с номером shard'''
+        from apps.shop import exports
 
-    
\ No newline at end of file
+        shard = int(shard)
+        if not 1 <= shard <= exports.sitemap_shard_count():
+            raise Http404('Нет такого файла карты сайта')
+        return streaming_response(request, exports.iter_sitemap(site_url(request), shard),
+                                  'application/xml; charset=utf-8')
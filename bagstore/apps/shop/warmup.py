@@ -0,0 +1,83 @@
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.db.models import Count
+from django.urls import reverse
+
+from apps.shop.models import Evaluation
+from apps.shop.views import ShopPageView
+
+
+def hot_product_ids(limit):
+    '''Самые популярные товары: по числу оценок и добавлений в корзину'''
+    from apps.cart.models import Cart
+
+    heat = Counter()
+    for model in (Evaluation, Cart):
+        rows = (model.objects.values('product_id')
+                .annotate(count=Count('pk'))
+                .order_by()
+                .values_list('product_id', 'count'))
+        heat.update(dict(rows.iterator(chunk_size=2000)))
+    return [product_id for product_id, _ in heat.most_common(limit)]
+
+
+def warm_paths(product_ids, pages):
+    '''Адреса для прогрева: главная, первые страницы магазина, популярные товары.
+
+    Первая страница — без параметра page, как в ссылке навигации: для
+    кеша прокси /shop/ и /shop/?page=1 — разные адреса.
+    '''
+    paths = [reverse('index')]
+    shop = reverse('shop')
+    for sort in [None, *ShopPageView.orderings]:
+        for page in range(1, pages + 1):
+            query = {} if sort is None else {'sort': sort}
+            if page > 1:
+                query['page'] = page
+            paths.append('%s?%s' % (shop, urllib.parse.urlencode(query)) if query else shop)
+    paths.extend(reverse('product', args=[product_id]) for product_id in product_ids)
+    return paths
+
+
+def fetch(url, timeout):
+    '''Запросить страницу целиком; возвращает код ответа'''
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as error:
+        return error.code
+
+
+def warm(urls, workers=4, timeout=30, progress=None):
+    '''Запросить адреса параллельно, не более чем workers одновременно.
+
+    progress(done, total, url, status, seconds) вызывается после каждого
+    адреса; status — код ответа или исключение. Возвращает список
+    адресов, которые не удалось прогреть.
+    '''
+    failed = []
+
+    def timed_fetch(url):
+        started = time.monotonic()
+        try:
+            status = fetch(url, timeout)
+        except (OSError, ValueError) as error:
+            status = error
+        return status, time.monotonic() - started
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(timed_fetch, url): url for url in urls}
+        for done, future in enumerate(as_completed(futures), 1):
+            url = futures[future]
+            status, seconds = future.result()
+            if status != 200:
+                failed.append(url)
+            if progress is not None:
+                progress(done, len(urls), url, status, seconds)
+    return failed
@@ -0,0 +1,13 @@
+from django.contrib import admin
+
+from apps.shop.admin import LargeTableAdmin
+from apps.wishlist.models import Wishlist
+
+
+@admin.register(Wishlist)
+class WishlistAdmin(LargeTableAdmin):
+    '''Администрирование избранного'''
+    list_display = ('id', 'user', 'product', 'created_at')
+    list_select_related = ('product', 'user')
+    raw_id_fields = ('product', 'user')
+    search_fields = ('^user__username', '^product__name')
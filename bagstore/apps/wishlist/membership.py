@@ -0,0 +1,23 @@
+from apps.wishlist.models import Wishlist
+
+
+def wishlisted_among(user_id, product_ids):
+    '''Какие из товаров product_ids (например, страницы магазина) в избранном.
+
+    Один запрос по уникальному индексу (user, product) на всю страницу,
+    поэтому стоимость не зависит от числа товаров. Результат не
+    кешируется: после изменения избранного его сразу видят все процессы.
+    '''
+    if user_id is None or not product_ids:
+        return set()
+    return set(Wishlist.objects.filter(user_id=user_id, product_id__in=product_ids)
+                               .values_list('product_id', flat=True))
+
+
+def toggle(user, product):
+    '''Добавить товар в избранное или убрать из него; True, если товар добавлен'''
+    deleted, _ = Wishlist.objects.filter(user=user, product=product).delete()
+    if deleted:
+        return False
+    Wishlist.objects.get_or_create(user=user, product=product)
+    return True
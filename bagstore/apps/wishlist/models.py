@@ -0,0 +1,25 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+from apps.shop.models import Product
+
+
+User = get_user_model()
+
+
+class Wishlist(models.Model):
+    '''Товар, отложенный пользователем в избранное'''
+    user = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name='Пользователь')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE,
+                                related_name='wishlisted_by', verbose_name='Товар')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Добавлен')
+
+    class Meta:
+        # Уникальный индекс (user, product) служит и для выборки избранного пользователя
+        unique_together = ('user', 'product')
+        verbose_name = 'Избранное'
+        verbose_name_plural = 'Избранное'
+
+    def __str__(self):
+        '''Строковое представление'''
+        return '%s: %s' % (self.user_id, self.product_id)
@@ -0,0 +1,58 @@
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.test import TestCase
+
+from apps.shop.models import Product
+from apps.shop.tests.fixtures import uploaded_image
+from apps.wishlist.membership import toggle, wishlisted_among
+from apps.wishlist.models import Wishlist
+
+
+User = get_user_model()
+
+
+class WishlistMembershipTest(TestCase):
+    '''Тест проверки товаров на избранное'''
+
+    @classmethod
+    def setUpTestData(cls):
+        '''Общие данные для всех тестов класса'''
+        cls.user = User.objects.create(username='Bill', email='bill@example.com')
+        image = uploaded_image()
+        cls.products = Product.objects.bulk_create(
+            Product(name='Сумка %d' % number, price=1000 + number, image=image)
+            for number in range(50))
+
+    def test_page_is_checked_with_one_query(self):
+        '''Тест: все товары страницы проверяются одним запросом'''
+        Wishlist.objects.create(user=self.user, product=self.products[3])
+        Wishlist.objects.create(user=self.user, product=self.products[40])
+        page = [product.pk for product in self.products]
+
+        with self.assertNumQueries(1):
+            self.assertEqual(wishlisted_among(self.user.pk, page),
+                             {self.products[3].pk, self.products[40].pk})
+        with self.assertNumQueries(1):
+            self.assertEqual(wishlisted_among(self.user.pk, page[:10]), {self.products[3].pk})
+
+    def test_toggle_is_seen_immediately(self):
+        '''Тест: добавление и удаление товара сразу видны в проверке'''
+        product = self.products[0]
+        self.assertEqual(wishlisted_among(self.user.pk, [product.pk]), set())
+
+        self.assertTrue(toggle(self.user, product))
+        self.assertEqual(wishlisted_among(self.user.pk, [product.pk]), {product.pk})
+        self.assertFalse(toggle(self.user, product))
+        self.assertEqual(wishlisted_among(self.user.pk, [product.pk]), set())
+
+    def test_anonymous_has_empty_wishlist(self):
+        '''Тест: у анонимного посетителя избранного нет, запросов не выполняется'''
+        with self.assertNumQueries(0):
+            self.assertEqual(wishlisted_among(None, [self.products[0].pk]), set())
+
+    def test_product_is_added_once(self):
+        '''Тест: товар нельзя добавить в избранное дважды'''
+        Wishlist.objects.create(user=self.user, product=self.products[0])
+
+        with self.assertRaises(IntegrityError):
+            Wishlist.objects.create(user=self.user, product=self.products[0])
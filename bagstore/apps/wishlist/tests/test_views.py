@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.shop.models import Product
+from apps.shop.tests.fixtures import uploaded_image
+from apps.wishlist.models import Wishlist
+
+
+User = get_user_model()
+
+
+class WishlistViewsTest(TestCase):
+    '''Тест страниц избранного'''
+
+    @classmethod
+    def setUpTestData(cls):
+        '''Общие данные для всех тестов класса'''
+        cls.user = User.objects.create(username='Bill', email='bill@example.com')
+        cls.product = Product.objects.create(name='Сумка', price=1590, image=uploaded_image())
+        cls.other = Product.objects.create(name='Кошелек', price=990, image=uploaded_image())
+
+    def setUp(self):
+        '''Установка перед тестированием'''
+        cache.clear()
+
+    def test_toggle_requires_login(self):
+        '''Тест: гость не может изменить избранное'''
+        response = self.client.post(reverse('wishlist_toggle', args=[self.product.pk]))
+
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Wishlist.objects.exists())
+
+    def test_toggle_adds_and_removes(self):
+        '''Тест: повторное нажатие убирает товар из избранного'''
+        self.client.force_login(self.user)
+        url = reverse('wishlist_toggle', args=[self.product.pk])
+
+        response = self.client.post(url, {'next': reverse('shop')})
+        self.assertRedirects(response, reverse('shop'))
+        self.assertTrue(Wishlist.objects.filter(user=self.user, product=self.product).exists())
+
+        self.client.post(url)
+        self.assertFalse(Wishlist.objects.exists())
+
+    def test_wishlist_page_lists_products(self):
+        '''Тест: на странице избранного показаны только отложенные товары'''
+        Wishlist.objects.create(user=self.user, product=self.product)
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse('wishlist'))
+        self.assertContains(response, 'Сумка')
+        self.assertNotContains(response, 'Кошелек')
+        self.assertContains(response, '1590 ₽')
+
+    def test_visitor_fragment_marks_page_products(self):
+        '''Тест: данные посетителя отмечают избранные товары страницы за постоянное число
+        запросов'''
+        Wishlist.objects.create(user=self.user, product=self.product)
+        self.client.force_login(self.user)
+        products = '%d,%d,oops' % (self.product.pk, self.other.pk)
+        self.client.get(reverse('visitor_fragment'), {'products': products})
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('visitor_fragment'), {'products': products})
+        self.assertEqual(response.json()['wishlist'], [self.product.pk])
+
+    def test_shop_page_has_wishlist_buttons(self):
+        '''Тест: в общей странице магазина есть кнопки избранного без состояния'''
+        response = self.client.get(reverse('shop'))
+
+        self.assertContains(response, 'data-wishlist-product="%d"' % self.product.pk)
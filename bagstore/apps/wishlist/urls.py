@@ -0,0 +1,9 @@
+from django.urls import re_path
+
+from apps.wishlist import views
+
+urlpatterns = [
+    re_path(r'^$', views.WishlistPageView.as_view(), name='wishlist'),
+    re_path(r'^toggle/(?P<product_id>\d+)/$', views.WishlistToggleView.as_view(),
+            name='wishlist_toggle'),
+]
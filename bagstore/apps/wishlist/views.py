@@ -0,0 +1,54 @@
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.shortcuts import get_object_or_404, redirect
+from django.utils.decorators import method_decorator
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views.decorators.cache import cache_control
+from django.views.decorators.vary import vary_on_cookie
+from django.views.generic import ListView, View
+
+from apps.currency.rates import set_display_prices, visitor_currency
+from apps.promotions.engine import apply_to_rows
+from apps.shop.models import Product
+from apps.shop.rows import product_rows
+from apps.wishlist.membership import toggle
+from bagstore.ratelimit import ratelimit
+
+# Допустимая частота изменений избранного для одного пользователя и IP
+WISHLIST_CHANGE_RATE = '30/m'
+
+@method_decorator(cache_control(private=True), name='dispatch')
+@method_decorator(vary_on_cookie, name='dispatch')
+class WishlistPageView(LoginRequiredMixin, ListView):
+    '''Избранные товары пользователя, последние добавленные — первыми'''
+    template_name = 'wishlist.html'
+    paginate_by = 48
+
+    def get_queryset(self):
+        '''Товары из избранного текущего пользователя'''
+        return (Product.objects
+                .filter(wishlisted_by__user=self.request.user)
+                .order_by('-wishlisted_by__created_at'))
+
+    def get_context_data(self, **kwargs):
+        '''Передать в шаблон облегченные строки со скидками и ценами в валюте посетителя'''
+        context = super().get_context_data(**kwargs)
+        currency = visitor_currency(self.request)
+        rows = apply_to_rows(product_rows(context['object_list']))
+        set_display_prices(rows, currency, source='sale_price')
+        context['object_list'] = context['product_list'] = rows
+        return context
+
+@method_decorator(ratelimit(WISHLIST_CHANGE_RATE, scope='wishlist'), name='dispatch')
+class WishlistToggleView(LoginRequiredMixin, View):
+    '''Добавление товара в избранное и удаление из него'''
+    http_method_names = ['post']
+
+    def post(self, request, product_id):
+        '''Переключить товар и вернуться на предыдущую страницу'''
+        product = get_object_or_404(Product, pk=product_id)
+        toggle(request.user, product)
+        next_url = request.POST.get('next')
+        if next_url and url_has_allowed_host_and_scheme(
+                next_url, allowed_hosts={request.get_host()}):
+            return redirect(next_url)
+        return redirect('wishlist')
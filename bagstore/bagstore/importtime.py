@@ -0,0 +1,76 @@
+import os
+import re
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+
+
+# Строка вывода python -X importtime:
+# "import time:       self [us] |  cumulative | imported package"
+re_importtime = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)\s*$')
+
+# Код, который выполняет при запуске каждый рабочий процесс
+BOOT_SCRIPT = '''
+import os
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', %(settings)r)
+import django
+django.setup()
+%(urls)s
+'''
+
+
+class ImportRecord:
+    '''Время импорта одного модуля'''
+    __slots__ = ('module', 'self_us', 'cumulative_us', 'depth')
+
+    def __init__(self, module, self_us, cumulative_us, depth):
+        self.module = module
+        self.self_us = self_us
+        self.cumulative_us = cumulative_us
+        self.depth = depth
+
+    def __repr__(self):
+        '''Отладочное представление'''
+        return '<ImportRecord: %s %d мкс>' % (self.module, self.cumulative_us)
+
+
+def parse_importtime(text):
+    '''Записи об импортах из вывода python -X importtime'''
+    records = []
+    for line in text.splitlines():
+        match = re_importtime.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            records.append(ImportRecord(module, int(self_us), int(cumulative_us),
+                                        len(indent) // 2))
+    return records
+
+
+def boot_script(urls=True):
+    '''Код запуска Django (и, если urls, загрузки маршрутов)'''
+    return BOOT_SCRIPT % {
+        'settings': os.environ.get('DJANGO_SETTINGS_MODULE', 'bagstore.settings'),
+        'urls': 'import %s' % settings.ROOT_URLCONF if urls else '',
+    }
+
+
+def profile_boot(urls=True):
+    '''Запустить Django в отдельном процессе под -X importtime.
+
+    Возвращает записи об импортах и полное время запуска процесса в
+    секундах. Отдельный процесс нужен, потому что в текущем все модули
+    уже импортированы.
+    '''
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        filter(None, (str(settings.BASE_DIR), env.get('PYTHONPATH'))))
+    started = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', boot_script(urls)],
+        env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if process.returncode:
+        raise RuntimeError(process.stderr.strip().splitlines()[-1])
+    return parse_importtime(process.stderr), elapsed
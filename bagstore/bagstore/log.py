@@ -0,0 +1,189 @@
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+
+# Данные текущего запроса для записей журнала (см. RequestLogMiddleware)
+request_context = contextvars.ContextVar('request_context', default=None)
+
+# Поля записи, которые JsonFormatter выводит, если они заданы
+CONTEXT_FIELDS = ('request_id', 'user_id', 'view', 'method', 'path', 'status', 'duration_ms')
+
+
+class RequestContext:
+    '''Данные запроса, которые попадают в каждую запись журнала'''
+    __slots__ = ('request', 'request_id', 'view')
+
+    def __init__(self, request, request_id):
+        self.request = request
+        self.request_id = request_id
+        self.view = None
+
+    @property
+    def user_id(self):
+        '''Идентификатор пользователя, если он уже был загружен.
+
+        Сам журнал не загружает пользователя: иначе каждый запрос читал
+        бы сессию, а ответ получал Vary: Cookie.
+        '''
+        user = getattr(self.request, '_cached_user', None)
+        if user is not None and user.is_authenticated:
+            return user.pk
+        return None
+
+
+class RequestContextFilter(logging.Filter):
+    '''Добавляет в запись идентификатор запроса, пользователя и представление.
+
+    Выполняется в потоке запроса, до постановки записи в очередь.
+    '''
+
+    def filter(self, record):
+        context = request_context.get()
+        if context is not None:
+            record.request_id = context.request_id
+            record.view = context.view
+            record.user_id = context.user_id
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    '''Одна запись журнала — одна строка JSON'''
+
+    def format(self, record):
+        data = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc)
+                            .isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                data[field] = value
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data['exception'] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class BoundedQueueHandler(QueueHandler):
+    '''Передает записи в ограниченную очередь и никогда не ждет.
+
+    Записи пишет отдельный поток (QueueListener), поэтому медленный
+    приемник журнала не задерживает запросы. Если очередь заполнена,
+    запись отбрасывается и учитывается в счетчике; когда место
+    появляется, в журнал попадает предупреждение о потерянных записях.
+    '''
+
+    def __init__(self, queue, target=None):
+        super().__init__(queue)
+        self.target = target
+        self.listener = None
+        self.counters_lock = threading.Lock()
+        self.enqueued = 0
+        self.dropped = 0
+        self.unreported = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self.counters_lock:
+                self.dropped += 1
+                self.unreported += 1
+            return
+        with self.counters_lock:
+            self.enqueued += 1
+            unreported, self.unreported = self.unreported, 0
+        if unreported:
+            self.report_dropped(unreported)
+
+    def prepare(self, record):
+        '''Подготовить запись к передаче в поток записи.
+
+        Сообщение и текст исключения вычисляются сразу, а исключение
+        сохраняется отдельно от сообщения, чтобы попасть в свое поле JSON.
+        '''
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg, record.args, record.exc_info = record.message, None, None
+        return record
+
+    def report_dropped(self, count):
+        '''Поставить в очередь предупреждение о потерянных записях'''
+        record = logging.LogRecord(__name__, logging.WARNING, __file__, 0,
+                                   'Очередь журнала переполнена, потеряно записей: %d',
+                                   (count,), None)
+        try:
+            self.queue.put_nowait(self.prepare(record))
+        except queue.Full:
+            with self.counters_lock:
+                self.unreported += count
+
+    def start(self):
+        '''Запустить поток, пишущий записи из очереди в target'''
+        self.listener = QueueListener(self.queue, self.target, respect_handler_level=True)
+        self.listener.start()
+
+    def stop(self):
+        '''Дописать оставшиеся записи и остановить поток записи'''
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def restart_after_fork(self):
+        '''Новые очередь и поток записи в дочернем процессе.
+
+        Поток родителя в дочернем процессе не работает (например, у
+        рабочих процессов gunicorn --preload), а очередь могла быть
+        захвачена им в момент fork.
+        '''
+        self.queue = queue.Queue(self.queue.maxsize)
+        self.counters_lock = threading.Lock()
+        self.start()
+
+    def stats(self):
+        '''Счетчики: поставлено в очередь, потеряно, сейчас в очереди'''
+        with self.counters_lock:
+            return {'enqueued': self.enqueued, 'dropped': self.dropped,
+                    'queued': self.queue.qsize()}
+
+
+def queue_handler(maxsize=10000, stream=None):
+    '''Обработчик для LOGGING: очередь на maxsize записей и поток записи в stream.
+
+    Используется в settings.LOGGING как фабрика ('()': 'bagstore.log.queue_handler').
+    '''
+    target = logging.StreamHandler(stream or sys.stderr)
+    target.setFormatter(JsonFormatter())
+    handler = BoundedQueueHandler(queue.Queue(maxsize), target)
+    handler.start()
+    atexit.register(handler.stop)
+    os.register_at_fork(after_in_child=handler.restart_after_fork)
+    return handler
+
+
+def queue_handlers():
+    '''Обработчики-очереди, подключенные к журналам'''
+    loggers = [logging.getLogger()] + [
+        logger for logger in logging.Logger.manager.loggerDict.values()
+        if isinstance(logger, logging.Logger)]
+    handlers = []
+    for logger in loggers:
+        for handler in logger.handlers:
+            if isinstance(handler, BoundedQueueHandler) and handler not in handlers:
+                handlers.append(handler)
+    return handlers
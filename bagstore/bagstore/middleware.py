@@ -0,0 +1,125 @@
+import logging
+import re
+import time
+import uuid
+
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+from bagstore.log import RequestContext, request_context
+
+try:
+    import brotli
+except ImportError:  # brotli — необязательная зависимость
+    brotli = None
+
+
+# Ответы меньше этого размера не сжимаются: выигрыш меньше накладных расходов
+MIN_COMPRESS_SIZE = 860
+# Типы содержимого, которые имеет смысл сжимать
+COMPRESSIBLE_TYPES = re.compile(r'^(text/|application/(json|xml|javascript|x-ndjson)|image/svg)')
+
+re_accepts_br = re.compile(r'\bbr\b')
+# Идентификатор запроса, принимаемый от прокси в X-Request-ID
+re_request_id = re.compile(r'^[\w.-]{1,64}$')
+
+access_logger = logging.getLogger('bagstore.request')
+
+
+def brotli_stream(chunks, quality):
+    '''Сжатие потока порций байтов в brotli на лету'''
+    compressor = brotli.Compressor(quality=quality)
+    for chunk in chunks:
+        data = compressor.process(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    '''Сжатие ответов: brotli, если клиент его принимает и модуль установлен,
+    иначе gzip. Маленькие и уже сжатые ответы не трогаются, потоковые
+    ответы сжимаются по мере отдачи.
+    '''
+    brotli_quality = 5
+    streaming_brotli_quality = 4
+
+    def should_compress(self, request, response):
+        '''Нужно ли сжимать ответ'''
+        if response.has_header('Content-Encoding'):
+            return False
+        if not COMPRESSIBLE_TYPES.match(response.get('Content-Type', '')):
+            return False
+        return response.streaming or len(response.content) >= MIN_COMPRESS_SIZE
+
+    def process_response(self, request, response):
+        if not self.should_compress(request, response):
+            return response
+        accept_encoding = request.headers.get('Accept-Encoding', '')
+        if brotli is None or not re_accepts_br.search(accept_encoding):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if response.streaming:
+            response.streaming_content = brotli_stream(response.streaming_content,
+                                                       self.streaming_brotli_quality)
+            del response.headers['Content-Length']
+        else:
+            compressed = brotli.compress(response.content, quality=self.brotli_quality)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # Сжатое тело отличается побайтно, поэтому сильный ETag становится слабым
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
+
+
+class RequestLogMiddleware:
+    '''Журнал запросов.
+
+    Каждый запрос получает идентификатор (из X-Request-ID или новый),
+    который попадает во все записи журнала во время запроса и в
+    заголовок ответа. По окончании запроса записывается строка с
+    методом, путем, статусом, представлением и временем ответа;
+    медленные запросы записываются как предупреждения.
+    '''
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_id = request.headers.get('X-Request-ID', '')
+        if not re_request_id.match(request_id):
+            request_id = uuid.uuid4().hex
+        context = RequestContext(request, request_id)
+        token = request_context.set(context)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+            duration_ms = round((time.perf_counter() - started) * 1000, 1)
+            response['X-Request-ID'] = request_id
+            level = (logging.WARNING if duration_ms >= settings.LOG_SLOW_REQUEST_MS
+                     else logging.INFO)
+            access_logger.log(level, '%s %s %d %.1f мс', request.method, request.path,
+                              response.status_code, duration_ms, extra={
+                                  'method': request.method,
+                                  'path': request.path,
+                                  'status': response.status_code,
+                                  'duration_ms': duration_ms,
+                              })
+            return response
+        finally:
+            request_context.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        '''Запомнить имя представления для записей журнала'''
+        context = request_context.get()
+        if context is not None:
+            match = request.resolver_match
+            context.view = (match and match.view_name) or view_func.__qualname__
@@ -0,0 +1,180 @@
+import functools
+import ipaddress
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+
+def parse_rate(rate):
+    '''Разобрать ограничение вида "10/m" в (количество, период в секундах)'''
+    count, period = rate.split('/')
+    return int(count), PERIODS[period]
+
+
+class LocalBackend:
+    '''Счетчики в памяти процесса (запасной вариант)'''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}
+
+    def get_many(self, keys):
+        '''Значения неистекших счетчиков по ключам'''
+        with self._lock:
+            now = time.monotonic()
+            return {key: self._data[key][0] for key in keys
+                    if key in self._data and self._data[key][1] > now}
+
+    def incr(self, key, timeout):
+        '''Увеличить счетчик key на 1; новый счетчик живет timeout секунд'''
+        with self._lock:
+            now = time.monotonic()
+            if len(self._data) > 10000:
+                self._data = {k: v for k, v in self._data.items() if v[1] > now}
+            value, expires = self._data.get(key, (0, 0))
+            if expires <= now:
+                value, expires = 0, now + timeout
+            self._data[key] = (value + 1, expires)
+            return value + 1
+
+
+class CacheBackend:
+    '''Счетчики в общем кеше с переходом на память процесса при сбое'''
+
+    def __init__(self, alias='default'):
+        self.alias = alias
+        self.fallback = LocalBackend()
+
+    def get_many(self, keys):
+        '''Значения счетчиков по ключам (одно обращение к кешу)'''
+        try:
+            return caches[self.alias].get_many(keys)
+        except Exception:
+            return self.fallback.get_many(keys)
+
+    def incr(self, key, timeout):
+        '''Атомарно увеличить счетчик key на 1; новый счетчик живет timeout секунд.
+
+        Обычно это одно обращение к кешу (incr). Отсутствующий счетчик
+        создается через add, который не перезапишет счетчик, созданный
+        в это же время другим процессом.
+        '''
+        try:
+            cache = caches[self.alias]
+            try:
+                return cache.incr(key)
+            except ValueError:
+                if cache.add(key, 1, timeout):
+                    return 1
+                return cache.incr(key)
+        except Exception:
+            return self.fallback.incr(key, timeout)
+
+
+backend = CacheBackend(getattr(settings, 'RATELIMIT_CACHE', 'default'))
+
+
+def retry_after(previous, current, count, elapsed, period):
+    '''Через сколько секунд следующий запрос уложится в ограничение.
+
+    elapsed — прошедшая доля текущего окна; оценка числа запросов
+    за период — previous * (1 - elapsed) + current.
+    '''
+    if previous and current + 1 <= count:
+        # Еще в текущем окне, когда вклад предыдущего окна уменьшится
+        return (1 - (count - current - 1) / previous - elapsed) * period
+    # В следующем окне, где текущее станет предыдущим
+    return (1 - elapsed + max(0, 1 - (count - 1) / current)) * period
+
+
+def hit(keys, rate):
+    '''Учесть запрос в счетчиках keys (например, пользователя и IP).
+
+    Используется скользящее окно: запросы считаются в окнах длиной в
+    период ограничения, а число запросов за последний период
+    оценивается как счетчик текущего окна плюс доля предыдущего,
+    пропорциональная еще не прошедшей части периода. Поэтому на
+    границе окон нельзя сделать вдвое больше запросов, как с
+    фиксированным окном. Счетчики меняются атомарным incr, так что
+    одновременные запросы не проходят сверх лимита; проверка стоит
+    одного чтения предыдущих окон и одного incr на каждый ключ.
+    Запрос учитывается во всех счетчиках. Возвращает 0, если запрос
+    разрешен, иначе — через сколько секунд можно повторить.
+    '''
+    count, period = parse_rate(rate)
+    now = time.time()
+    window = int(now // period)
+    elapsed = now / period - window
+    previous = backend.get_many(['%s:%d' % (key, window - 1) for key in keys])
+    wait = 0
+    for key in keys:
+        current = backend.incr('%s:%d' % (key, window), 2 * period)
+        before = previous.get('%s:%d' % (key, window - 1), 0)
+        if before * (1 - elapsed) + current > count:
+            wait = max(wait, retry_after(before, current, count, elapsed, period))
+    return wait
+
+
+def is_trusted_proxy(address):
+    '''Входит ли адрес в settings.TRUSTED_PROXIES (адреса и сети)'''
+    try:
+        address = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(network, strict=False)
+               for network in settings.TRUSTED_PROXIES)
+
+
+def client_ip(request):
+    '''IP-адрес клиента.
+
+    За доверенным прокси адрес берется из X-Forwarded-For: справа
+    налево пропускаются адреса доверенных прокси, и первый остальной
+    адрес — адрес клиента. От других клиентов заголовок не учитывается:
+    его легко подделать.
+    '''
+    address = request.META.get('REMOTE_ADDR', '')
+    if not is_trusted_proxy(address):
+        return address
+    forwarded = [part.strip() for part in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')
+                 if part.strip()]
+    for forwarded_address in reversed(forwarded):
+        if not is_trusted_proxy(forwarded_address):
+            return forwarded_address
+    return forwarded[0] if forwarded else address
+
+
+def ratelimit(rate, scope=None):
+    '''Ограничить частоту запросов к представлению для пользователя и IP.
+
+    Запрос учитывается и в счетчике IP, и (если пользователь вошел) в
+    счетчике пользователя; он отклоняется, если превышен любой из них.
+    Безопасные методы (GET, HEAD, OPTIONS) не ограничиваются. При
+    превышении возвращается 429 с заголовком Retry-After.
+    '''
+    def decorator(view):
+        name = scope or view.__qualname__
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method in ('GET', 'HEAD', 'OPTIONS'):
+                return view(request, *args, **kwargs)
+            keys = ['ratelimit:%s:ip:%s' % (name, client_ip(request))]
+            if request.user.is_authenticated:
+                keys.append('ratelimit:%s:user:%s' % (name, request.user.pk))
+            wait = hit(keys, rate)
+            if wait:
+                response = HttpResponse('Слишком много запросов', status=429)
+                response['Retry-After'] = str(math.ceil(wait))
+                return response
+            return view(request, *args, **kwargs)
+
+        return wrapper
+    return decorator
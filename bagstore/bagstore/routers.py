@@ -0,0 +1,151 @@
+import itertools
+import threading
+import time
+from contextvars import ContextVar
+
+from django.apps import apps
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+
+# Модели каталога, чтение которых можно отдавать репликам
+CATALOG_MODELS = {'shop.product', 'shop.productrecommendation', 'shop.pricehistory'}
+# Через сколько секунд снова пробовать реплику после ошибки
+REPLICA_RETRY_SECONDS = 30
+# Сколько секунд доверять успешной проверке реплики
+REPLICA_CHECK_SECONDS = 30
+# Сколько секунд после записи читать только с основной БД (задержка репликации)
+PIN_SECONDS = 5
+PIN_COOKIE = 'db_pin'
+
+# Читать ли с основной БД в текущем запросе
+_pinned = ContextVar('pinned_to_primary', default=False)
+# Была ли запись в текущем запросе
+_wrote = ContextVar('wrote_to_primary', default=False)
+
+
+def pin_to_primary():
+    '''Направлять все последующие чтения текущего запроса на основную БД'''
+    _pinned.set(True)
+
+
+def is_pinned_to_primary():
+    '''Закреплен ли текущий запрос за основной БД'''
+    return _pinned.get()
+
+
+class ReplicaRouter:
+    '''Маршрутизатор: чтение каталога с реплик, все остальное — с основной БД.
+
+    Реплики перечисляются в settings.DATABASE_REPLICAS и выбираются
+    по кругу; недоступная реплика пропускается REPLICA_RETRY_SECONDS секунд.
+    '''
+    primary = 'default'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+        self._unhealthy_until = {}
+        self._healthy_until = {}
+
+    def replicas(self):
+        '''Настроенные реплики'''
+        return getattr(settings, 'DATABASE_REPLICAS', ())
+
+    def mark_unhealthy(self, alias):
+        '''Не использовать реплику какое-то время'''
+        self._healthy_until.pop(alias, None)
+        self._unhealthy_until[alias] = time.monotonic() + REPLICA_RETRY_SECONDS
+
+    def check(self, alias):
+        '''Прочитать по строке из каждой таблицы каталога на реплике.
+
+        Одного подключения мало: пустой файл SQLite открывается без
+        ошибок, но чтение каталога с него падает с «no such table».
+        '''
+        connection = connections[alias]
+        with connection.cursor() as cursor:
+            for label in sorted(CATALOG_MODELS):
+                table = apps.get_model(label)._meta.db_table
+                cursor.execute('SELECT 1 FROM %s LIMIT 1' % connection.ops.quote_name(table))
+                cursor.fetchall()
+
+    def is_healthy(self, alias):
+        '''Доступна ли реплика и есть ли на ней таблицы каталога.
+
+        Успешная проверка запоминается на REPLICA_CHECK_SECONDS секунд,
+        чтобы не выполнять лишние запросы при каждом чтении.
+        '''
+        now = time.monotonic()
+        if self._unhealthy_until.get(alias, 0) > now:
+            return False
+        if self._healthy_until.get(alias, 0) > now:
+            return True
+        try:
+            self.check(alias)
+        except DatabaseError:
+            self.mark_unhealthy(alias)
+            return False
+        self._healthy_until[alias] = now + REPLICA_CHECK_SECONDS
+        return True
+
+    def choose_replica(self):
+        '''Следующая доступная реплика по кругу или None'''
+        replicas = self.replicas()
+        if not replicas:
+            return None
+        with self._lock:
+            start = next(self._counter)
+        for offset in range(len(replicas)):
+            alias = replicas[(start + offset) % len(replicas)]
+            if self.is_healthy(alias):
+                return alias
+        return None
+
+    def db_for_read(self, model, **hints):
+        '''Чтение каталога — с реплики, если запрос не закреплен за основной БД'''
+        if model._meta.label_lower not in CATALOG_MODELS or is_pinned_to_primary():
+            return self.primary
+        return self.choose_replica() or self.primary
+
+    def db_for_write(self, model, **hints):
+        '''Запись — всегда в основную БД; после нее чтения тоже идут туда'''
+        pin_to_primary()
+        _wrote.set(True)
+        return self.primary
+
+    def allow_relation(self, obj1, obj2, **hints):
+        '''Реплики содержат те же данные, что и основная БД'''
+        databases = {self.primary, *self.replicas()}
+        return obj1._state.db in databases and obj2._state.db in databases
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        '''Миграции применяются только к основной БД'''
+        return db == self.primary
+
+
+class PrimaryPinningMiddleware:
+    '''Закрепление запросов за основной БД.
+
+    Изменяющие запросы и запросы в течение PIN_SECONDS после записи
+    (отмечаются cookie) читают с основной БД, чтобы пользователь видел
+    собственные изменения, даже если реплика отстает.
+    '''
+    safe_methods = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        pinned = _pinned.set(request.method not in self.safe_methods
+                             or PIN_COOKIE in request.COOKIES)
+        wrote = _wrote.set(False)
+        try:
+            response = self.get_response(request)
+            if _wrote.get():
+                response.set_cookie(PIN_COOKIE, '1', max_age=PIN_SECONDS,
+                                    httponly=True, samesite='Lax')
+        finally:
+            _wrote.reset(wrote)
+            _pinned.reset(pinned)
+        return response
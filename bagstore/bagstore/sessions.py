@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+from django.utils import timezone
+
+
+# Сколько секунд процесс доверяет своей копии сессии в локальном кеше.
+# Локальный кеш у каждого процесса свой: изменение сессии (например,
+# выход) в одном процессе другие увидят не позже чем через это время
+LOCAL_CACHE_TIMEOUT = getattr(settings, 'SESSION_LOCAL_CACHE_TIMEOUT', 60)
+
+
+class CappedCache:
+    '''Кеш, хранящий значения не дольше max_timeout секунд'''
+
+    def __init__(self, cache, max_timeout):
+        self.cache = cache
+        self.max_timeout = max_timeout
+
+    def set(self, key, value, timeout):
+        '''Сохранить значение на timeout секунд, но не дольше max_timeout'''
+        self.cache.set(key, value, min(timeout, self.max_timeout))
+
+    def __contains__(self, key):
+        return key in self.cache
+
+    def __getattr__(self, name):
+        return getattr(self.cache, name)
+
+
+class SessionStore(cached_db.SessionStore):
+    '''Сессии в БД с копией в локальном кеше процесса.
+
+    Каждый запрос авторизованного пользователя читает сессию из памяти
+    процесса, а не из таблицы django_session; БД читается при промахе и
+    раз в LOCAL_CACHE_TIMEOUT секунд, пишется — только при изменении.
+    '''
+    # Сколько просроченных сессий удалять за один запрос
+    clear_batch_size = 1000
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._cache = CappedCache(self._cache, LOCAL_CACHE_TIMEOUT)
+
+    @classmethod
+    def clear_expired(cls):
+        '''Удалить просроченные сессии порциями, не блокируя таблицу надолго'''
+        model = cls.get_model_class()
+        expired = model.objects.filter(expire_date__lt=timezone.now())
+        while True:
+            keys = list(expired.values_list('pk', flat=True)[:cls.clear_batch_size])
+            if not keys:
+                break
+            model.objects.filter(pk__in=keys).delete()
@@ -41,14 +41,22 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'apps.shop',
     'apps.cart',
+    'apps.outbox',
+    'apps.currency',
+    'apps.promotions',
+    'apps.wishlist',
 ]
 
 MIDDLEWARE = [
+    'bagstore.middleware.RequestLogMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'bagstore.middleware.CompressionMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'bagstore.routers.PrimaryPinningMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -66,6 +74,8 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'apps.cart.context_processors.cart',
+                'apps.currency.context_processors.currency',
             ],
         },
     },
@@ -73,6 +83,8 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'bagstore.wsgi.application'
 
+TEST_RUNNER = 'bagstore.test_runner.TestRunner'
+
 
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
@@ -84,6 +96,125 @@ DATABASES = {
     }
 }
 
+# Реплики только для чтения каталога: DATABASE_REPLICAS="replica1,replica2" в .env.
+# Локально это отдельные файлы SQLite рядом с основной БД
+DATABASE_REPLICAS = [alias.strip() for alias in config.get('DATABASE_REPLICAS', '').split(',')
+                     if alias.strip()]
+for alias in DATABASE_REPLICAS:
+    DATABASES[alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / ('../database/%s.sqlite3' % alias),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['bagstore.routers.ReplicaRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+# Кеш default общий для всех процессов сайта и команд управления: в нем версии
+# каталога и акций, счетчики и снимки корзин, лимиты запросов.
+# CACHE_URL="redis://127.0.0.1:6379/1" в .env — Redis (нужен пакет redis),
+# CACHE_URL="memcached://127.0.0.1:11211" — Memcached (пакет pymemcache).
+# Без CACHE_URL кеш хранится в файлах: он общий только для процессов одной машины
+# и не изменяет счетчики атомарно, поэтому годится лишь для разработки
+CACHE_URL = config.get('CACHE_URL', '')
+if CACHE_URL.startswith('redis://'):
+    DEFAULT_CACHE = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CACHE_URL,
+    }
+elif CACHE_URL.startswith('memcached://'):
+    DEFAULT_CACHE = {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': CACHE_URL.removeprefix('memcached://'),
+    }
+else:
+    DEFAULT_CACHE = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '../database/cache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+
+CACHES = {
+    'default': DEFAULT_CACHE,
+    # Локальный кеш процесса для сессий
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sessions',
+    },
+}
+
+
+# Кеш прокси (CDN, Varnish) для общих страниц: главной и магазина.
+# EDGE_PURGE_URL="http://127.0.0.1:6081/" в .env — адрес, на который отправляются
+# запросы PURGE с заголовком Surrogate-Key; без него удаление по ключам отключено
+EDGE_CACHE_SECONDS = int(config.get('EDGE_CACHE_SECONDS', 600))
+EDGE_PURGE_URL = config.get('EDGE_PURGE_URL', '')
+EDGE_PURGE_TIMEOUT = 2
+
+# Адреса и сети прокси, которым можно доверять X-Forwarded-For (для лимитов
+# запросов по IP): TRUSTED_PROXIES="127.0.0.1,10.0.0.0/8" в .env. За прокси без
+# этой настройки все анонимные посетители получают один общий лимит
+TRUSTED_PROXIES = [network.strip() for network in config.get('TRUSTED_PROXIES', '').split(',')
+                   if network.strip()]
+
+
+# Sessions
+# https://docs.djangoproject.com/en/5.0/topics/http/sessions/
+
+# Хранилище сессий: SESSION_ENGINE="cached_db" | "db" | "signed_cookies" в .env.
+# signed_cookies не обращается к серверу вовсе, но данные сессии видны клиенту
+SESSION_ENGINES = {
+    'cached_db': 'bagstore.sessions',
+    'db': 'django.contrib.sessions.backends.db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_ENGINE = SESSION_ENGINES[config.get('SESSION_ENGINE', 'cached_db')]
+SESSION_CACHE_ALIAS = 'sessions'
+SESSION_LOCAL_CACHE_TIMEOUT = 60
+
+
+# Logging
+# https://docs.djangoproject.com/en/5.0/topics/logging/
+
+# Записи журнала ставятся в ограниченную очередь и пишутся в stderr отдельным
+# потоком в формате JSON; при переполнении очереди записи отбрасываются
+# (см. bagstore/log.py), поэтому медленный приемник не задерживает запросы
+LOG_LEVEL = config.get('LOG_LEVEL', 'INFO')
+LOG_QUEUE_SIZE = int(config.get('LOG_QUEUE_SIZE', 10000))
+# Запросы дольше этого времени записываются как предупреждения
+LOG_SLOW_REQUEST_MS = 1000
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'request_context': {
+            '()': 'bagstore.log.RequestContextFilter',
+        },
+    },
+    'handlers': {
+        'queue': {
+            '()': 'bagstore.log.queue_handler',
+            'maxsize': LOG_QUEUE_SIZE,
+            'filters': ['request_context'],
+        },
+    },
+    'root': {
+        'handlers': ['queue'],
+        'level': LOG_LEVEL,
+    },
+    'loggers': {
+        'django': {
+            'handlers': ['queue'],
+            'level': LOG_LEVEL,
+            'propagate': False,
+        },
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -103,6 +234,8 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+LOGIN_URL = 'admin:login'
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
@@ -124,6 +257,19 @@ STATIC_URL = '/static/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
 
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+    # Изображения товаров хранятся по хешу содержимого без дубликатов
+    'product_images': {
+        'BACKEND': 'apps.shop.storage.ContentHashStorage',
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -0,0 +1,102 @@
+import logging
+import zlib
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import iter_test_cases, override_settings
+
+from bagstore.log import queue_handlers
+
+
+# Файлы в тестах хранятся в памяти: тесты не пишут в MEDIA_ROOT
+# и не мешают друг другу при запуске с --parallel
+TEST_STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.InMemoryStorage',
+    },
+    'product_images': {
+        'BACKEND': 'apps.shop.storage.InMemoryContentHashStorage',
+    },
+}
+
+# Кеш в памяти процесса: cache.clear() в тестах не должен очищать кеш
+# работающего сайта и тестов в соседних процессах --parallel
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tests',
+    },
+}
+
+# Быстрый хешер паролей: надежность хеширования в тестах не нужна
+TEST_PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# Журнал в тестах пишет только критические ошибки, чтобы строки о каждом
+# запросе тестового клиента не засоряли вывод (assertLogs это не мешает)
+TEST_LOG_LEVEL = logging.CRITICAL
+
+
+def parse_shard(shard):
+    '''Разобрать часть тестов вида "2/4" в (индекс с нуля, число частей)'''
+    index, total = (int(part) for part in shard.split('/'))
+    if not 1 <= index <= total:
+        raise ValueError('Номер части должен быть от 1 до %d' % total)
+    return index - 1, total
+
+
+def shard_of(test, total):
+    '''Номер части, в которую попадает тест.
+
+    Тесты делятся по классам: один класс целиком выполняется в одной
+    части, поэтому дорогие общие ресурсы класса (браузер, данные
+    setUpTestData) создаются один раз. crc32 дает одинаковое разбиение
+    во всех процессах, в отличие от hash().
+    '''
+    name = '%s.%s' % (type(test).__module__, type(test).__qualname__)
+    return zlib.crc32(name.encode()) % total
+
+
+class TestRunner(DiscoverRunner):
+    '''Запуск тестов с файлами и кешем в памяти и быстрым хешированием паролей.
+
+    --shard N/M оставляет только N-ю из M частей тестов: так набор
+    (например, functional_tests) делится между машинами CI, а внутри
+    машины — между процессами с помощью --parallel.
+    '''
+
+    def __init__(self, shard=None, **kwargs):
+        super().__init__(**kwargs)
+        self.shard = parse_shard(shard) if shard else None
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--shard', metavar='N/M',
+            help='Запустить только N-ю из M частей тестов.')
+
+    def load_tests_for_label(self, label, discover_kwargs):
+        tests = super().load_tests_for_label(label, discover_kwargs)
+        if self.shard is None:
+            return tests
+        index, total = self.shard
+        return self.test_suite(test for test in iter_test_cases(tests)
+                               if shard_of(test, total) == index)
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.test_settings = override_settings(
+            STORAGES={**settings.STORAGES, **TEST_STORAGES},
+            CACHES={**settings.CACHES, **TEST_CACHES},
+            PASSWORD_HASHERS=TEST_PASSWORD_HASHERS,
+        )
+        self.test_settings.enable()
+        self.log_levels = {handler: handler.level for handler in queue_handlers()}
+        for handler in self.log_levels:
+            handler.setLevel(TEST_LOG_LEVEL)
+
+    def teardown_test_environment(self, **kwargs):
+        for handler, level in self.log_levels.items():
+            handler.setLevel(level)
+        self.test_settings.disable()
+        super().teardown_test_environment(**kwargs)
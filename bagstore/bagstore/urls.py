@@ -18,12 +18,21 @@ from django.contrib import admin
 from django.urls import path, re_path, include
 
 from apps.cart import urls as cart_urls
+from apps.currency import urls as currency_urls
 from apps.shop import urls as shop_urls
 from apps.shop import views as shop_views
+from apps.wishlist import urls as wishlist_urls
 
 urlpatterns = [
     re_path(r'^$', shop_views.MainPageView.as_view(), name='index'),
+    re_path(r'^visitor\.json$', shop_views.VisitorFragmentView.as_view(),
+            name='visitor_fragment'),
     re_path(r'^shop/', include(shop_urls)),
     re_path(r'^cart/', include(cart_urls)),
+    re_path(r'^currency/', include(currency_urls)),
+    re_path(r'^wishlist/', include(wishlist_urls)),
+    re_path(r'^sitemap\.xml$', shop_views.SitemapIndexView.as_view(), name='sitemap'),
+    re_path(r'^sitemap-(?P<shard>\d+)\.xml$', shop_views.SitemapView.as_view(),
+            name='sitemap_shard'),
     path('admin/', admin.site.urls),
 ]
@@ -1,3 +1,30 @@
-from dotenv import dotenv_values
+import functools
+import os
+from pathlib import Path
 
-config = dotenv_values("config/.env")
+
+# Файл .env ищется рядом с этим модулем, а не в текущем каталоге:
+# так настройки не зависят от того, откуда запущен процесс
+ENV_PATH = Path(__file__).resolve().parent / '.env'
+# Прежнее расположение относительно текущего каталога (для старых установок)
+LEGACY_ENV_PATH = Path('config/.env')
+
+
+def env_path():
+    '''Путь к .env: из BAGSTORE_ENV_FILE, рядом с модулем или по-старому'''
+    if os.environ.get('BAGSTORE_ENV_FILE'):
+        return Path(os.environ['BAGSTORE_ENV_FILE'])
+    if not ENV_PATH.exists() and LEGACY_ENV_PATH.exists():
+        return LEGACY_ENV_PATH
+    return ENV_PATH
+
+
+@functools.cache
+def load_config(path):
+    '''Значения из файла .env (файл читается один раз за процесс)'''
+    from dotenv import dotenv_values
+
+    return dotenv_values(path)
+
+
+config = load_config(env_path())
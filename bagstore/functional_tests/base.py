@@ -1,45 +1,95 @@
-import time
 import os
 
-from selenium.common.exceptions import WebDriverException
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.common.by import By
+from selenium.webdriver.firefox.options import Options
 from selenium.webdriver.firefox.webdriver import WebDriver
+from selenium.webdriver.support import expected_conditions
+from selenium.webdriver.support.ui import WebDriverWait
 
 from django.contrib.staticfiles.testing import StaticLiveServerTestCase
 
 MAX_WAIT = 10
+# Как часто WebDriverWait перепроверяет условие
+POLL_FREQUENCY = 0.05
 SHOP_BUTTON = 'Магазин'
 CART_BUTTON = 'Корзина'
 
+
+def create_browser():
+    '''Запустить Firefox; без дисплея (по умолчанию) — в режиме headless.
+
+    Чтобы видеть браузер при отладке, задайте SELENIUM_HEADLESS=0.
+    '''
+    options = Options()
+    if os.environ.get('SELENIUM_HEADLESS', '1') != '0':
+        options.add_argument('-headless')
+    return WebDriver(options=options)
+
+
 class FunctionalTest(StaticLiveServerTestCase):
-    '''Функциональный тест'''
+    '''Функциональный тест.
+
+    Браузер запускается один раз на класс тестов, а не на каждый тест:
+    запуск Firefox стоит секунды. Между тестами очищаются cookies,
+    поэтому тесты не видят сессий друг друга.
+    '''
+
+    @classmethod
+    def setUpClass(cls):
+        '''Установка перед тестами класса.
+
+        Сервер регистрирует свою остановку через addClassCleanup сразу
+        после запуска, браузер — так же, поэтому при ошибке запуска
+        браузера сервер все равно останавливается.
+        '''
+        super().setUpClass()
+        cls.browser = create_browser()
+        cls.addClassCleanup(cls.browser.quit)
 
     def setUp(self):
         '''Установка'''
-        self.browser = WebDriver()
+        self.browser.delete_all_cookies()
         self.staging_server = os.environ.get('STAGING_SERVER')
         if self.staging_server:
             self.live_server_url = 'http://' + self.staging_server
-    
-    def tearDown(self):
-        '''Удаление'''
-        self.browser.quit()
-    
+
+    def wait(self, timeout=MAX_WAIT):
+        '''Явное ожидание условия в браузере'''
+        return WebDriverWait(self.browser, timeout, poll_frequency=POLL_FREQUENCY)
+
     def wait_for(self, fn):
-        '''Ожидать'''
-        start_time = time.time()
-        while True:
+        '''Ожидать, пока fn не перестанет падать, и вернуть ее результат'''
+        errors = []
+
+        def attempt(browser):
             try:
-                return fn()
-            except (AssertionError, WebDriverException) as e:
-                if time.time() - start_time > MAX_WAIT:
-                    raise e
-                time.sleep(0.5)
+                return (fn(),)
+            except (AssertionError, WebDriverException) as error:
+                errors.append(error)
+                return False
+
+        try:
+            return self.wait().until(attempt)[0]
+        except TimeoutException:
+            if errors:
+                raise errors[-1]
+            raise
+
+    def wait_for_element(self, by, value):
+        '''Ожидать появления элемента на странице'''
+        return self.wait().until(expected_conditions.presence_of_element_located((by, value)))
+
+    def click_and_wait_for_page(self, element):
+        '''Нажать на элемент и дождаться загрузки новой страницы'''
+        page = self.browser.find_element(By.TAG_NAME, 'html')
+        element.click()
+        self.wait().until(expected_conditions.staleness_of(page))
 
     def the_correct_location_of_the_navigation_buttons(self):
         '''Корректное расположение кнопок навигации'''
         # Проверка расположения лого
-        logo = self.browser.find_element(By.ID, 'logo')
+        logo = self.wait_for_element(By.ID, 'logo')
         self.assertAlmostEqual(logo.location['x'], 100, delta=15)
         self.assertAlmostEqual(logo.location['y'], 25, delta=10)
 
@@ -34,7 +34,7 @@ class LayoutAndStylingTest(FunctionalTest):
         self.browser.get(self.live_server_url)
         self.browser.set_window_size(1480, 800)
 
-        self.browser.find_element(By.LINK_TEXT, SHOP_BUTTON).click()
+        self.click_and_wait_for_page(self.browser.find_element(By.LINK_TEXT, SHOP_BUTTON))
 
         # Здесь билл так же видит лого и кнопки меню рядом с ним
         self.the_correct_location_of_the_navigation_buttons()
@@ -111,7 +111,7 @@ class LayoutAndStylingTest(FunctionalTest):
         self.browser.get(self.live_server_url)
         self.browser.set_window_size(1480, 800)
 
-        self.browser.find_element(By.LINK_TEXT, CART_BUTTON).click()
+        self.click_and_wait_for_page(self.browser.find_element(By.LINK_TEXT, CART_BUTTON))
 
         # Здесь Билл так же видит лого и кнопки меню рядом с ним
         self.the_correct_location_of_the_navigation_buttons(self)
@@ -1,4 +1,5 @@
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions
 from unittest import skip
 
 from django.urls import reverse
@@ -18,6 +19,7 @@ class MainPageTest(FunctionalTest):
         self.browser.find_element(By.LINK_TEXT, 'Магазин').click()
 
         # Сайт переносит его в магазин
+        self.wait().until(expected_conditions.url_contains(reverse('shop')))
         self.assertRegex(self.browser.current_url, reverse('shop'))
 
     @skip   